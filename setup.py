@@ -129,8 +129,10 @@ setup(
         "numpy==1.19.2",
         "Cython>=0.29.22",
         "websocket_client",
+        "websockets",
         "tokenizers",
         "requests",
+        "urllib3>=1.26",
     ],
     ext_modules=cythonize(EXTENSIONS),
     include_dirs=[get_include()],
@@ -6,6 +6,7 @@ from typing import Any, Union
 import numpy as np
 
 from spokestack.context import SpeechContext
+from spokestack.schedule import RUN_ACTIVE, RUN_SPEECH_EDGE
 
 
 class ActivationTimeout:
@@ -17,6 +18,9 @@ class ActivationTimeout:
         max_active (int): the maximum length of an activation (ms)
     """
 
+    # counts active frames and deactivates when speech ends
+    schedule = RUN_ACTIVE | RUN_SPEECH_EDGE
+
     def __init__(
         self,
         frame_width: int = 20,
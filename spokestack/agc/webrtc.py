@@ -63,6 +63,23 @@ class AutomaticGainControl:
         # run automatic gain control on the frame
         self._agc(frame)
 
+    def process_block(self, context: SpeechContext, frames: np.ndarray) -> None:
+        """Processes a block of frames in a single call
+
+        Args:
+            context (SpeechContext): State based information that needs to be shared
+            between pieces of the pipeline
+            frames (np.ndarray): 2D block of PCM-16 audio, one frame per row
+        """
+        # validate frame size
+        if frames.shape[-1] != self._sample_rate * self._frame_width // 1000:
+            raise ValueError("invalid_frame_size")
+        # validate dtype
+        if not np.issubdtype(frames.dtype, np.signedinteger):
+            raise TypeError("invalid_dtype")
+        # run automatic gain control on each frame of the block
+        self._agc.process_block(frames)
+
     def close(self) -> None:
         """method for pipeline compliance"""
         pass
@@ -1,16 +1,18 @@
 """
 This module contains the google asr speech recognizer
 """
+import asyncio
 import logging
 from queue import Queue
 from threading import Thread
-from typing import Any, Generator, Union
+from typing import Any, AsyncIterator, Generator, Optional, Union
 
 import numpy as np
 from google.cloud import speech
 from google.oauth2 import service_account
 
 from spokestack.context import SpeechContext
+from spokestack.schedule import RUN_ACTIVE, RUN_ACTIVE_EDGE
 
 _LOG = logging.getLogger(__name__)
 
@@ -31,6 +33,9 @@ class GoogleSpeechRecognizer:
         **kwargs (optional): additional keyword arguments
     """
 
+    # streams audio while active and commits when activation ends
+    schedule = RUN_ACTIVE | RUN_ACTIVE_EDGE
+
     def __init__(
         self,
         language: str,
@@ -38,30 +43,8 @@ class GoogleSpeechRecognizer:
         sample_rate: int = 16000,
         **kwargs: Any,
     ) -> None:
-        if credentials:
-            if isinstance(credentials, str):
-                credentials = service_account.Credentials.from_service_account_file(
-                    credentials
-                )
-            elif isinstance(credentials, dict):
-                credentials = service_account.Credentials.from_service_account_info(
-                    credentials
-                )
-            else:
-                raise ValueError(
-                    "Invalid Credentials: Only dict, str, or None accepted"
-                )
-
-        self._client = speech.SpeechClient(credentials=credentials)
-        self._config = speech.StreamingRecognitionConfig(
-            config=speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=sample_rate,
-                language_code=language,
-                enable_automatic_punctuation=True,
-            ),
-            interim_results=True,
-        )
+        self._client = speech.SpeechClient(credentials=_load_credentials(credentials))
+        self._config = _streaming_config(language, sample_rate)
         self._queue: Queue = Queue()
         self._thread: Any = None
 
@@ -91,20 +74,7 @@ class GoogleSpeechRecognizer:
 
     def _receive(self, context: SpeechContext) -> None:
         for response in self._client.streaming_recognize(self._config, self._drain()):
-            for result in response.results[:1]:
-                for alternative in result.alternatives[:1]:
-                    context.transcript = alternative.transcript
-                    context.confidence = alternative.confidence
-                    if context.transcript:
-                        context.event("partial_recognize")
-
-                if result.is_final:
-                    if context.transcript:
-                        context.event("recognize")
-                        _LOG.debug("recognize event")
-                    else:
-                        context.event("timeout")
-                        _LOG.debug("timeout event")
+            _update(context, response)
 
     def _drain(self) -> Generator:
         while True:
@@ -131,3 +101,146 @@ class GoogleSpeechRecognizer:
     def close(self) -> None:
         """ closes recognizer """
         self._client = None
+
+
+class AsyncGoogleSpeechRecognizer:
+    """Transforms speech into text using Google's ASR on an asyncio event loop.
+
+    Audio is streamed to Google with the asyncio client, so recognition runs
+    as a task on the pipeline's event loop rather than on a thread per stream.
+    This recognizer is meant for use with the AsyncSpeechPipeline.
+
+    Args:
+        language (str): The language of given audio as a
+                        [BCP-47](https://www.rfc-editor.org/rfc/bcp/bcp47.txt)
+                        language tag. Example: "en-US"
+        credentials (Union[None, str, dict]): Dictionary of Google API credentials
+                                              or path to credentials. if set to None
+                                              credentials will be pulled from the
+                                              environment variable:
+                                              GOOGLE_APPLICATION_CREDENTIALS
+        sample_rate (int): sample rate of the input audio (Hz)
+        **kwargs (optional): additional keyword arguments
+    """
+
+    # streams audio while active and commits when activation ends
+    schedule = RUN_ACTIVE | RUN_ACTIVE_EDGE
+
+    def __init__(
+        self,
+        language: str,
+        credentials: Union[None, str, dict] = None,
+        sample_rate: int = 16000,
+        **kwargs: Any,
+    ) -> None:
+        self._credentials = _load_credentials(credentials)
+        self._config = _streaming_config(language, sample_rate)
+        self._client: Any = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Future] = None
+
+    async def __call__(self, context: SpeechContext, frame: np.ndarray) -> None:
+        """Main entry point.
+
+        Args:
+            context (SpeechContext): current state of the speech pipeline
+            frame (np.ndarray): numpy array of PCM-16 audio.
+
+        Returns: None
+
+        """
+        if self._task is None and context.is_active:
+            self._begin(context)
+        if self._task is not None and not context.is_active:
+            await self._commit()
+        if self._queue is not None and context.is_active:
+            self._send(frame)
+
+    def _begin(self, context: SpeechContext) -> None:
+        # the asyncio client is bound to the running event loop,
+        # so it is created on first use rather than at construction
+        if self._client is None:
+            self._client = speech.SpeechAsyncClient(credentials=self._credentials)
+        self._queue = asyncio.Queue()
+        self._task = asyncio.ensure_future(self._receive(context, self._queue))
+
+    async def _receive(self, context: SpeechContext, queue: asyncio.Queue) -> None:
+        responses = await self._client.streaming_recognize(requests=self._drain(queue))
+        async for response in responses:
+            _update(context, response)
+
+    async def _drain(self, queue: asyncio.Queue) -> AsyncIterator[Any]:
+        # the asyncio client expects the configuration as the first request
+        yield speech.StreamingRecognizeRequest(streaming_config=self._config)
+        while True:
+            data = await queue.get()
+            if not data:
+                break
+            yield data
+
+    async def _commit(self) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait(None)
+        task, self._task, self._queue = self._task, None, None
+        if task is not None:
+            await task
+
+    def _send(self, frame: np.ndarray) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait(
+                speech.StreamingRecognizeRequest(audio_content=frame.tobytes())
+            )
+
+    def reset(self) -> None:
+        """ resets recognizer """
+        if self._queue is not None:
+            self._queue.put_nowait(None)
+        if self._task is not None:
+            self._task.cancel()
+        self._task = None
+        self._queue = None
+
+    def close(self) -> None:
+        """ closes recognizer """
+        self.reset()
+        self._client = None
+
+
+def _load_credentials(credentials: Union[None, str, dict]) -> Any:
+    if credentials:
+        if isinstance(credentials, str):
+            return service_account.Credentials.from_service_account_file(credentials)
+        elif isinstance(credentials, dict):
+            return service_account.Credentials.from_service_account_info(credentials)
+        else:
+            raise ValueError("Invalid Credentials: Only dict, str, or None accepted")
+    return credentials
+
+
+def _streaming_config(language: str, sample_rate: int) -> Any:
+    return speech.StreamingRecognitionConfig(
+        config=speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=sample_rate,
+            language_code=language,
+            enable_automatic_punctuation=True,
+        ),
+        interim_results=True,
+    )
+
+
+def _update(context: SpeechContext, response: Any) -> None:
+    for result in response.results[:1]:
+        for alternative in result.alternatives[:1]:
+            context.transcript = alternative.transcript
+            context.confidence = alternative.confidence
+            if context.transcript:
+                context.event("partial_recognize")
+
+        if result.is_final:
+            if context.transcript:
+                context.event("recognize")
+                _LOG.debug("recognize event")
+            else:
+                context.event("timeout")
+                _LOG.debug("timeout event")
@@ -2,14 +2,19 @@
 This module contains the Spokestack KeywordRecognizer which identifies multiple keywords
 from an audio stream.
 """
+import copy
 import os
-from typing import Any, List
+from typing import Any, Callable, List, Optional, Union
 
 import numpy as np
 
 from spokestack.context import SpeechContext
+from spokestack.features import StreamingSTFT
+from spokestack.models.filterbank import MelFilterbank
+from spokestack.models.registry import ModelRegistry
 from spokestack.models.tensorflow import TFLiteModel
-from spokestack.ring_buffer import RingBuffer
+from spokestack.ring_buffer import MirroredRingBuffer, RingBuffer
+from spokestack.schedule import RUN_ALWAYS
 
 
 class KeywordRecognizer:
@@ -23,8 +28,23 @@ class KeywordRecognizer:
         fft_hop_length (int): Audio sliding window for STFT calculation (ms)
         model_dir (str): Path to the directory containing .tflite models
         posterior_threshold (float): Probability threshold for detection
+        filter_type (str): Implementation of the mel filter, either "tflite"
+                           to invoke filter.tflite, or "numpy" to project
+                           with the filterbank weights, loaded from
+                           filter.npy or extracted from filter.tflite
+        registry (ModelRegistry): Optional registry that shares the models
+                                  with other components
+        num_threads (int): Number of threads used by each model, or None for
+                           the runtime default
+        delegates (List[Any]): TFLite delegates, or paths to delegate libraries,
+                               used by each model
     """
 
+    # advances the sample history on every frame, so that the first windows
+    # after activation include the audio before it, while the transform,
+    # filter, and encoder only run while active
+    schedule = RUN_ALWAYS
+
     def __init__(
         self,
         classes: List[str],
@@ -34,6 +54,10 @@ class KeywordRecognizer:
         fft_hop_length: int = 10,
         model_dir: str = "",
         posterior_threshold: float = 0.5,
+        filter_type: str = "tflite",
+        registry: Optional[ModelRegistry] = None,
+        num_threads: Optional[int] = None,
+        delegates: Optional[List[Any]] = None,
         **kwargs: Any
     ) -> None:
 
@@ -43,15 +67,37 @@ class KeywordRecognizer:
 
         if fft_window_type != "hann":
             raise ValueError("Invalid fft_window_type")
-
-        self.filter_model: TFLiteModel = TFLiteModel(
-            model_path=os.path.join(model_dir, "filter.tflite")
-        )
-        self.encode_model: TFLiteModel = TFLiteModel(
-            model_path=os.path.join(model_dir, "encode.tflite")
+        if filter_type not in ("tflite", "numpy"):
+            raise ValueError("Invalid filter_type")
+
+        # models come from the registry when one is given,
+        # each with the same interpreter options
+        self._registry = registry
+        load: Callable[..., TFLiteModel] = TFLiteModel
+        if registry is not None:
+            load = registry.acquire
+        options = {"num_threads": num_threads, "delegates": delegates}
+
+        # the numpy filterbank is loaded from its sidecar file when present,
+        # and otherwise extracted from the filter model
+        filter_path = os.path.join(model_dir, "filter.npy")
+        self.filter_model: Union[TFLiteModel, MelFilterbank]
+        if filter_type == "numpy" and os.path.exists(filter_path):
+            self.filter_model = MelFilterbank.load(filter_path)
+        else:
+            self.filter_model = load(
+                model_path=os.path.join(model_dir, "filter.tflite"), **options
+            )
+            if filter_type == "numpy":
+                model = self.filter_model
+                self.filter_model = MelFilterbank.from_model(model)
+                if registry is not None:
+                    registry.release(model)
+        self.encode_model: TFLiteModel = load(
+            model_path=os.path.join(model_dir, "encode.tflite"), **options
         )
-        self.detect_model: TFLiteModel = TFLiteModel(
-            model_path=os.path.join(model_dir, "detect.tflite")
+        self.detect_model: TFLiteModel = load(
+            model_path=os.path.join(model_dir, "detect.tflite"), **options
         )
 
         if len(classes) != self.detect_model.output_details[0]["shape"][-1]:
@@ -61,29 +107,31 @@ class KeywordRecognizer:
         # the filter inputs are (fft_size - 1) / 2
         # which makes the window size (post_fft_size - 1) * 2
         self._window_size = (self.filter_model.input_details[0]["shape"][-1] - 1) * 2
-        self._fft_window = np.hanning(self._window_size)
 
         # retrieve the mel_length and mel_width based on the encoder model metadata
         # these allocate the buffer to the correct size
         self.mel_length: int = self.encode_model.input_details[0]["shape"][1]
         self.mel_width: int = self.encode_model.input_details[0]["shape"][-1]
 
-        # initialize the first state input for autoregressive encoder model
         # retrieve the encode_length and encode_width from the model detect_model
         # metadata. We get the dimensions from the detect_model inputs because the
         # encode_model runs autoregressive and outputs a single encoded sample.
         # the detect_model input is a collection of these samples.
-        self.state = np.zeros(self.encode_model.input_details[1]["shape"], np.float32)
         self.encode_length: int = self.detect_model.input_details[0]["shape"][1]
         self.encode_width: int = self.detect_model.input_details[0]["shape"][-1]
 
-        self.sample_window: RingBuffer = RingBuffer(
-            shape=[self._window_size],
-        )
-        self.frame_window: RingBuffer = RingBuffer(
+        self._posterior_threshold: float = posterior_threshold
+        self._allocate()
+
+    def _allocate(self) -> None:
+        # initialize the first state input for autoregressive encoder model
+        self.state = np.zeros(self.encode_model.input_details[1]["shape"], np.float32)
+
+        self.stft = StreamingSTFT(self._window_size, self.hop_length, self.pre_emphasis)
+        self.frame_window: RingBuffer = MirroredRingBuffer(
             shape=[self.mel_length, self.mel_width]
         )
-        self.encode_window: RingBuffer = RingBuffer(
+        self.encode_window: RingBuffer = MirroredRingBuffer(
             shape=[self.encode_length, self.encode_width]
         )
 
@@ -92,10 +140,28 @@ class KeywordRecognizer:
         self.frame_window.fill(0.0)
         self.encode_window.fill(-1.0)
 
-        self._posterior_threshold: float = posterior_threshold
-        self._prev_sample: float = 0.0
         self._is_active = False
 
+    def clone(self) -> "KeywordRecognizer":
+        """Creates a recognizer for another audio stream that shares this
+        recognizer's models
+
+        The clone allocates its own sample, frame, and encode windows along
+        with its own encoder state. Clones share the underlying interpreters,
+        so they must be called from the same thread as the original,
+        unless the models are wrapped in a
+        :class:`~spokestack.models.batched.BatchedModel`.
+
+        Returns: a new KeywordRecognizer with the same configuration
+
+        """
+        recognizer = copy.copy(self)
+        recognizer._allocate()
+
+        # clones borrow the models, which the original releases
+        recognizer._registry = None
+        return recognizer
+
     def __call__(self, context: SpeechContext, frame: np.ndarray) -> None:
 
         self._sample(context, frame)
@@ -106,56 +172,38 @@ class KeywordRecognizer:
         self._is_active = context.is_active
 
     def _sample(self, context: SpeechContext, frame: np.ndarray) -> None:
-        # convert the PCM-16 audio to float32 in (-1.0, 1.0)
-        frame = frame.astype(np.float32) / (2 ** 15 - 1)
-        frame = np.clip(frame, -1.0, 1.0)
-
-        # pull out a single value from the frame and apply pre-emphasis
-        # with the previous sample then cache the previous sample
-        # to be use in the next iteration
-        prev_sample = frame[-1]
-        frame -= self.pre_emphasis * np.append(self._prev_sample, frame[:-1])
-        self._prev_sample = prev_sample
-
-        # fill the sample window to analyze speech containing samples
-        # after each window fill the buffer advances by the hop length
-        # to produce an overlapping window
-        for sample in frame:
-            self.sample_window.write(sample)
-            if self.sample_window.is_full:
-                if context.is_active:
-                    self._analyze(context)
-                self.sample_window.rewind().seek(self.hop_length)
-
-    def _analyze(self, context: SpeechContext) -> None:
-        # read the full contents of the sample window to calculate a single frame
-        # of the STFT by applying the DFT to a real-valued input and
-        # taking the magnitude of the complex DFT
-        frame = self.sample_window.read_all()
-        frame = np.fft.rfft(frame * self._fft_window, n=self._window_size)
-        frame = np.abs(frame).astype(np.float32)
-
-        # compute mel spectrogram
-        self._filter(context, frame)
-
-    def _filter(self, context: SpeechContext, frame: np.ndarray) -> None:
-        # add the batch dimension and compute the mel spectrogram with filter model
-        frame = np.expand_dims(frame, 0)
-        frame = self.filter_model(frame)[0]
-
-        # advance the window by 1 and write mel frame to the frame buffer
-        self.frame_window.rewind().seek(1)
-        self.frame_window.write(frame)
-
-        # encode the mel spectrogram
-        self._encode(context)
+        # compute the magnitude STFT of each hop completed by the frame,
+        # sharing the spectra with other stages configured the same way
+        self.stft.update_shared(context, frame)
+        if context.is_active:
+            spectra = self.stft.magnitude(context)
+            if len(spectra):
+                self._filter(context, spectra)
+
+    def _filter(self, context: SpeechContext, frames: np.ndarray) -> None:
+        # compute the mel spectrogram of every hop in the frame
+        # with a single batch through the filter model
+        frames = self.filter_model.batch(frames)
+        for frame in frames:
+            # advance the window by 1 and write mel frame to the frame buffer
+            self.frame_window.rewind().seek(1)
+            self.frame_window.write(frame)
+
+            # encode the mel spectrogram
+            self._encode(context)
 
     def _encode(self, context: SpeechContext) -> None:
         # read the full contents of the frame window and add the batch dimension
         # run the encoder and save the output state for autoregression
         frame = self.frame_window.read_all()
-        frame = np.expand_dims(frame, 0)
-        frame, self.state = self.encode_model(frame, self.state)
+        if _has_tensors(self.encode_model):
+            # copy the window and state directly to and from the
+            # interpreter's buffers, rather than through new arrays
+            frame, state = self.encode_model.run(frame, self.state)
+            np.copyto(self.state, state)
+        else:
+            frame = np.expand_dims(frame, 0)
+            frame, self.state = self.encode_model(frame, self.state)
 
         # accumulate encoded samples until size of detection window
         self.encode_window.rewind().seek(1)
@@ -166,8 +214,11 @@ class KeywordRecognizer:
         # calculate a scalar likelihood that the frame contains a keyword
         # with the detect model
         frame = self.encode_window.read_all()
-        frame = np.expand_dims(frame, 0)
-        posterior = self.detect_model(frame)[0][0]
+        if _has_tensors(self.detect_model):
+            posterior = self.detect_model.run(frame)[0][0].copy()
+        else:
+            frame = np.expand_dims(frame, 0)
+            posterior = self.detect_model(frame)[0][0]
         class_index = np.argmax(posterior)
         confidence = posterior[class_index]
 
@@ -181,7 +232,7 @@ class KeywordRecognizer:
 
     def reset(self) -> None:
         """ Resets the current KeywordDetector state """
-        self.sample_window.reset()
+        self.stft.reset()
         self.frame_window.reset().fill(0.0)
         self.encode_window.reset().fill(-1.0)
         self.state[:] = 0.0
@@ -189,3 +240,14 @@ class KeywordRecognizer:
     def close(self) -> None:
         """ Close interface for use in the SpeechPipeline """
         self.reset()
+
+        # return shared models to the registry
+        if self._registry is not None:
+            for model in [self.filter_model, self.encode_model, self.detect_model]:
+                self._registry.release(model)
+            self._registry = None
+
+
+def _has_tensors(model: Any) -> bool:
+    # models such as the batched wrapper only support the copying interface
+    return hasattr(type(model), "run")
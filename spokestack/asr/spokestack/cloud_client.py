@@ -9,7 +9,9 @@ import json
 from typing import Any, Dict, List, Union
 
 import numpy as np
+import websockets
 from websocket import WebSocket
+from websockets.exceptions import ConnectionClosed
 
 
 class CloudClient:
@@ -196,6 +198,130 @@ class CloudClient:
         self._idle_count = value
 
 
+class AsyncCloudClient(CloudClient):
+    """Spokestack client for cloud based speech to text on an asyncio event loop
+
+    The socket is opened with an asyncio websocket client, so connecting,
+    sending audio and waiting on responses are all awaited on the event loop,
+    without blocking it or using executor threads.
+
+    Args:
+        key_id (str): identity from spokestack api credentials
+        key_secret (str): secret key from spokestack api credentials
+        socket_url (str): url for socket connection
+        audio_format (str): format of input audio
+        sample_rate (int): audio sample rate (kHz)
+        language (str): language for recognition
+        limit (int): Limit of messages per api response
+        idle_timeout (Any): Time before client timeout. Defaults to None
+    """
+
+    async def __call__(  # type: ignore[override]
+        self, audio: Union[bytes, np.ndarray], limit: int = 1
+    ) -> List[str]:
+        """Audio to text interface for the cloud client
+
+        Args:
+            audio (bytes|np.ndarray): input audio can be in the form of
+                                      bytes or np.float, np.int16 array with
+                                      conversions handled. other types with produce
+                                      a TypeError
+            limit (int): number of predictions to return
+
+        Returns: list of transcripts, and their confidence values of size limit
+
+        """
+        if isinstance(audio, bytes):
+            audio = np.frombuffer(audio, np.int16)
+        elif np.issubdtype(audio.dtype, np.floating):
+            # convert and rescale to PCM-16
+            audio = (audio * (2 ** 15 - 1)).astype(np.int16)
+        elif not np.issubdtype(audio.dtype, np.int16):
+            raise TypeError("invalid_audio")
+
+        chunk_size = self._sample_rate
+        await self.connect()
+        await self.initialize()
+
+        # responses queue up on the socket, so all of the audio is sent before
+        # they are read back in order
+        for i in range(0, len(audio), chunk_size):
+            await self.send(audio[i:][:chunk_size])
+        await self.end()
+        while not self._response["final"]:
+            if not await self.receive():
+                break
+        await self.disconnect()
+
+        hypotheses = self._response.get("hypotheses", [])
+        return hypotheses[:limit]
+
+    async def connect(self) -> None:  # type: ignore[override]
+        """ connects to websocket """
+        if self._socket is None:
+            self._socket = await websockets.connect(
+                f"{self._socket_url}/v1/asr/websocket"
+            )
+
+    async def initialize(self) -> None:  # type: ignore[override]
+        """ sends/receives the initial api request """
+        if not self._socket:
+            raise ConnectionError("Not Connected")
+
+        message = {
+            "keyId": self._key_id,
+            "signature": self._signature,
+            "body": self._body,
+        }
+        await self._socket.send(json.dumps(message))
+        self._response = json.loads(await self._socket.recv())
+        if not self._response["status"] == "ok":
+            raise APIError(self._response)
+
+    async def disconnect(self) -> None:  # type: ignore[override]
+        """ disconnects client socket connection """
+        if self._socket:
+            socket, self._socket = self._socket, None
+            await socket.close()
+
+    async def send(self, frame: np.ndarray) -> None:  # type: ignore[override]
+        """sends a single frame of audio
+
+        Args:
+            frame (np.ndarray): segment of PCM-16 encoded audio
+
+        """
+        if self._socket:
+            await self._socket.send(frame.tobytes())
+        else:
+            raise ConnectionError("Not Connected")
+
+    async def end(self) -> None:  # type: ignore[override]
+        """ sends empty string in binary to indicate last frame """
+        if self._socket:
+            await self._socket.send(b"")
+        else:
+            raise ConnectionError("Not Connected")
+
+    async def receive(self) -> bool:  # type: ignore[override]
+        """waits for the next api response
+
+        Returns: True if a response was received, or False if the server
+                 closed the connection
+
+        """
+        if self._socket:
+            try:
+                response = await self._socket.recv()
+            except ConnectionClosed:
+                self._socket = None
+                return False
+            self._response = json.loads(response)
+            return True
+        else:
+            raise ConnectionError("Not Connected")
+
+
 class APIError(Exception):
     """Spokestack api error pass through
 
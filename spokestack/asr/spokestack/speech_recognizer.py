@@ -2,13 +2,15 @@
 This module contains the recognizer for cloud based ASR in
 the speech pipeline
 """
+import asyncio
 import logging
-from typing import Any
+from typing import Any, Optional
 
 import numpy as np
 
-from spokestack.asr.spokestack.cloud_client import CloudClient
+from spokestack.asr.spokestack.cloud_client import AsyncCloudClient, CloudClient
 from spokestack.context import SpeechContext
+from spokestack.schedule import RUN_ALWAYS
 
 _LOG = logging.getLogger(__name__)
 
@@ -25,6 +27,9 @@ class CloudSpeechRecognizer:
         idle_timeout (int): the number of iterations before the connection times out
     """
 
+    # counts idle frames while inactive to time out the connection
+    schedule = RUN_ALWAYS
+
     def __init__(
         self,
         spokestack_id: str = "",
@@ -83,6 +88,9 @@ class CloudSpeechRecognizer:
 
     def _receive(self, context: SpeechContext) -> None:
         self._client.receive()
+        self._update(context)
+
+    def _update(self, context: SpeechContext) -> None:
         hypotheses = self._client.response.get("hypotheses")
         if hypotheses:
             hypothesis = hypotheses[0]
@@ -112,3 +120,124 @@ class CloudSpeechRecognizer:
     def close(self) -> None:
         """ closes client connection """
         self._client.disconnect()
+
+
+class AsyncCloudSpeechRecognizer(CloudSpeechRecognizer):
+    """Speech recognizer for use in the asyncio speech pipeline
+
+    The connection, audio and commit are sent through an asyncio websocket
+    client and awaited, so a slow socket only holds up its own pipeline. A
+    receiver task awaits responses as they arrive, rather than polling the
+    socket on every frame. Idle frames are counted from the end of speech,
+    including while the final response is outstanding, so that a hung
+    connection times out.
+
+    Args:
+        spokestack_id (str): identity under spokestack api credentials
+        spokestack_secret (str): secret key from spokestack api credentials
+        language (str): language recognized
+        sample_rate (int): audio sample rate (kHz)
+        frame_width (int): frame width of the audio (ms)
+        idle_timeout (int): the number of iterations before the connection times out
+    """
+
+    def __init__(
+        self,
+        spokestack_id: str = "",
+        spokestack_secret: str = "",
+        language: str = "en",
+        sample_rate: int = 16000,
+        frame_width: int = 20,
+        idle_timeout: int = 5000,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__()
+        self._client: AsyncCloudClient = AsyncCloudClient(
+            key_id=spokestack_id,
+            key_secret=spokestack_secret,
+            language=language,
+            sample_rate=sample_rate,
+            idle_timeout=int(idle_timeout / frame_width),
+        )
+        self._receiver: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Task] = None
+
+    async def __call__(  # type: ignore[override]
+        self, context: SpeechContext, frame: np.ndarray
+    ) -> None:
+        """Entry point of the recognizer
+
+        Args:
+            context (SpeechContext): current state of the speech pipeline
+            frame (np.ndarray): single frame of audio
+
+        """
+        if context.is_active and not self._is_active:
+            await self._begin(context)
+            await self._client.send(frame)
+            _LOG.debug("ready for speech")
+        elif context.is_active:
+            await self._client.send(frame)
+        elif self._is_active:
+            self._is_active = False
+            await self._client.end()
+            _LOG.debug("end speech")
+        elif not self._client.is_connected:
+            pass
+        elif self._client.idle_count < self._client.idle_timeout:
+            self._client.idle_count += 1
+        else:
+            await self.disconnect()
+
+    async def _begin(self, context: SpeechContext) -> None:  # type: ignore[override]
+        # the handshake response is read before the receiver takes the socket
+        await self._cancel()
+        await self._client.connect()
+        await self._client.initialize()
+        self._is_active = True
+        self._client.idle_count = 0
+        self._receiver = asyncio.ensure_future(self._receive(context))
+
+    async def _receive(self, context: SpeechContext) -> None:  # type: ignore
+        # handle each response as it arrives, until the connection closes
+        while await self._client.receive():
+            self._update(context)
+
+    async def disconnect(self) -> None:
+        """ stops receiving and closes the client connection """
+        await self._cancel()
+        await self._client.disconnect()
+
+    async def _cancel(self) -> None:
+        receiver, self._receiver = self._receiver, None
+        if receiver is not None:
+            receiver.cancel()
+            try:
+                await receiver
+            except asyncio.CancelledError:
+                pass
+
+    def reset(self) -> None:
+        """ resets client connection """
+        self._client.idle_count = 0
+        self._is_active = False
+        self.close()
+
+    def close(self) -> None:
+        """closes client connection
+
+        The connection is closed by a task on the running event loop. Without
+        a running loop, the loop that owned the connection has already been
+        closed along with it.
+        """
+        self._is_active = False
+        if self._receiver is not None:
+            self._receiver.cancel()
+            self._receiver = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._client._socket = None
+            return
+        if self._client.is_connected:
+            self._closing = loop.create_task(self._client.disconnect())
@@ -0,0 +1,193 @@
+"""
+This module contains a runner that processes recorded audio files with a
+speech pipeline, faster than real time, across a pool of processes.
+
+Example:
+    This example runs VAD and wakeword detection over a directory of call
+    recordings, writes the events for each file as JSON lines, and logs how
+    much faster than real time the directory was processed. The stage
+    factory must be a module level function so that it can be sent to the
+    worker processes. ::
+
+        import logging
+
+        from spokestack.batch import process_directory
+        from spokestack.vad.webrtc import VoiceActivityDetector
+        from spokestack.wakeword.tflite import WakewordTrigger
+
+        def create_stages():
+            return [
+                VoiceActivityDetector(),
+                WakewordTrigger(model_dir="path_to_wakeword_model"),
+            ]
+
+        if __name__ == "__main__":
+            stats = process_directory("recordings", create_stages, "events.jsonl")
+            logging.info("realtime factor: %.1f", stats["realtime_factor"])
+
+"""
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from spokestack.context import SpeechContext
+from spokestack.io.file import FileInput
+from spokestack.pipeline import SpeechPipeline
+
+EVENTS = ("activate", "deactivate", "recognize", "timeout")
+
+_worker_stages: List[Any] = []
+
+
+def process_file(
+    path: str,
+    stages: List[Any],
+    sample_rate: int = 16000,
+    frame_width: int = 20,
+    block_size: int = 1,
+) -> Tuple[List[Dict[str, Any]], float]:
+    """Runs a speech pipeline over a single audio file
+
+    The stages are reset after the file is processed rather than closed, so
+    that they can be reused for the next file. Once the file is exhausted the
+    pipeline is deactivated and stepped once more, so that recognizers
+    complete any utterance that runs to the end of the file.
+
+    Args:
+        path (str): path to a WAV or raw PCM-16 file
+        stages (List[Any]): components of the pipeline
+        sample_rate (int): sample rate of the audio (Hz)
+        frame_width (int): width of the audio frame (ms)
+        block_size (int): number of frames processed per pipeline step
+
+    Returns: the events raised while processing the file, and the duration
+             of the file (s). Each event records the file, the event name,
+             and the offset into the file (s), along with the transcript and
+             confidence for recognize events.
+
+    """
+    input_source = FileInput(path, sample_rate=sample_rate, frame_width=frame_width)
+    duration = input_source.duration
+    clock = _FrameClock()
+    pipeline = SpeechPipeline(input_source, stages + [clock], block_size=block_size)
+
+    events: List[Dict[str, Any]] = []
+
+    def record(name: str) -> Callable[[SpeechContext], None]:
+        def handler(context: SpeechContext) -> None:
+            event: Dict[str, Any] = {
+                "file": path,
+                "event": name,
+                "time": clock.frames * frame_width / 1000,
+            }
+            if name == "recognize":
+                event["transcript"] = context.transcript
+                event["confidence"] = float(context.confidence)
+            events.append(event)
+
+        return handler
+
+    for name in EVENTS:
+        pipeline.event(record(name), name=name)
+
+    try:
+        pipeline.start()
+        while not input_source.is_exhausted:
+            pipeline.step()
+        pipeline.deactivate()
+        pipeline.step()
+    finally:
+        for stage in stages:
+            if hasattr(stage, "reset"):
+                stage.reset()
+        input_source.close()
+
+    return events, duration
+
+
+def process_directory(
+    directory: str,
+    create_stages: Callable[[], List[Any]],
+    output_path: str,
+    pattern: str = "*.wav",
+    max_workers: Optional[int] = None,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """Processes every matching file in a directory across a process pool
+
+    Each worker process builds its stages once and reuses them for every file
+    it is given. Events are written to the output file as JSON lines, grouped
+    by file in the order the files were found. A file that cannot be processed
+    is recorded as an ``error`` event rather than stopping the run.
+
+    Args:
+        directory (str): directory containing the audio files
+        create_stages (Callable[[], List[Any]]): picklable factory that returns
+                                                 the stages for a worker
+        output_path (str): path of the JSON lines file to write
+        pattern (str): glob pattern selecting the files to process
+        max_workers (int): number of worker processes, or None for one per CPU
+        **kwargs: additional keyword arguments passed to :func:`process_file`
+
+    Returns: dictionary containing the number of files processed, the number
+             of files that failed, the total audio duration (s), the wall time
+             (s), and the resulting multiple of real time
+
+    """
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+
+    start = time.perf_counter()
+    duration = 0.0
+    errors = 0
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_initialize_worker,
+        initargs=(create_stages,),
+    ) as executor, open(output_path, "w") as output:
+        for path, (events, length) in zip(
+            paths, executor.map(_process_worker, paths, [kwargs] * len(paths))
+        ):
+            if length is None:
+                errors += 1
+            else:
+                duration += length
+            for event in events:
+                output.write(json.dumps(event) + "\n")
+    elapsed = time.perf_counter() - start
+
+    return {
+        "files": len(paths),
+        "errors": errors,
+        "duration": duration,
+        "elapsed": elapsed,
+        "realtime_factor": duration / elapsed if elapsed else 0.0,
+    }
+
+
+class _FrameClock:
+    # counts frames as the last stage of the pipeline, so events raised by
+    # earlier stages see the index of the frame being processed
+    def __init__(self) -> None:
+        self.frames = 0
+
+    def __call__(self, context: SpeechContext, frame: Any) -> None:
+        self.frames += 1
+
+    def close(self) -> None:
+        pass
+
+
+def _initialize_worker(create_stages: Callable[[], List[Any]]) -> None:
+    _worker_stages[:] = create_stages()
+
+
+def _process_worker(
+    path: str, kwargs: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+    try:
+        return process_file(path, _worker_stages, **kwargs)
+    except Exception as e:
+        return [{"file": path, "event": "error", "error": str(e)}], None
@@ -3,7 +3,7 @@ This module contains a context class to manage
 state between members of the processing pipeline
 """
 import logging
-from typing import Callable
+from typing import Any, Callable, Dict, Hashable
 
 
 _LOG = logging.getLogger(__name__)
@@ -18,6 +18,8 @@ class SpeechContext:
         self._transcript: str = ""
         self._confidence: float = 0.0
         self._handlers: dict = {}
+        self._features: Dict[Hashable, Any] = {}
+        self._frame_index: int = 0
 
     def add_handler(self, name: str, function: Callable) -> None:
         """Adds a handler to the context
@@ -120,8 +122,38 @@ class SpeechContext:
         """
         self._confidence = value
 
+    @property
+    def features(self) -> Dict[Hashable, Any]:
+        """Features computed from the current frame, shared between stages
+
+        The pipeline clears the features before each frame, with
+        :meth:`next_frame`, so a stage can publish features under a key
+        describing how they were computed, and later stages configured the
+        same way can reuse them.
+
+        Returns:
+            dict: features published for the current frame, by key
+        """
+        return self._features
+
+    @property
+    def frame_index(self) -> int:
+        """Index of the current frame in the stream
+
+        Returns:
+            int: number of frames the pipeline has advanced through
+        """
+        return self._frame_index
+
+    def next_frame(self) -> None:
+        """ Advances to the next frame, clearing the last frame's features """
+        if self._features:
+            self._features.clear()
+        self._frame_index += 1
+
     def reset(self) -> None:
         """Resets the context state"""
+        self._features.clear()
         self.is_speech = False
         self.is_active = False
         self.transcript = ""
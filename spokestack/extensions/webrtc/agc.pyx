@@ -51,6 +51,11 @@ cdef class WebRtcAgc:
     def __call__(self, frame):
         self._process(frame)
 
+    def process_block(self, frames):
+        cdef Py_ssize_t i
+        for i in range(frames.shape[0]):
+            self._process(frames[i])
+
     cdef _process(self, frame):
         cdef char saturated = 0
         cdef int mic_level = 0
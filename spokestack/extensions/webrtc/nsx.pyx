@@ -34,6 +34,11 @@ cdef class WebRtcNsx:
     def __call__(self, frame):
         self._process(frame)
 
+    def process_block(self, frames):
+        cdef Py_ssize_t i
+        for i in range(frames.shape[0]):
+            self._process(frames[i])
+
     cdef _process(self, frame):
         result = cnsx.WebRtcNsx_Process(self._ans,
                                         <short*> np.PyArray_DATA(frame),
@@ -0,0 +1,204 @@
+"""
+This module contains the streaming STFT front end shared by the TFLite
+wakeword and keyword detectors.
+"""
+from typing import Hashable, List, Optional
+
+import numpy as np
+
+from spokestack.context import SpeechContext
+
+
+class StreamingSTFT:
+    """Computes the magnitude STFT of a stream of audio frames
+
+    Each frame of PCM-16 audio is scaled to (-1.0, 1.0), pre-emphasized, and
+    appended to a sample history. Every complete window in the history is
+    then taken as a strided view, so that all of the hops within a frame are
+    windowed and transformed with a single batched ``rfft``. Windows overlap
+    by ``window_size - hop_length`` samples, and the first window is produced
+    once ``window_size`` samples have been received after a reset.
+
+    The transform itself is computed lazily by :meth:`magnitude`, so that a
+    stage can advance the stream on frames that it does not analyze for the
+    cost of the scaling and pre-emphasis alone.
+
+    Stages that each own a StreamingSTFT can share the transform through the
+    pipeline's context with :meth:`update_shared`. Only the magnitude of each
+    window is shared, never the sample history, so that each stage keeps and
+    resets its own history.
+
+    Args:
+        window_size (int): length of the FFT window (samples)
+        hop_length (int): number of samples between consecutive windows
+        pre_emphasis (float): coefficient of the pre-emphasis filter
+    """
+
+    def __init__(
+        self, window_size: int, hop_length: int, pre_emphasis: float = 0.0
+    ) -> None:
+        self.window_size = window_size
+        self.hop_length = hop_length
+        self.pre_emphasis = pre_emphasis
+        self._window = np.hanning(window_size)
+
+        self._samples = np.zeros(window_size, np.float32)
+        self._scaled = np.zeros(0, np.float32)
+        self._frames = np.zeros((0, window_size), np.float64)
+        self._magnitude = np.zeros((0, window_size // 2 + 1), np.float32)
+        self._length = 0
+        self._count = 0
+        self._is_computed = True
+        self._prev_sample: float = 0.0
+
+        # stream positions (samples) used to identify the shared windows
+        self._received = 0
+        self._shared_from = 0
+        self._frame_index: Optional[int] = None
+        self._keys: List[Optional[Hashable]] = []
+
+    @property
+    def key(self) -> Hashable:
+        """ Configuration that determines the features, used to share them """
+        return (self.window_size, self.hop_length, self.pre_emphasis)
+
+    def update(self, frame: np.ndarray) -> None:
+        """Appends a frame of audio to the stream
+
+        Args:
+            frame (np.ndarray): a single frame of PCM-16 audio
+
+        """
+        size = len(frame)
+        self._reserve(size)
+
+        # convert the PCM-16 audio to float32 in (-1.0, 1.0)
+        scaled = self._scaled[:size]
+        np.divide(frame, 2 ** 15 - 1, out=scaled, dtype=np.float32)
+        np.clip(scaled, -1.0, 1.0, out=scaled)
+
+        # apply pre-emphasis with the previous sample, writing the
+        # result directly into the sample history
+        samples = self._samples[self._length : self._length + size]
+        np.multiply(scaled[:-1], self.pre_emphasis, out=samples[1:])
+        np.subtract(scaled[1:], samples[1:], out=samples[1:])
+        samples[0] = scaled[0] - self.pre_emphasis * self._prev_sample
+        self._prev_sample = scaled[-1]
+        self._length += size
+        self._received += size
+        self._keys = []
+
+        # window every complete hop in the history with a strided view
+        self._count = 0
+        if self._length >= self.window_size:
+            self._count = (self._length - self.window_size) // self.hop_length + 1
+            stride = self._samples.strides[0]
+            windows = np.lib.stride_tricks.as_strided(
+                self._samples,
+                shape=(self._count, self.window_size),
+                strides=(self.hop_length * stride, stride),
+                writeable=False,
+            )
+            np.multiply(windows, self._window, out=self._frames[: self._count])
+
+            # keep the samples that begin the next window
+            consumed = self._count * self.hop_length
+            self._samples[: self._length - consumed] = self._samples[
+                consumed : self._length
+            ]
+            self._length -= consumed
+        self._is_computed = False
+
+    def magnitude(self, context: Optional[SpeechContext] = None) -> np.ndarray:
+        """Computes the magnitude spectra of the windows completed by the
+        last update
+
+        Args:
+            context (SpeechContext): the current state of the pipeline, when
+                                     the last update was made with
+                                     :meth:`update_shared`, to reuse and
+                                     publish the magnitude of each window
+
+        Returns: array with one row of ``window_size // 2 + 1`` bins for each
+                 completed window, which is only valid until the next update
+
+        """
+        magnitude = self._magnitude[: self._count]
+        if self._is_computed or not self._count:
+            return magnitude
+        self._is_computed = True
+
+        # copy the windows already published by another stage, and only
+        # transform the rest, publishing them in turn
+        shared = context.features if context is not None else {}
+        keys = self._keys or [None] * self._count
+        missing = []
+        for i, key in enumerate(keys):
+            if key is not None and key in shared:
+                magnitude[i] = shared[key]
+            else:
+                missing.append(i)
+
+        if len(missing) == self._count:
+            spectrum = np.fft.rfft(self._frames[: self._count], axis=-1)
+            np.abs(spectrum, out=magnitude)
+        elif missing:
+            spectrum = np.fft.rfft(self._frames[missing], axis=-1)
+            magnitude[missing] = np.abs(spectrum)
+
+        for i in missing:
+            if keys[i] is not None:
+                shared[keys[i]] = magnitude[i]
+        return magnitude
+
+    def update_shared(self, context: SpeechContext, frame: np.ndarray) -> None:
+        """Appends a frame of audio to the stream, identifying its windows so
+        that stages configured the same way transform each window once
+
+        Each window completed by the frame is identified by this STFT's key,
+        the index of the frame, and where the window ends within the frame.
+        Windows are only identified when this STFT received every frame since
+        the first of their samples, so that the windows of stages that skip
+        frames or reset their history at different times are never mixed.
+        The magnitude of the identified windows is then shared by passing the
+        context to :meth:`magnitude`.
+
+        Args:
+            context (SpeechContext): the current state of the pipeline
+            frame (np.ndarray): a single frame of PCM-16 audio
+
+        """
+        # after a skipped frame, the history and the pre-emphasis of the
+        # next sample depend on audio that other stages may not have seen
+        index = context.frame_index
+        if self._frame_index is None or index != self._frame_index + 1:
+            self._shared_from = self._received + 1
+        self._frame_index = index
+
+        received = self._received
+        start = received - self._length
+        self.update(frame)
+        for i in range(self._count):
+            begin = start + i * self.hop_length
+            if begin >= self._shared_from:
+                end = begin + self.window_size - received
+                self._keys.append((self.key, index, end))
+            else:
+                self._keys.append(None)
+
+    def reset(self) -> None:
+        """ Discards the sample history """
+        self._length = 0
+        self._count = 0
+
+    def _reserve(self, size: int) -> None:
+        # grow the preallocated buffers to fit a frame of the given size
+        if self._length + size > len(self._samples):
+            samples = np.zeros(self.window_size + size, np.float32)
+            samples[: self._length] = self._samples[: self._length]
+            self._samples = samples
+        if size > len(self._scaled):
+            self._scaled = np.zeros(size, np.float32)
+            hops = (self.window_size + size) // self.hop_length + 1
+            self._frames = np.zeros((hops, self.window_size), np.float64)
+            self._magnitude = np.zeros((hops, self.window_size // 2 + 1), np.float32)
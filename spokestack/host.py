@@ -0,0 +1,184 @@
+"""
+This module contains a host that runs many speech pipelines in a single
+process, sharing loaded models between them.
+
+Example:
+    This example shares one set of wakeword models between every stream. Each
+    stream gets its own VAD, trigger state, and activation timeout. ::
+
+        from spokestack.activation_timeout import ActivationTimeout
+        from spokestack.host import SpeechPipelineHost
+        from spokestack.vad.webrtc import VoiceActivityDetector
+        from spokestack.wakeword.tflite import WakewordTrigger
+
+        wakeword = WakewordTrigger(model_dir="path_to_wakeword_model")
+
+        host = SpeechPipelineHost(
+            lambda: [VoiceActivityDetector(), wakeword.clone(), ActivationTimeout()]
+        )
+        host.add("call-1", first_input)
+        host.add("call-2", second_input)
+        host.run()
+
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+from spokestack.models.batched import BatchedModel
+from spokestack.pipeline import SpeechPipeline
+
+
+class SpeechPipelineHost:
+    """Runs a collection of speech pipelines on a single thread.
+
+    Each stream gets its own :class:`~spokestack.pipeline.SpeechPipeline` and
+    context, built from the stages returned by ``create_stages``. Model based
+    stages should be cloned from a single template instance within the
+    factory so that the read-only models are loaded once per host and only
+    the per-stream buffers are allocated for each new stream.
+
+    Because the shared models are not thread safe, a host steps all of its
+    pipelines from the thread that calls :meth:`step` or :meth:`run`. Input
+    sources should return a frame without waiting on a device, for example by
+    reading from a buffer filled by a media server.
+
+    When the shared models are wrapped in
+    :class:`~spokestack.models.batched.BatchedModel` instances without a
+    deadline, and passed to the host as ``models``, each step instead runs
+    the pipelines on worker threads. Once every pipeline is either finished
+    or waiting on one of the models, the host flushes the models, so that
+    the requests of all streams run as one batch without waiting out a
+    deadline. Every model shared by the stages must then be one of the
+    batched models.
+
+    Args:
+        create_stages (Callable[[], List[Any]]): factory that returns the
+                                                 stages for a new stream
+        models (List[BatchedModel]): batched models shared by the stages,
+                                     which the host flushes on each step
+    """
+
+    def __init__(
+        self,
+        create_stages: Callable[[], List[Any]],
+        models: Optional[List[BatchedModel]] = None,
+    ) -> None:
+        self._create_stages = create_stages
+        self._pipelines: Dict[Hashable, SpeechPipeline] = {}
+        self._is_running = False
+
+        self._models = models or []
+        self._ready = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._workers = 0
+        for model in self._models:
+            model.add_listener(self._notify)
+
+    def add(self, key: Hashable, input_source: Any) -> SpeechPipeline:
+        """Adds and starts a pipeline for a new stream
+
+        Args:
+            key (Hashable): unique identifier of the stream
+            input_source (Any): source of audio input for the stream
+
+        Returns: the pipeline created for the stream, which can be used
+                 to register event handlers
+
+        """
+        if key in self._pipelines:
+            raise ValueError("duplicate_stream")
+
+        pipeline = SpeechPipeline(input_source, self._create_stages())
+        pipeline.start()
+        self._pipelines[key] = pipeline
+        return pipeline
+
+    def remove(self, key: Hashable) -> None:
+        """Closes and removes the pipeline for a stream
+
+        Args:
+            key (Hashable): identifier of the stream to remove
+
+        """
+        self._pipelines.pop(key).close()
+
+    def step(self) -> None:
+        """ Processes a single frame for every running pipeline """
+        pipelines = [p for p in self._pipelines.values() if p.is_running]
+        if not self._models:
+            for pipeline in pipelines:
+                pipeline.step()
+            return
+
+        executor = self._reserve(len(pipelines))
+        steps = [executor.submit(pipeline.step) for pipeline in pipelines]
+        for step in steps:
+            step.add_done_callback(self._notify)
+        with self._ready:
+            while True:
+                done = sum(step.done() for step in steps)
+                if done == len(steps):
+                    break
+
+                # flush once every unfinished stream is waiting on a model
+                pending = sum(model.pending for model in self._models)
+                if done + pending < len(steps):
+                    self._ready.wait()
+                    continue
+                for model in self._models:
+                    model.flush()
+
+        # raise the first error from any of the pipelines
+        for step in steps:
+            step.result()
+
+    def run(self) -> None:
+        """ Steps all pipelines until stop is called """
+        self._is_running = True
+        while self._is_running:
+            self.step()
+
+    def stop(self) -> None:
+        """ Halts the run loop, leaving the pipelines open """
+        self._is_running = False
+
+    def close(self) -> None:
+        """ Stops the host and closes every pipeline """
+        self.stop()
+        for key in list(self._pipelines):
+            self.remove(key)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @property
+    def is_running(self) -> bool:
+        """ State of the host run loop """
+        return self._is_running
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pipelines
+
+    def __getitem__(self, key: Hashable) -> SpeechPipeline:
+        return self._pipelines[key]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._pipelines)
+
+    def __len__(self) -> int:
+        return len(self._pipelines)
+
+    def _reserve(self, count: int) -> ThreadPoolExecutor:
+        # every stream needs its own worker, since all of them may be
+        # waiting on a flush at the same time
+        if self._executor is None or count > self._workers:
+            if self._executor is not None:
+                self._executor.shutdown()
+            self._workers = max(count, 2 * self._workers)
+            self._executor = ThreadPoolExecutor(self._workers)
+        return self._executor
+
+    def _notify(self, *_args: Any) -> None:
+        with self._ready:
+            self._ready.notify()
@@ -0,0 +1,209 @@
+"""
+This module contains an input source wrapper that captures audio on a
+dedicated thread, so that slow pipeline stages do not stall the device.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+OVERFLOW_DROP_OLDEST = "drop-oldest"
+OVERFLOW_DROP_NEWEST = "drop-newest"
+OVERFLOW_BLOCK = "block"
+
+_POLICIES = {OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_BLOCK}
+_WAIT_TIMEOUT = 0.1
+
+
+class CaptureThread:
+    """Reads frames from an input source on a dedicated thread
+
+    Frames are captured into a bounded queue which the pipeline drains through
+    :meth:`read`. When the pipeline falls behind and the queue fills, the
+    overflow policy decides what happens to the next captured frame:
+
+    - OVERFLOW_DROP_OLDEST: discard the oldest queued frame
+    - OVERFLOW_DROP_NEWEST: discard the newly captured frame
+    - OVERFLOW_BLOCK: stop capturing until the pipeline reads a frame
+
+    The queue and its overflow counters are guarded by a lock that is only
+    held to pass a frame, and events are used to wake a waiting reader or
+    capture thread.
+
+    Args:
+        input_source (Any): source of audio input, such as PyAudioInput
+        max_frames (int): capacity of the frame queue
+        overflow_policy (str): one of the OVERFLOW_* policies
+        sample_rate (int): sample rate of the audio (Hz)
+        frame_width (int): width of the audio frame (ms)
+    """
+
+    def __init__(
+        self,
+        input_source: Any,
+        max_frames: int = 50,
+        overflow_policy: str = OVERFLOW_DROP_OLDEST,
+        sample_rate: int = 16000,
+        frame_width: int = 20,
+    ) -> None:
+        if max_frames < 1:
+            raise ValueError("invalid_max_frames")
+        if overflow_policy not in _POLICIES:
+            raise ValueError("invalid_overflow_policy")
+
+        self._input_source = input_source
+        self._max_frames = max_frames
+        self._policy = overflow_policy
+        self._queue: Deque[Tuple[float, np.ndarray]] = deque(
+            maxlen=max_frames if overflow_policy == OVERFLOW_DROP_OLDEST else None
+        )
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._space = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._is_running = False
+        self._silence = np.zeros(sample_rate * frame_width // 1000, np.int16)
+        self._error: Optional[BaseException] = None
+
+        self._captured = 0
+        self._dropped = 0
+        self._max_depth = 0
+        self._pending: Optional[float] = None
+        self._lag = 0.0
+        self._max_lag = 0.0
+        self._total_lag = 0.0
+        self._processed = 0
+
+    def _capture(self) -> None:
+        while self._is_running:
+            try:
+                frame = self._input_source.read()
+            except Exception as error:
+                # stop capturing, and hand the error to the reader
+                self._error = error
+                self._is_running = False
+                self._ready.set()
+                return
+            timestamp = time.monotonic()
+            self._captured += 1
+
+            if self._policy == OVERFLOW_BLOCK:
+                while self._is_running and len(self._queue) >= self._max_frames:
+                    self._space.wait(_WAIT_TIMEOUT)
+                    self._space.clear()
+
+            with self._lock:
+                if len(self._queue) >= self._max_frames:
+                    if self._policy == OVERFLOW_DROP_NEWEST:
+                        self._dropped += 1
+                        continue
+                    if self._policy == OVERFLOW_DROP_OLDEST:
+                        # the bounded deque discards the oldest frame on append
+                        self._dropped += 1
+                self._queue.append((timestamp, frame))
+                self._max_depth = max(self._max_depth, len(self._queue))
+            self._ready.set()
+
+    def read(self) -> np.ndarray:
+        """Reads the oldest captured frame, waiting for one if necessary
+
+        If capture has been stopped and no frames remain, a silent frame
+        is returned so that a pipeline stepping after a stop does not block.
+        If capture stopped because the input source raised an error, the
+        error is raised instead, once the frames captured before it have
+        been read.
+
+        Returns:
+            np.ndarray: single frame of audio from the input source
+        """
+        self._update_lag()
+        while True:
+            with self._lock:
+                item = self._queue.popleft() if self._queue else None
+            if item is not None:
+                break
+            if not self._is_running:
+                if self._queue:
+                    continue
+                if self._error is not None:
+                    error, self._error = self._error, None
+                    raise error
+                return self._silence
+            self._ready.wait(_WAIT_TIMEOUT)
+            self._ready.clear()
+
+        self._space.set()
+        self._pending, frame = item
+        return frame
+
+    def _update_lag(self) -> None:
+        # the pipeline reads the next frame once it has finished processing
+        # the previous one, which completes that frame's end-to-end lag
+        if self._pending is not None:
+            self._lag = time.monotonic() - self._pending
+            self._max_lag = max(self._max_lag, self._lag)
+            self._total_lag += self._lag
+            self._processed += 1
+            self._pending = None
+
+    def start(self) -> None:
+        """ Starts the input source and the capture thread """
+        if self._is_running:
+            return
+        self._input_source.start()
+        self._is_running = True
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """ Stops the capture thread and the input source """
+        self._is_running = False
+        self._space.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._input_source.stop()
+
+    def close(self) -> None:
+        """ Stops capturing and closes the input source """
+        self.stop()
+        self._queue.clear()
+        self._input_source.close()
+
+    @property
+    def depth(self) -> int:
+        """ Number of captured frames waiting to be processed """
+        return len(self._queue)
+
+    @property
+    def dropped(self) -> int:
+        """ Number of captured frames discarded due to overflow """
+        return self._dropped
+
+    @property
+    def lag(self) -> float:
+        """ Time from capture until processing completed for the last frame (s) """
+        return self._lag
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Capture counters for sizing the pipeline's hardware
+
+        Returns: dictionary of frame counts, queue depths, and lags (s)
+        """
+        return {
+            "captured": self._captured,
+            "dropped": self._dropped,
+            "depth": len(self._queue),
+            "max_depth": self._max_depth,
+            "lag": self._lag,
+            "max_lag": self._max_lag,
+            "mean_lag": self._total_lag / self._processed if self._processed else 0.0,
+        }
+
+    @property
+    def is_active(self) -> bool:
+        """ State of the capture thread """
+        return self._is_running
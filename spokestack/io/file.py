@@ -0,0 +1,143 @@
+"""
+This module contains an input source that reads audio from WAV or raw PCM
+files, for processing recordings faster than real time.
+"""
+import os
+import struct
+from typing import Any, Tuple
+
+import numpy as np
+
+
+class FileInput:
+    """Reads frames of audio from a file
+
+    The file is memory mapped rather than read into memory, so only the pages
+    that have been processed are loaded, and frames are returned as views of
+    the mapping. The mapping is copy-on-write, so stages that modify frames in
+    place (such as AGC) do not change the file.
+
+    Reads return immediately rather than waiting for real time. Once the end
+    of the file is reached, the final frame is padded with zeros, subsequent
+    reads return silence, and :attr:`is_exhausted` is set.
+
+    Files ending in ``.wav`` must contain mono PCM-16 audio at the configured
+    sample rate. Any other file is treated as headerless little-endian mono
+    PCM-16 audio.
+
+    Args:
+        path (str): path to the audio file
+        sample_rate (int): sample rate of the audio (Hz)
+        frame_width (int): width of the audio frame (ms)
+    """
+
+    def __init__(
+        self, path: str, sample_rate: int = 16000, frame_width: int = 20, **kwargs: Any
+    ) -> None:
+        self._path = path
+        self._sample_rate = sample_rate
+        self._frame_size = sample_rate * frame_width // 1000
+
+        if path.lower().endswith(".wav"):
+            offset, size = _wav_data(path, sample_rate)
+        else:
+            offset, size = 0, os.path.getsize(path)
+
+        # numpy cannot map an empty region of a file
+        self._samples: Any = np.zeros(0, np.int16)
+        if size >= 2:
+            self._samples = np.memmap(
+                path, dtype="<i2", mode="c", offset=offset, shape=(size // 2,)
+            )
+        self._position = 0
+
+    def read(self) -> np.ndarray:
+        """Reads a single frame of audio
+
+        Returns:
+            np.ndarray: single frame of PCM-16 audio
+        """
+        return self._next(self._frame_size)
+
+    def read_block(self, count: int) -> np.ndarray:
+        """Reads a block of consecutive frames
+
+        Args:
+            count (int): number of frames to read
+
+        Returns:
+            np.ndarray: PCM-16 audio with one frame per row
+        """
+        return self._next(count * self._frame_size).reshape(count, self._frame_size)
+
+    def _next(self, length: int) -> np.ndarray:
+        start = self._position
+        self._position = min(start + length, len(self._samples))
+        samples = self._samples[start : self._position]
+        if len(samples) < length:
+            samples = np.pad(samples, (0, length - len(samples)))
+        return samples
+
+    def start(self) -> None:
+        """ Method for input source compliance """
+        pass
+
+    def stop(self) -> None:
+        """ Method for input source compliance """
+        pass
+
+    def close(self) -> None:
+        """ Releases the file mapping """
+        self._samples = np.zeros(0, np.int16)
+        self._position = 0
+
+    @property
+    def duration(self) -> float:
+        """ Length of the audio in the file (s) """
+        return len(self._samples) / self._sample_rate
+
+    @property
+    def position(self) -> float:
+        """ Length of the audio read so far (s) """
+        return self._position / self._sample_rate
+
+    @property
+    def is_exhausted(self) -> bool:
+        """ Whether all of the audio in the file has been read """
+        return self._position >= len(self._samples)
+
+
+def _wav_data(path: str, sample_rate: int) -> Tuple[int, int]:
+    # walk the RIFF chunks to validate the format and locate the samples
+    with open(path, "rb") as file:
+        header = file.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:] != b"WAVE":
+            raise ValueError("invalid_wav")
+
+        has_format = False
+        while True:
+            header = file.read(8)
+            if len(header) < 8:
+                raise ValueError("invalid_wav")
+            chunk, size = struct.unpack("<4sI", header)
+            if chunk == b"fmt ":
+                encoding, channels, rate, _, _, bits = struct.unpack(
+                    "<HHIIHH", file.read(16)
+                )
+                if encoding != 1 or bits != 16:
+                    raise ValueError("invalid_encoding")
+                if channels != 1:
+                    raise ValueError("invalid_channels")
+                if rate != sample_rate:
+                    raise ValueError("invalid_sample_rate")
+                has_format = True
+                file.seek(size - 16 + size % 2, 1)
+            elif chunk == b"data":
+                if not has_format:
+                    raise ValueError("invalid_wav")
+                # truncated recordings report more data than the file holds
+                offset = file.tell()
+                available = file.seek(0, 2) - offset
+                return offset, min(size, available) // 2 * 2
+            else:
+                file.seek(size + size % 2, 1)
@@ -48,6 +48,21 @@ class PyAudioInput:
         )
         return np.frombuffer(frame, np.int16)
 
+    def read_block(self, count: int) -> np.ndarray:
+        """Reads a block of consecutive frames with a single device read
+
+        Args:
+            count (int): number of frames to read
+
+        Returns:
+            np.ndarray: PCM-16 audio with one frame per row
+        """
+        block = self._stream.read(
+            self._frame_size * count,
+            exception_on_overflow=self._exception_on_overflow,
+        )
+        return np.frombuffer(block, np.int16).reshape(count, self._frame_size)
+
     def start(self) -> None:
         """ Starts the audio stream """
         self._stream.start_stream()
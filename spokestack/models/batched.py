@@ -0,0 +1,291 @@
+"""
+This module contains a model wrapper that batches inference requests from
+many streams into a single invocation.
+
+Example:
+    This example shares batched wakeword models between streams that each run
+    their pipeline on their own thread. Requests that arrive within 2ms of each
+    other are run as one batch, including the recurrent state of the encoder.
+    ::
+
+        import threading
+
+        from spokestack.models.batched import BatchedModel
+        from spokestack.pipeline import SpeechPipeline
+        from spokestack.wakeword.tflite import WakewordTrigger
+
+        wakeword = WakewordTrigger(model_dir="path_to_wakeword_model")
+        for name in ["filter_model", "encode_model", "detect_model"]:
+            model = getattr(wakeword, name)
+            setattr(wakeword, name, BatchedModel(model, deadline=0.002))
+
+        for input_source in call_inputs:
+            pipeline = SpeechPipeline(input_source, [wakeword.clone()])
+            threading.Thread(target=pipeline.run).start()
+
+    Streams run by a :class:`~spokestack.host.SpeechPipelineHost` should
+    instead use models without a deadline, which the host flushes once every
+    stream is waiting on a result. ::
+
+        from spokestack.host import SpeechPipelineHost
+
+        models = []
+        for name in ["filter_model", "encode_model", "detect_model"]:
+            model = BatchedModel(getattr(wakeword, name), deadline=None)
+            setattr(wakeword, name, model)
+            models.append(model)
+
+        host = SpeechPipelineHost(lambda: [wakeword.clone()], models=models)
+
+"""
+import copy
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_Request = Tuple[Tuple[np.ndarray, ...], "Future[List[np.ndarray]]"]
+
+
+class BatchedModel:
+    """Runs requests from many threads through a model in batches
+
+    Each call submits its inputs to a worker thread and waits for the result.
+    The worker gathers the requests that arrive within ``deadline`` of the
+    first pending request, up to ``max_batch_size``, stacks each input along
+    the batch dimension, runs a single invocation, and splits the outputs
+    back to the callers. All interpreter calls happen on the worker thread,
+    so the wrapped model can be shared by streams on different threads.
+
+    Without a deadline, there is no worker thread. Requests are queued until
+    :meth:`flush` runs them on the flushing thread, which lets a host that
+    knows when every stream is waiting, such as the
+    :class:`~spokestack.host.SpeechPipelineHost`, batch without waiting out
+    a deadline.
+
+    Rows of a batch must be independent, as they are for the filter, encode
+    and detect models, where the encoder state is an input and output row of
+    each request. Models without a ``resize`` method, such as the
+    :class:`~spokestack.models.filterbank.MelFilterbank`, are called with the
+    whole batch. Models that cannot be resized to the batch, or that do not
+    return a row per input, are invoked once per request, so results are the
+    same as calling the model directly.
+
+    Args:
+        model (TFLiteModel): the model to batch
+        max_batch_size (int): maximum number of requests per invocation
+        deadline (float): longest time to wait for a batch to fill (s), or
+                          None to batch the requests queued between flushes
+    """
+
+    def __init__(
+        self, model: Any, max_batch_size: int = 32, deadline: Optional[float] = 0.002
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("invalid_max_batch_size")
+
+        self._model = model
+        self._max_batch_size = max_batch_size
+        self._deadline = deadline
+        self._is_batchable = True
+        self._is_resizable = hasattr(model, "resize")
+
+        # callers see the details of a single request, whatever
+        # the current batch shape of the model
+        self._input_details = copy.deepcopy(model.input_details)
+        self._output_details = copy.deepcopy(model.output_details)
+        self._size = int(self._input_details[0]["shape"][0])
+
+        self._requests = 0
+        self._batches = 0
+        self._is_closed = False
+        self._lock = threading.Lock()
+        self._pending: List[_Request] = []
+        self._listeners: List[Callable[[], None]] = []
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        if deadline is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def __call__(self, *args: np.ndarray) -> List[np.ndarray]:
+        """Runs inputs through the model along with any concurrent requests
+
+        Args:
+            *args (np.ndarray): inputs to the model, each with a leading
+                                batch dimension
+
+        Returns: outputs of the model for these inputs
+
+        """
+        return self.submit(*args).result()
+
+    def submit(self, *args: np.ndarray) -> "Future[List[np.ndarray]]":
+        """Queues inputs to run with the next batch, without waiting
+
+        Args:
+            *args (np.ndarray): inputs to the model, each with a leading
+                                batch dimension
+
+        Returns: future holding the outputs of the model for these inputs
+
+        """
+        if self._is_closed:
+            raise RuntimeError("closed")
+        future: "Future[List[np.ndarray]]" = Future()
+        if self._thread is not None:
+            self._queue.put((args, future))
+            return future
+
+        with self._lock:
+            self._pending.append((args, future))
+        for listener in self._listeners:
+            listener()
+        return future
+
+    def flush(self) -> int:
+        """Runs the requests queued by a model without a deadline on the
+        calling thread, in batches of up to ``max_batch_size``
+
+        Returns: the number of requests that were run
+
+        """
+        with self._lock:
+            requests, self._pending = self._pending, []
+        for i in range(0, len(requests), self._max_batch_size):
+            self._invoke(requests[i : i + self._max_batch_size])
+        return len(requests)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Registers a function that is called after each request is queued
+        for :meth:`flush`
+
+        Args:
+            listener (Callable[[], None]): function called from the thread
+                                           that queued the request
+
+        """
+        self._listeners.append(listener)
+
+    @property
+    def pending(self) -> int:
+        """ Number of requests waiting for the next flush """
+        return len(self._pending)
+
+    def batch(self, inputs: np.ndarray) -> np.ndarray:
+        """Runs a batch of inputs through a single input/output model
+
+        Args:
+            inputs (np.ndarray): batch of inputs, along the first axis
+
+        Returns: outputs of the model for each input, along the first axis
+
+        """
+        return self(inputs)[0]
+
+    @property
+    def input_details(self) -> List[Any]:
+        """ Input details of the model for a single request """
+        return self._input_details
+
+    @property
+    def output_details(self) -> List[Any]:
+        """ Output details of the model for a single request """
+        return self._output_details
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Batching statistics
+
+        Returns: dictionary containing the number of requests and
+                 invocations, and the mean number of requests per invocation
+        """
+        return {
+            "requests": self._requests,
+            "batches": self._batches,
+            "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+        }
+
+    def close(self) -> None:
+        """ Stops the worker thread once pending requests have run """
+        self._is_closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+
+            # gather requests until the batch is full or the deadline passes
+            requests = [request]
+            expiry = time.perf_counter() + (self._deadline or 0.0)
+            while len(requests) < self._max_batch_size:
+                try:
+                    request = self._queue.get(
+                        timeout=max(0.0, expiry - time.perf_counter())
+                    )
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._invoke(requests)
+                    return
+                requests.append(request)
+            self._invoke(requests)
+
+    def _invoke(self, requests: List[_Request]) -> None:
+        self._requests += len(requests)
+        try:
+            # stack each input along the batch dimension
+            counts = [len(args[0]) for args, _ in requests]
+            inputs = [
+                np.concatenate([args[i] for args, _ in requests])
+                for i in range(len(requests[0][0]))
+            ]
+            outputs = self._call_batch(inputs)
+        except Exception as e:
+            for _, future in requests:
+                future.set_exception(e)
+            return
+
+        # split the outputs back to each request, copying them first
+        # in case the model reuses its output buffers
+        splits = np.cumsum(counts)[:-1]
+        split = [np.split(np.array(output), splits) for output in outputs]
+        for i, (_, future) in enumerate(requests):
+            future.set_result([output[i] for output in split])
+
+    def _call_batch(self, inputs: List[np.ndarray]) -> List[np.ndarray]:
+        count = len(inputs[0])
+        if self._is_batchable:
+            try:
+                if self._is_resizable:
+                    self._resize(count)
+                outputs = self._model(*inputs)
+                if all(len(output) == count for output in outputs):
+                    self._batches += 1
+                    return outputs
+            except (ValueError, RuntimeError):
+                pass
+
+            # restore the shape of a single request and stop batching
+            self._is_batchable = False
+            if self._is_resizable:
+                self._resize(self._size)
+
+        self._batches += count
+        results = [self._model(*[x[i : i + 1] for x in inputs]) for i in range(count)]
+        return [np.concatenate(outputs) for outputs in zip(*results)]
+
+    def _resize(self, count: int) -> None:
+        # resize the batch dimension of every input that does not match
+        for detail in self._model.input_details:
+            shape = [int(d) for d in detail["shape"]]
+            if shape[0] != count:
+                self._model.resize(detail["index"], [count] + shape[1:], strict=False)
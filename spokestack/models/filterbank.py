@@ -0,0 +1,160 @@
+"""
+This module contains a NumPy implementation of the mel filter models used by
+the TFLite wakeword and keyword detectors.
+"""
+import threading
+from typing import Any, List, Optional
+
+import numpy as np
+
+from spokestack.models.tensorflow import TFLiteModel
+
+
+class MelFilterbank:
+    """Projects magnitude spectra onto mel bins with a matrix multiply
+
+    The filter models shipped with the wakeword and keyword detectors are a
+    single linear projection, so the whole interpreter invocation can be
+    replaced with a product against the filterbank weights. The filterbank
+    has the same calling convention as the :class:`TFLiteModel` it replaces,
+    and writes its outputs into a preallocated buffer, so no memory is
+    allocated per hop once the buffer has grown to the largest batch. Each
+    thread gets its own buffer, so one filterbank can be shared by clones
+    that run on different threads.
+
+    Args:
+        weights (np.ndarray): filterbank weights, with one row per
+                              spectrum bin and one column per mel bin
+        bias (np.ndarray): optional offset added to each mel bin
+    """
+
+    def __init__(self, weights: np.ndarray, bias: Optional[np.ndarray] = None) -> None:
+        if weights.ndim != 2:
+            raise ValueError("invalid_weights")
+        if bias is not None and bias.shape != weights.shape[-1:]:
+            raise ValueError("invalid_bias")
+
+        self.weights = np.ascontiguousarray(weights, np.float32)
+        self.bias = None if bias is None else np.asarray(bias, np.float32)
+        self._local = threading.local()
+
+    @classmethod
+    def load(cls, path: str) -> "MelFilterbank":
+        """Loads the filterbank weights from a ``.npy`` file
+
+        Args:
+            path (str): path to a file written by :meth:`save`
+
+        Returns: the filterbank
+
+        """
+        return cls(np.load(path))
+
+    @classmethod
+    def from_model(cls, model: TFLiteModel, atol: float = 1e-5) -> "MelFilterbank":
+        """Extracts the filterbank from a TFLite filter model
+
+        The weights are the constant tensor shaped (spectrum bins, mel bins),
+        in either order, and a constant vector shaped (mel bins) is taken as
+        the bias. Quantized weights are dequantized. The extracted filterbank
+        is checked against the model on random spectra before it is returned.
+
+        Args:
+            model (TFLiteModel): the filter model
+            atol (float): absolute tolerance of the check against the model
+
+        Returns: the filterbank
+
+        """
+        bins = int(model.input_details[0]["shape"][-1])
+        mels = int(model.output_details[0]["shape"][-1])
+
+        weights = None
+        bias = None
+        for detail in model.tensor_details:
+            shape = tuple(detail["shape"])
+            if shape in ((bins, mels), (mels, bins)) and weights is None:
+                weights = _dequantize(model.tensor(detail["index"]), detail)
+                if shape != (bins, mels):
+                    weights = weights.T
+            elif shape == (mels,) and bias is None:
+                bias = _dequantize(model.tensor(detail["index"]), detail)
+        if weights is None:
+            raise ValueError("invalid_filter")
+
+        filterbank = cls(weights, bias)
+
+        # invoke the model one spectrum at a time, so that the input tensor
+        # keeps the shape the detectors expect
+        spectra = np.random.rand(4, bins).astype(np.float32)
+        expected = np.concatenate([model(spectrum[None])[0] for spectrum in spectra])
+        if not np.allclose(filterbank.batch(spectra), expected, atol=atol):
+            raise ValueError("filter_mismatch")
+        return filterbank
+
+    def save(self, path: str) -> None:
+        """Saves the filterbank weights to a ``.npy`` file
+
+        The file holds the weights alone, so a filterbank with a nonzero
+        bias cannot be saved.
+
+        Args:
+            path (str): path of the file to write
+
+        """
+        if self.bias is not None and self.bias.any():
+            raise ValueError("invalid_bias")
+        np.save(path, self.weights)
+
+    @property
+    def input_details(self) -> List[Any]:
+        """ Input details matching the filter model """
+        return [{"shape": np.array([1, self.weights.shape[0]])}]
+
+    @property
+    def output_details(self) -> List[Any]:
+        """ Output details matching the filter model """
+        return [{"shape": np.array([1, self.weights.shape[1]])}]
+
+    def __call__(self, inputs: np.ndarray) -> List[np.ndarray]:
+        """Projects a batch of spectra onto the mel bins
+
+        Args:
+            inputs (np.ndarray): magnitude spectra, one per row
+
+        Returns: single element list containing the mel spectra
+
+        """
+        return [self.batch(inputs)]
+
+    def batch(self, inputs: np.ndarray) -> np.ndarray:
+        """Projects a batch of spectra onto the mel bins
+
+        Args:
+            inputs (np.ndarray): magnitude spectra, one per row
+
+        Returns: the mel spectra, one per row, which are only valid until
+                 the next call on the same thread
+
+        """
+        count = len(inputs)
+        buffer = getattr(self._local, "outputs", None)
+        if buffer is None or count > len(buffer):
+            buffer = np.zeros((count, self.weights.shape[1]), np.float32)
+            self._local.outputs = buffer
+
+        outputs = buffer[:count]
+        np.dot(np.asarray(inputs, np.float32), self.weights, out=outputs)
+        if self.bias is not None:
+            outputs += self.bias
+        return outputs
+
+
+def _dequantize(tensor: np.ndarray, detail: Any) -> np.ndarray:
+    # convert quantized weights back to floating point
+    if np.issubdtype(tensor.dtype, np.floating):
+        return tensor.astype(np.float32)
+    scale, zero_point = detail.get("quantization", (0.0, 0))
+    if not scale:
+        raise ValueError("invalid_filter")
+    return (tensor.astype(np.float32) - zero_point) * scale
@@ -0,0 +1,177 @@
+"""
+This module contains a pool of TFLite interpreters that lets one model serve
+concurrent requests.
+
+Example:
+    This example serves NLU requests from a web server's worker threads, with
+    up to four classifications running at once. ::
+
+        from spokestack.nlu.tflite import TFLiteNLU
+
+        nlu = TFLiteNLU("path_to_nlu_model", pool_size=4, pool_timeout=1.0)
+
+        def handle(request):
+            return nlu(request.text)
+
+"""
+import copy
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from spokestack.models.tensorflow import TFLiteModel
+from spokestack.profiling import LatencyHistogram
+
+
+class ModelPool:
+    """Pool of interpreters for a single model
+
+    The model file is read once, and each interpreter in the pool is built
+    from the same bytes. Each request checks out an interpreter, so that up
+    to ``size`` requests run at once, and the rest wait for an interpreter to
+    be returned. A request that resizes its inputs, such as the TTS aligner,
+    should resize and invoke within a single :meth:`checkout`.
+
+    Args:
+        model_path (str): path to the .tflite model file
+        size (int): number of interpreters in the pool
+        timeout (float): longest time a request waits for an interpreter (s),
+                         or None to wait indefinitely
+        model_content (bytes): contents of the model file, used in place of
+                               the path
+        factory (Callable): creates each pooled model from the contents of
+                            the model file, or None for a TFLiteModel
+        **kwargs (Any): additional keyword arguments for each model
+    """
+
+    def __init__(
+        self,
+        model_path: str = "",
+        size: int = 2,
+        timeout: Optional[float] = None,
+        model_content: Optional[bytes] = None,
+        factory: Optional[Callable[..., Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        if size < 1:
+            raise ValueError("invalid_pool_size")
+
+        if model_content is None:
+            with open(model_path, "rb") as file:
+                model_content = file.read()
+
+        self._size = size
+        self._timeout = timeout
+        if factory is None:
+            factory = TFLiteModel
+        self._models: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        for _ in range(size):
+            self._models.put(factory(model_content=model_content, **kwargs))
+
+        # all interpreters share the details of the model as loaded
+        model = self._models.get()
+        self._input_details = copy.deepcopy(model.input_details)
+        self._output_details = copy.deepcopy(model.output_details)
+        self._models.put(model)
+
+        self._lock = threading.Lock()
+        self._wait = LatencyHistogram()
+        self._start = time.perf_counter()
+        self._busy = 0.0
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+
+    @contextmanager
+    def checkout(self) -> Iterator[Any]:
+        """Borrows an interpreter from the pool for the duration of a block
+
+        Raises:
+            TimeoutError: if no interpreter is returned within the timeout
+
+        Returns: a context manager that yields the interpreter
+
+        """
+        start = time.perf_counter()
+        try:
+            model = self._models.get(timeout=self._timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise TimeoutError("model_pool_timeout")
+
+        checkout = time.perf_counter()
+        with self._lock:
+            self._wait.record(checkout - start)
+            self._in_use += 1
+            self._checkouts += 1
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._busy += time.perf_counter() - checkout
+                self._in_use -= 1
+            self._models.put(model)
+
+    def __call__(self, *args: np.ndarray) -> List[np.ndarray]:
+        """Runs inputs through the next available interpreter
+
+        Args:
+            *args (np.ndarray): inputs to the model
+
+        Returns: outputs of the model
+
+        """
+        with self.checkout() as model:
+            return model(*args)
+
+    def warm_up(self, *args: np.ndarray) -> None:
+        """Runs inputs through every interpreter in the pool once, so that
+        no request pays for an interpreter's slower first invocation
+
+        Args:
+            *args (np.ndarray): inputs to the model
+
+        """
+        models = [self._models.get() for _ in range(self._size)]
+        try:
+            for model in models:
+                model(*args)
+        finally:
+            for model in models:
+                self._models.put(model)
+
+    @property
+    def input_details(self) -> List[Any]:
+        """ Input details of the model as loaded """
+        return self._input_details
+
+    @property
+    def output_details(self) -> List[Any]:
+        """ Output details of the model as loaded """
+        return self._output_details
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage statistics
+
+        Returns: dictionary containing the pool size, the number of
+                 interpreters in use, the number of checkouts and timeouts,
+                 the fraction of interpreter time spent checked out since the
+                 pool was created, and a summary of the time spent waiting for
+                 an interpreter (s)
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self._start
+            return {
+                "size": self._size,
+                "in_use": self._in_use,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "utilization": self._busy / (elapsed * self._size) if elapsed else 0.0,
+                "wait": self._wait.stats,
+            }
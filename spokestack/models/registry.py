@@ -0,0 +1,214 @@
+"""
+This module contains a registry that shares TFLite models between the
+components of a process.
+
+Example:
+    This example creates a wakeword trigger for each of many pipelines run
+    from a single thread. The model files are read once, and the triggers
+    share one interpreter for each model, as the registry's stats show. ::
+
+        import logging
+
+        from spokestack.models.registry import default_registry
+        from spokestack.wakeword.tflite import WakewordTrigger
+
+        triggers = [
+            WakewordTrigger(model_dir="path_to_wakeword_model",
+                            registry=default_registry)
+            for _ in range(50)
+        ]
+        logging.info("models: %s", default_registry.stats)
+
+"""
+import mmap
+import os
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from spokestack.models.tensorflow import TFLiteModel
+
+_Key = Tuple[str, bool, Tuple[Tuple[str, str], ...]]
+
+
+class ModelRegistry:
+    """Reference counted cache of TFLite models
+
+    Models are keyed by the resolved path of the model file, along with the
+    interpreter options. Each model file is memory-mapped once, where
+    possible, and every interpreter created for it is built from the same
+    buffer. By default, a model is shared by every user on each thread that
+    runs it, since interpreters are not thread safe. The model returned by
+    :meth:`acquire` then runs on an interpreter of the calling thread, which is
+    created on the thread's first call, so a component may be built on one
+    thread and run on another. Models acquired with ``per_thread=False`` are
+    shared by every user in the process, which must then serialize their
+    calls.
+
+    A model is dropped from the registry, along with its bytes, once each
+    acquisition has been released. The registry only holds a per-thread
+    interpreter while its thread is alive, so the interpreters of exited
+    threads are freed once their users drop them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[_Key, _Entry] = {}
+        self._keys: "weakref.WeakKeyDictionary[Any, _Key]" = weakref.WeakKeyDictionary()
+
+    def acquire(
+        self, model_path: str, per_thread: bool = True, **kwargs: Any
+    ) -> TFLiteModel:
+        """Gets a shared model, loading it if needed
+
+        Args:
+            model_path (str): path to the .tflite model file
+            per_thread (bool): run the model on a separate interpreter for
+                               each calling thread
+            **kwargs (Any): additional keyword arguments for the interpreter
+
+        Returns: the shared model, which must be passed to :meth:`release`
+                 when it is no longer used
+
+        """
+        # unset options are left to the interpreter's defaults
+        kwargs = {name: value for name, value in kwargs.items() if value is not None}
+        path = os.path.realpath(model_path)
+        options = tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+        key: _Key = (path, per_thread, options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(path, kwargs)
+            model = entry.model(per_thread)
+            entry.users += 1
+            self._keys[model] = key
+        return model
+
+    def release(self, model: Any) -> None:
+        """Releases a model obtained from :meth:`acquire`
+
+        Models that were not obtained from the registry are ignored.
+
+        Args:
+            model (TFLiteModel): the model to release
+
+        """
+        with self._lock:
+            key = self._keys.get(model)
+            if key is None:
+                return
+            entry = self._entries[key]
+            entry.users -= 1
+            if not entry.users:
+                # each entry hands out a single model, for its thread option
+                del self._entries[key]
+                del self._keys[model]
+
+    @property
+    def stats(self) -> List[Dict[str, Any]]:
+        """Memory used by each registered model
+
+        The tensor memory of an interpreter is estimated from the sizes of
+        its tensors.
+
+        Returns: list of dictionaries, one per model, containing the path,
+                 whether it is shared per thread, the number of users and
+                 interpreters, the size of the model file, the tensor memory of
+                 its interpreters, and their total (bytes)
+        """
+        with self._lock:
+            return [
+                entry.stats(per_thread=key[1]) for key, entry in self._entries.items()
+            ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Entry:
+    # a model file along with the interpreters created for it
+    def __init__(self, path: str, kwargs: Dict[str, Any]) -> None:
+        self.content: Union[bytes, mmap.mmap]
+        with open(path, "rb") as file:
+            try:
+                self.content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # empty files and some file systems cannot be mapped
+                self.content = file.read()
+        self.path = path
+        self.kwargs = kwargs
+        self.users = 0
+
+        # per-thread interpreters live in thread-local storage, which is
+        # cleared when the thread exits, while the live interpreters are
+        # tracked weakly for the stats
+        self.models: "weakref.WeakSet[TFLiteModel]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shared: Optional[TFLiteModel] = None
+        self._per_thread = _PerThreadModel(self)
+
+    def model(self, per_thread: bool) -> Any:
+        if per_thread:
+            return self._per_thread
+        if self._shared is None:
+            self._shared = self._create()
+        return self._shared
+
+    def local(self) -> TFLiteModel:
+        model = getattr(self._local, "model", None)
+        if model is None:
+            model = self._local.model = self._create()
+        return model
+
+    def _create(self) -> TFLiteModel:
+        with self._lock:
+            try:
+                model = TFLiteModel(model_content=self.content, **self.kwargs)
+            except (TypeError, ValueError):
+                if isinstance(self.content, bytes):
+                    raise
+                # interpreters that only accept bytes are given a copy
+                self.content = bytes(self.content)
+                model = TFLiteModel(model_content=self.content, **self.kwargs)
+            self.models.add(model)
+        return model
+
+    def stats(self, per_thread: bool) -> Dict[str, Any]:
+        tensor_bytes = sum(
+            int(np.prod(detail["shape"])) * np.dtype(detail["dtype"]).itemsize
+            for model in list(self.models)
+            for detail in model.tensor_details
+        )
+        return {
+            "path": self.path,
+            "per_thread": per_thread,
+            "users": self.users,
+            "interpreters": len(self.models),
+            "model_bytes": len(self.content),
+            "tensor_bytes": tensor_bytes,
+            "resident_bytes": len(self.content) + tensor_bytes,
+        }
+
+
+class _PerThreadModel:
+    # a model that runs on an interpreter of the calling thread, so that
+    # components are bound to the thread that runs them rather than the
+    # thread that acquired their models
+    def __init__(self, entry: _Entry) -> None:
+        self._entry = entry
+
+    def __call__(self, *args: Any) -> List[np.ndarray]:
+        return self._entry.local()(*args)
+
+    def run(self, *args: np.ndarray) -> List[np.ndarray]:
+        return self._entry.local().run(*args)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._entry.local(), name)
+
+
+default_registry = ModelRegistry()
@@ -0,0 +1,148 @@
+"""
+This module contains a model wrapper that keeps an interpreter allocated for
+each of the most recently used input shapes.
+
+Example:
+    This example runs a model with a variable-length input. Each length is
+    served by its own interpreter, allocated once, and up to eight lengths
+    are kept allocated at a time. ::
+
+        import numpy as np
+
+        from spokestack.models.shape_cache import ShapeCachedModel
+
+        model = ShapeCachedModel("path_to_model.tflite", max_shapes=8)
+        index = model.input_details[0]["index"]
+        for length in [17, 30, 17, 250]:
+            inputs = np.zeros([length, 256], dtype=np.float32)
+            model.resize(index, inputs.shape)
+            outputs = model(inputs)
+
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from spokestack.models.tensorflow import TFLiteModel
+
+_Shapes = Tuple[Tuple[int, Tuple[int, ...]], ...]
+
+
+class ShapeCachedModel:
+    """Runs variable-shape inputs through interpreters allocated per shape
+
+    Resizing an interpreter reallocates all of its tensors, which can cost as
+    much as the invocation itself for short inputs. Instead, :meth:`resize`
+    selects an interpreter that was allocated for the requested input shapes,
+    creating and allocating one the first time the shapes are seen. Inputs
+    are never padded, so the outputs are the same as those of a single
+    interpreter resized for each call. The least recently used interpreter is
+    dropped when there are more than ``max_shapes``.
+
+    Interpreters are built from a single read of the model file.
+
+    Args:
+        model_path (str): path to the .tflite model file
+        max_shapes (int): maximum number of interpreters to keep allocated
+        model_content (bytes): contents of the model file, used in place of
+                               the path
+        **kwargs (Any): additional keyword arguments for each TFLiteModel
+    """
+
+    def __init__(
+        self,
+        model_path: str = "",
+        max_shapes: int = 8,
+        model_content: Optional[bytes] = None,
+        **kwargs: Any,
+    ) -> None:
+        if max_shapes < 1:
+            raise ValueError("invalid_max_shapes")
+
+        if model_content is None:
+            with open(model_path, "rb") as file:
+                model_content = file.read()
+
+        self._content = model_content
+        self._kwargs = kwargs
+        self._max_shapes = max_shapes
+        self._calls = 0
+        self._allocations = 0
+
+        # the model as loaded serves its own input shapes
+        self._model = TFLiteModel(model_content=model_content, **kwargs)
+        self._shapes: Dict[int, Tuple[int, ...]] = {
+            detail["index"]: tuple(int(n) for n in detail["shape"])
+            for detail in self._model.input_details
+        }
+        self._models: "OrderedDict[_Shapes, TFLiteModel]" = OrderedDict(
+            [(self._key(), self._model)]
+        )
+
+    def __call__(self, *args: np.ndarray) -> List[np.ndarray]:
+        """Runs inputs through the interpreter for the current input shapes
+
+        Args:
+            *args (np.ndarray): inputs to the model
+
+        Returns: outputs of the model
+
+        """
+        self._calls += 1
+        return self._model(*args)
+
+    def resize(self, index: int, shape: List[int], strict: bool = True) -> None:
+        """Selects the interpreter allocated for an input shape
+
+        Args:
+            index: index of the input tensor to resize
+            shape: new shape of the input tensor
+            strict: only allow resizing the dimensions that the model
+                    declares as variable
+        """
+        self._shapes[index] = tuple(int(n) for n in shape)
+        key = self._key()
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            self._model = model
+            return
+
+        # allocate a new interpreter for these shapes, dropping the least
+        # recently used one if there are too many
+        model = TFLiteModel(model_content=self._content, **self._kwargs)
+        for tensor, tensor_shape in key:
+            model.resize(tensor, list(tensor_shape), strict=strict)
+        self._allocations += 1
+        self._models[key] = self._model = model
+        if len(self._models) > self._max_shapes:
+            self._models.popitem(last=False)
+
+    @property
+    def input_details(self) -> List[Any]:
+        """ Input details of the interpreter for the current input shapes """
+        return self._model.input_details
+
+    @property
+    def output_details(self) -> List[Any]:
+        """ Output details of the interpreter for the current input shapes """
+        return self._model.output_details
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Shape cache statistics
+
+        Returns: dictionary containing the number of interpreters currently
+                 allocated, the number of calls, and the number of
+                 interpreters allocated for new shapes, including any that
+                 were dropped
+        """
+        return {
+            "shapes": len(self._models),
+            "calls": self._calls,
+            "allocations": self._allocations,
+        }
+
+    def _key(self) -> _Shapes:
+        return tuple(sorted(self._shapes.items()))
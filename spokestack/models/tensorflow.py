@@ -1,7 +1,8 @@
 """
 TFLite model base class
 """
-from typing import Any, List
+import mmap
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import numpy as np
 
@@ -16,18 +17,45 @@ class TFLiteModel:
 
     Args:
         model_path (str): Path to .tflite model file
+        model_content (bytes|mmap): Contents of a .tflite model file, or a
+                                    memory map of it, used in place of the
+                                    path so that the file is read once for
+                                    many interpreters
+        num_threads (int): Number of threads used by the interpreter's kernels,
+                           or None for the runtime default
+        delegates (List[Any]): Delegates that run supported operations, given
+                               as loaded delegates or paths to delegate
+                               libraries
         **kwargs (Any): Additional keywords arguments for the TFLite Interpreter.
                         [https://www.tensorflow.org/api_docs/python/tf/lite/Interpreter]
     """
 
-    def __init__(self, model_path: str, **kwargs: Any) -> None:
-
-        self._interpreter: tflite.Interpreter = tflite.Interpreter(
-            model_path=model_path, **kwargs
-        )
+    def __init__(
+        self,
+        model_path: str = "",
+        model_content: Optional[Union[bytes, mmap.mmap]] = None,
+        num_threads: Optional[int] = None,
+        delegates: Optional[List[Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+
+        if model_content is not None:
+            kwargs["model_content"] = model_content
+        else:
+            kwargs["model_path"] = model_path
+        if num_threads is not None:
+            kwargs["num_threads"] = num_threads
+        if delegates:
+            kwargs["experimental_delegates"] = [
+                tflite.load_delegate(d) if isinstance(d, str) else d for d in delegates
+            ]
+        self._interpreter: tflite.Interpreter = tflite.Interpreter(**kwargs)
         self._input_details = self._interpreter.get_input_details()
         self._output_details = self._interpreter.get_output_details()
         self._interpreter.allocate_tensors()
+        self._is_batchable = True
+        self._padding: Optional[np.ndarray] = None
+        self._tensors: Dict[int, Callable[[], np.ndarray]] = {}
 
     def __call__(self, *args: Any) -> List[np.ndarray]:
         """Forward pass of the TFLite model
@@ -67,13 +95,152 @@ class TFLiteModel:
         """
         return self._output_details
 
-    def resize(self, index: int, shape: List[int]) -> None:
+    @property
+    def tensor_details(self) -> List[Any]:
+        """Property for accessing the details of every tensor in the model
+
+        Returns: Tensor details for the TFLite model, including constant
+                 tensors such as weights
+
+        """
+        return self._interpreter.get_tensor_details()
+
+    def tensor(self, index: int) -> np.ndarray:
+        """Reads a copy of a tensor in the model
+
+        Args:
+            index: index of the tensor to read
+
+        Returns: the current value of the tensor
+
+        """
+        return self._interpreter.get_tensor(index)
+
+    def resize(self, index: int, shape: List[int], strict: bool = True) -> None:
         """Resize and allocate an input tensor
 
+        The tensors are only reallocated when the shape changes, so resizing
+        to the current shape before each invocation costs nothing.
+
         Args:
             index: index of the input tensor to resize
             shape: new shape of the input tensor
+            strict: only allow resizing the dimensions that the model
+                    declares as variable
         """
+        for detail in self._input_details:
+            if detail["index"] == index and list(detail["shape"]) == list(shape):
+                return
 
-        self._interpreter.resize_tensor_input(index, shape, strict=True)
+        self._tensors.clear()
+        self._interpreter.resize_tensor_input(index, shape, strict=strict)
         self._interpreter.allocate_tensors()
+        self._input_details = self._interpreter.get_input_details()
+        self._output_details = self._interpreter.get_output_details()
+
+    def input_tensor(self, index: int = 0) -> np.ndarray:
+        """View of the interpreter's buffer for an input tensor
+
+        Writing to the view sets the input without a copy through
+        ``set_tensor``. The interpreter refuses to invoke or resize while any
+        view of its buffers is alive, so views must be released before
+        :meth:`invoke` is called, and fetched again afterward.
+
+        Args:
+            index: position of the tensor in the model inputs
+
+        Returns: view of the tensor's buffer
+
+        """
+        return self._tensor(self._input_details[index]["index"])()
+
+    def output_tensor(self, index: int = 0) -> np.ndarray:
+        """View of the interpreter's buffer for an output tensor
+
+        The view holds the output of the last invocation without a copy
+        through ``get_tensor``, and must be released before the next one.
+
+        Args:
+            index: position of the tensor in the model outputs
+
+        Returns: view of the tensor's buffer
+
+        """
+        return self._tensor(self._output_details[index]["index"])()
+
+    def invoke(self) -> None:
+        """ Runs the model on the current contents of its input tensors """
+        self._interpreter.invoke()
+
+    def run(self, *args: np.ndarray) -> List[np.ndarray]:
+        """Forward pass of the TFLite model through its tensor buffers
+
+        Each input is copied directly into the interpreter's buffer, and may
+        omit leading dimensions of size one, such as the batch dimension.
+        No arrays are allocated for the inputs or outputs.
+
+        Args:
+            *args (np.ndarray): inputs to the TFLite model
+
+        Returns: views of the outputs of the TFLite model, which must be
+                 released before the model is invoked or resized again
+
+        """
+        for i, arg in enumerate(args):
+            np.copyto(self.input_tensor(i), arg)
+
+        self._interpreter.invoke()
+
+        return [self.output_tensor(i) for i in range(len(self._output_details))]
+
+    def _tensor(self, index: int) -> Callable[[], np.ndarray]:
+        # the interpreter's accessors stay valid across invocations,
+        # but are dropped along with the buffers when the model is resized
+        tensor = self._tensors.get(index)
+        if tensor is None:
+            tensor = self._tensors[index] = self._interpreter.tensor(index)
+        return tensor
+
+    def batch(self, inputs: np.ndarray) -> np.ndarray:
+        """Runs a batch of inputs through a single input/output model
+        with one invocation
+
+        The batch dimension of the input tensor grows to fit the largest
+        batch seen so far, and smaller batches are padded to that size, so
+        the tensors are reallocated at most once per new largest batch rather
+        than whenever the batch size changes. The outputs of the padded rows
+        are ignored. Models that cannot be resized, or that do not produce one
+        output per input, fall back to one invocation per input.
+
+        Args:
+            inputs (np.ndarray): batch of inputs, along the first axis
+
+        Returns: outputs of the model for each input, along the first axis
+
+        """
+        count = len(inputs)
+        detail = self._input_details[0]
+        if self._is_batchable:
+            shape = list(detail["shape"])
+            try:
+                if shape[0] < count:
+                    self.resize(detail["index"], [count] + shape[1:], strict=False)
+                    shape[0] = count
+                batch = inputs
+                if count < shape[0]:
+                    if self._padding is None or self._padding.shape != tuple(shape):
+                        self._padding = np.zeros(shape, dtype=inputs.dtype)
+                    self._padding[:count] = inputs
+                    batch = self._padding
+                outputs = self(batch)[0]
+                if len(outputs) == shape[0]:
+                    return outputs[:count]
+            except (ValueError, RuntimeError):
+                pass
+
+            # restore a single input and stop batching this model
+            self._is_batchable = False
+            self._padding = None
+            self.resize(detail["index"], [1] + shape[1:], strict=False)
+
+        return np.concatenate([self(inputs[i : i + 1])[0] for i in range(count)])
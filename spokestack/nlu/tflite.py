@@ -7,12 +7,14 @@ import json
 import logging
 import os
 from importlib import import_module
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 from tokenizers import BertWordPieceTokenizer
 
 from spokestack import utils
+from spokestack.models.pool import ModelPool
+from spokestack.models.registry import ModelRegistry
 from spokestack.models.tensorflow import TFLiteModel
 from spokestack.nlu.result import Result
 
@@ -25,10 +27,43 @@ class TFLiteNLU:
     Args:
         model_dir (str): path to the model directory containing nlu.tflite,
                          metadata.json, and vocab.txt
+        registry (ModelRegistry): optional registry that shares the model
+                                  with other components
+        num_threads (int): number of threads used by the model, or None for
+                           the runtime default
+        delegates (List[Any]): TFLite delegates, or paths to delegate libraries,
+                               used by the model
+        pool_size (int): number of interpreters kept for the model, so that
+                         utterances can be classified on several threads at
+                         once, or None for a single interpreter. A pooled model
+                         is not shared through the registry.
+        pool_timeout (float): longest time to wait for a pooled interpreter (s),
+                              or None to wait indefinitely
     """
 
-    def __init__(self, model_dir: str) -> None:
-        self._model = TFLiteModel(model_path=os.path.join(model_dir, "nlu.tflite"))
+    def __init__(
+        self,
+        model_dir: str,
+        registry: Optional[ModelRegistry] = None,
+        num_threads: Optional[int] = None,
+        delegates: Optional[List[Any]] = None,
+        pool_size: Optional[int] = None,
+        pool_timeout: Optional[float] = None,
+    ) -> None:
+        model_path = os.path.join(model_dir, "nlu.tflite")
+        options: Dict[str, Any] = {"num_threads": num_threads, "delegates": delegates}
+        self._registry = registry
+        self._is_pooled = pool_size is not None
+        self._model: Any
+        if pool_size is not None:
+            self._model = ModelPool(
+                model_path=model_path, size=pool_size, timeout=pool_timeout, **options
+            )
+            self._registry = None
+        elif registry is not None:
+            self._model = registry.acquire(model_path=model_path, **options)
+        else:
+            self._model = TFLiteModel(model_path=model_path, **options)
         self._metadata = utils.load_json(os.path.join(model_dir, "metadata.json"))
         self._tokenizer = BertWordPieceTokenizer(os.path.join(model_dir, "vocab.txt"))
         self._max_length = self._model.input_details[0]["shape"][-1]
@@ -101,11 +136,21 @@ class TFLiteNLU:
             slots=parsed_slots,
         )
 
+    def close(self) -> None:
+        """ Returns a shared model to its registry """
+        if self._registry is not None:
+            self._registry.release(self._model)
+            self._registry = None
+
     def _warm_up(self) -> None:
         # make an array the same size as the inputs to warm the
-        # model since first inference is always slower than subsequent
+        # model since first inference is always slower than subsequent,
+        # warming every interpreter of a pooled model
         warm = np.zeros((self._model.input_details[0]["shape"]), dtype=np.int32)
-        _ = self._model(warm)
+        if self._is_pooled:
+            self._model.warm_up(warm)
+        else:
+            _ = self._model(warm)
 
     def _encode(self, utterance: str) -> Tuple[np.ndarray, List[int]]:
         inputs = self._tokenizer.encode(utterance)
@@ -51,8 +51,27 @@ class AutomaticNoiseSuppression:
         if not np.issubdtype(frame.dtype, np.signedinteger):
             raise TypeError("invalid_dtype")
 
-        for i in range(len(frame) // frame_size):
-            self._nsx(frame[i : frame_size + i])
+        for i in range(0, len(frame), frame_size):
+            self._nsx(frame[i : i + frame_size])
+
+    def process_block(self, context: SpeechContext, frames: np.ndarray) -> None:
+        """Processes a block of frames in a single call
+
+        Args:
+            context (SpeechContext): State based information that needs to be shared
+            between pieces of the pipeline
+            frames (np.ndarray): 2D block of PCM-16 audio, one frame per row
+        """
+        frame_size = self._frame_width
+        # validate frame size
+        if frames.shape[-1] % frame_size != 0:
+            raise ValueError("invalid_frame_size")
+        # validate dtype
+        if not np.issubdtype(frames.dtype, np.signedinteger):
+            raise TypeError("invalid_dtype")
+
+        # suppress noise in each 10ms sub-frame of the block, in place
+        self._nsx.process_block(frames.reshape(-1, frame_size))
 
     def close(self) -> None:
         """method for pipeline compliance"""
@@ -2,30 +2,132 @@
 This module contains the speech pipeline which manages the components
 for processing speech.
 """
-from typing import Any, List, Union
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
 
 from spokestack.context import SpeechContext
+from spokestack.io.capture import OVERFLOW_DROP_OLDEST, CaptureThread
+from spokestack.profiling import StageProfiler
+from spokestack.schedule import StageScheduler
 
 
 class SpeechPipeline:
     """Pipeline for managing speech components.
 
+    By default, frames are read from the input source on the same thread that
+    runs the stages. Setting ``capture_frames`` reads the input source on a
+    dedicated thread into a bounded queue instead, so that a slow stage does
+    not cause input overflows (see :class:`~spokestack.io.capture.CaptureThread`).
+
+    Setting ``profile`` records the wall and CPU time of every stage for each
+    frame (see :class:`~spokestack.profiling.StageProfiler`). The latencies
+    are reported by :meth:`stats`, and an ``overrun`` event is raised for each
+    frame that takes longer than ``frame_budget`` to process.
+
+    Stages that declare a ``schedule`` are only called on the frames they
+    need, such as while the pipeline is active or when speech starts or stops
+    (see :mod:`spokestack.schedule`).
+
+    Setting ``block_size`` processes that many frames per step, which is
+    intended for offline and batch jobs. The block is read with the input
+    source's ``read_block(count)`` method if it has one, or by stacking single
+    reads. The leading stages that provide a ``process_block(context, frames)``
+    method (such as AGC and noise suppression) process the whole block in one
+    call, and the remaining stages are called once per frame of the block. In
+    block mode, the ``step`` event is raised once per block and only the
+    per-frame stages are profiled.
+
     Args:
         input_source: source of audio input
         stages: components desired in the pipeline
+        capture_frames: capacity of the capture queue, or 0 to read the
+                        input source on the pipeline thread
+        overflow_policy: policy applied when the capture queue is full
+        sample_rate: sample rate of the captured audio (Hz)
+        frame_width: width of the captured frames (ms)
+        profile: record per-stage latencies
+        frame_budget: time available to process a frame (s)
+        block_size: number of frames processed per step
         **kwargs: additional keyword arguments
     """
 
-    def __init__(self, input_source: Any, stages: List[Any]) -> None:
+    def __init__(
+        self,
+        input_source: Any,
+        stages: List[Any],
+        capture_frames: int = 0,
+        overflow_policy: str = OVERFLOW_DROP_OLDEST,
+        sample_rate: int = 16000,
+        frame_width: int = 20,
+        profile: bool = False,
+        frame_budget: float = 0.02,
+        block_size: int = 1,
+    ) -> None:
+        if block_size < 1:
+            raise ValueError("invalid_block_size")
+
         self._context = SpeechContext()
+        self._capture: Optional[CaptureThread] = None
+        if capture_frames:
+            input_source = CaptureThread(
+                input_source, capture_frames, overflow_policy, sample_rate, frame_width
+            )
+            self._capture = input_source
         self._input_source = input_source
         self._stages: list = stages
+
+        # split off the leading stages that can process a block at a time
+        self._block_size = block_size
+        self._block_stages: List[Any] = []
+        if block_size > 1:
+            for stage in stages:
+                if not callable(getattr(type(stage), "process_block", None)):
+                    break
+                self._block_stages.append(stage)
+        self._frame_stages = stages[len(self._block_stages) :]
+
+        self._scheduler: Optional[StageScheduler] = StageScheduler(self._frame_stages)
+        if not self._scheduler.is_enabled:
+            self._scheduler = None
+        self._profiler: Optional[StageProfiler] = None
+        if profile:
+            self._profiler = StageProfiler(self._frame_stages, frame_budget)
         self._is_running = False
         self._is_paused = False
 
     def _dispatch(self) -> None:
-        frame = self._input_source.read()
-        for stage in self._stages:
+        if self._block_size == 1:
+            self._process(self._input_source.read())
+            return
+
+        frames = self._read_block()
+        for stage in self._block_stages:
+            stage.process_block(self._context, frames)
+        for frame in frames:
+            self._process(frame)
+
+    def _read_block(self) -> np.ndarray:
+        read_block = getattr(self._input_source, "read_block", None)
+        if read_block is not None:
+            return read_block(self._block_size)
+        return np.stack([self._input_source.read() for _ in range(self._block_size)])
+
+    def _process(self, frame: np.ndarray) -> None:
+        self._context.next_frame()
+        if self._profiler is not None:
+            self._profiler.dispatch(
+                self._context, self._frame_stages, frame, self._scheduler
+            )
+            return
+        if self._scheduler is not None:
+            for i, stage in enumerate(self._frame_stages):
+                if self._scheduler.due(i, self._context):
+                    stage(self._context, frame)
+            return
+        for stage in self._frame_stages:
             stage(self._context, frame)
 
     def close(self) -> None:
@@ -36,6 +138,8 @@ class SpeechPipeline:
             stage.close()
 
         self._stages.clear()
+        self._block_stages.clear()
+        self._frame_stages.clear()
         self._input_source.close()
 
     def activate(self) -> None:
@@ -100,6 +204,16 @@ class SpeechPipeline:
         else:
             return lambda function: self.event(function, name)
 
+    def stats(self) -> Dict[str, Any]:
+        """Latency statistics recorded when profiling is enabled
+
+        Returns: dictionary of frame and per-stage latencies, or an empty
+                 dictionary if the pipeline is not being profiled
+        """
+        if self._profiler is None:
+            return {}
+        return self._profiler.stats
+
     @property
     def is_running(self) -> bool:
         """ State of the pipeline """
@@ -109,3 +223,92 @@ class SpeechPipeline:
     def context(self) -> SpeechContext:
         """ Current context """
         return self._context
+
+    @property
+    def capture(self) -> Optional[CaptureThread]:
+        """ Capture thread feeding the pipeline, if enabled """
+        return self._capture
+
+
+class AsyncSpeechPipeline(SpeechPipeline):
+    """Pipeline for managing speech components on an asyncio event loop.
+
+    The input source must provide a coroutine ``read()`` method, which lets
+    many pipelines share a single event loop instead of blocking a thread per
+    stream. Stages with a coroutine ``__call__`` are awaited, so network
+    stages, such as the asyncio speech recognizers, await sending audio and
+    receive responses on tasks of their own without blocking the loop. The
+    remaining stages are called directly on the event loop, or, when an
+    ``executor`` is given, consecutive runs of them are offloaded together to
+    the executor.
+
+    Args:
+        input_source: source of audio input with an awaitable read method
+        stages: components desired in the pipeline
+        executor: executor used to run CPU bound stages off the event loop,
+                  or None to run them on the loop
+    """
+
+    def __init__(
+        self,
+        input_source: Any,
+        stages: List[Any],
+        executor: Optional[Executor] = None,
+    ) -> None:
+        super().__init__(input_source, stages)
+        self._executor = executor
+
+        # group the stages into runs of awaitable and synchronous stages
+        # so that each synchronous run costs a single executor hop per frame
+        self._groups: List[Tuple[bool, List[Tuple[int, Any]]]] = []
+        for i, stage in enumerate(stages):
+            is_async = asyncio.iscoroutinefunction(
+                stage
+            ) or asyncio.iscoroutinefunction(stage.__call__)
+            if not is_async and self._groups and not self._groups[-1][0]:
+                self._groups[-1][1].append((i, stage))
+            else:
+                self._groups.append((is_async, [(i, stage)]))
+
+    async def _dispatch(self) -> None:  # type: ignore[override]
+        frame = await self._input_source.read()
+        self._context.next_frame()
+        for is_async, stages in self._groups:
+            if is_async:
+                for i, stage in stages:
+                    if self._is_due(i):
+                        await stage(self._context, frame)
+            elif self._executor is not None:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    self._executor, self._call_stages, stages, frame
+                )
+            else:
+                self._call_stages(stages, frame)
+
+    def _call_stages(self, stages: List[Tuple[int, Any]], frame: Any) -> None:
+        for i, stage in stages:
+            if self._is_due(i):
+                stage(self._context, frame)
+
+    def _is_due(self, index: int) -> bool:
+        return self._scheduler is None or self._scheduler.due(index, self._context)
+
+    def close(self) -> None:
+        """ Closes the running pipeline """
+        super().close()
+        self._groups.clear()
+
+    async def run(self) -> None:  # type: ignore[override]
+        """ Runs the pipeline to process speech until stop is called """
+        if not self._is_running:
+            self.start()
+
+        while self._is_running:
+            await self.step()
+
+    async def step(self) -> None:  # type: ignore[override]
+        """ Process a single frame with the pipeline """
+        self._context.event("step")
+        if not self._is_paused:
+            await self._dispatch()
@@ -1,7 +1,7 @@
 """
 Pipeline profile for pyaudio input, vad, keyword.
 """
-from typing import Any, List
+from typing import Any, List, Optional
 
 from spokestack.activation_timeout import ActivationTimeout
 from spokestack.agc.webrtc import AutomaticGainControl
@@ -21,6 +21,8 @@ class SpokestackKeyword:
         model_dir: str,
         sample_rate: int = 16000,
         frame_width: int = 20,
+        num_threads: Optional[int] = None,
+        delegates: Optional[List[Any]] = None,
         **kwargs: Any
     ) -> SpeechPipeline:
         """Create a speech pipeline instance from profile.
@@ -30,6 +32,10 @@ class SpokestackKeyword:
             classes: (List(str)): Classes for the keyword model to recognize
             sample_rate (int): sample rate of the audio (Hz).
             frame_width (int): width of the audio frame: 10, 20, or 30 (ms).
+            num_threads (int): threads used by each TFLite model, or None for
+                               the runtime default.
+            delegates (List[Any]): TFLite delegates, or paths to delegate
+                                   libraries, used by each model.
 
         """
         pipeline = SpeechPipeline(
@@ -47,6 +53,8 @@ class SpokestackKeyword:
                     classes=classes,
                     model_dir=model_dir,
                     sample_rate=sample_rate,
+                    num_threads=num_threads,
+                    delegates=delegates,
                     **kwargs,
                 ),
                 ActivationTimeout(frame_width=frame_width, **kwargs),
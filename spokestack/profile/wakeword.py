@@ -1,7 +1,7 @@
 """
 Pipeline profile for pyaudio input, vad, wakeword.
 """
-from typing import Any
+from typing import Any, List, Optional
 
 from spokestack.activation_timeout import ActivationTimeout
 from spokestack.agc.webrtc import AutomaticGainControl
@@ -17,7 +17,12 @@ class SpokestackWakeword:
 
     @staticmethod
     def create(
-        model_dir: str, sample_rate: int = 16000, frame_width: int = 20, **kwargs: Any
+        model_dir: str,
+        sample_rate: int = 16000,
+        frame_width: int = 20,
+        num_threads: Optional[int] = None,
+        delegates: Optional[List[Any]] = None,
+        **kwargs: Any,
     ) -> SpeechPipeline:
         """Creates a speech pipeline instance from profile
 
@@ -25,6 +30,10 @@ class SpokestackWakeword:
             sample_rate (int): sample rate of the audio (Hz).
             frame_width (int): width of the audio frame: 10, 20, or 30 (ms).
             model_dir (str): Directory containing the tflite wakeword models.
+            num_threads (int): threads used by each TFLite model, or None for
+                               the runtime default.
+            delegates (List[Any]): TFLite delegates, or paths to delegate
+                                   libraries, used by each model.
 
         Returns:
 
@@ -45,6 +54,8 @@ class SpokestackWakeword:
                     sample_rate=sample_rate,
                     frame_width=frame_width,
                     model_dir=model_dir,
+                    num_threads=num_threads,
+                    delegates=delegates,
                     **kwargs,
                 ),
                 ActivationTimeout(frame_width=frame_width, **kwargs),
@@ -0,0 +1,196 @@
+"""
+This module contains the latency instrumentation used to profile the
+stages of a speech pipeline.
+"""
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from spokestack.context import SpeechContext
+from spokestack.schedule import StageScheduler
+
+
+class LatencyHistogram:
+    """Fixed-size histogram of latencies with logarithmic buckets
+
+    Recording a latency costs a logarithm and an increment, and the memory
+    used does not grow with the number of frames. Percentiles are reported as
+    the upper bound of the bucket containing them, so they are accurate to
+    the bucket resolution (about 9% with the default 8 buckets per octave).
+
+    Args:
+        min_latency (float): upper bound of the first bucket (s)
+        max_latency (float): lower bound of the overflow bucket (s)
+        buckets_per_octave (int): resolution of the histogram
+    """
+
+    def __init__(
+        self,
+        min_latency: float = 1e-6,
+        max_latency: float = 10.0,
+        buckets_per_octave: int = 8,
+    ) -> None:
+        self._min_latency = min_latency
+        self._scale = buckets_per_octave / math.log(2)
+        size = int(math.ceil(math.log(max_latency / min_latency) * self._scale)) + 1
+        self._counts = np.zeros(size + 1, np.int64)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, latency: float) -> None:
+        """Adds a single latency to the histogram
+
+        Args:
+            latency (float): measured latency (s)
+
+        """
+        if latency > self._min_latency:
+            index = int(math.log(latency / self._min_latency) * self._scale) + 1
+            self._counts[min(index, len(self._counts) - 1)] += 1
+        else:
+            self._counts[0] += 1
+        self._count += 1
+        self._total += latency
+        self._max = max(self._max, latency)
+
+    def percentile(self, percent: float) -> float:
+        """Computes an approximate percentile of the recorded latencies
+
+        Args:
+            percent (float): percentile to compute, in the range [0, 100]
+
+        Returns: upper bound of the bucket containing the percentile (s)
+
+        """
+        if not self._count:
+            return 0.0
+        rank = max(1, int(math.ceil(self._count * percent / 100)))
+        index = int(np.searchsorted(np.cumsum(self._counts), rank))
+        if index == len(self._counts) - 1:
+            return self._max
+        upper = self._min_latency * math.exp(index / self._scale)
+        return min(upper, self._max)
+
+    def reset(self) -> None:
+        """ Clears the recorded latencies """
+        self._counts[:] = 0
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    @property
+    def count(self) -> int:
+        """ Number of recorded latencies """
+        return self._count
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Summary of the recorded latencies
+
+        Returns: dictionary of the mean, p50, p95, p99, and max latency (s)
+        """
+        return {
+            "mean": self._total / self._count if self._count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self._max,
+        }
+
+
+class StageProfiler:
+    """Records the wall and CPU time spent in each stage of a pipeline
+
+    Args:
+        stages (List[Any]): components of the profiled pipeline
+        frame_budget (float): time available to process a frame (s),
+                              usually the frame width of the input
+    """
+
+    def __init__(self, stages: List[Any], frame_budget: float = 0.02) -> None:
+        self._frame_budget = frame_budget
+        self._names = _stage_names(stages)
+        self._wall = [LatencyHistogram() for _ in stages]
+        self._cpu = [LatencyHistogram() for _ in stages]
+        self._frame_wall = LatencyHistogram()
+        self._frame_cpu = LatencyHistogram()
+        self._overruns = 0
+
+    def dispatch(
+        self,
+        context: SpeechContext,
+        stages: List[Any],
+        frame: Any,
+        scheduler: Optional[StageScheduler] = None,
+    ) -> None:
+        """Runs a frame through the stages and records their latencies
+
+        An ``overrun`` event is raised on the context when the stages take
+        longer than the frame budget to process the frame. Stages skipped by
+        the scheduler are not recorded.
+
+        Args:
+            context (SpeechContext): the current state of the pipeline
+            stages (List[Any]): components of the pipeline
+            frame (Any): frame of audio to process
+            scheduler (StageScheduler): optional schedule for the stages
+
+        """
+        wall_start = wall = time.perf_counter()
+        cpu_start = cpu = time.thread_time()
+        for i, stage in enumerate(stages):
+            if scheduler is not None and not scheduler.due(i, context):
+                continue
+            stage(context, frame)
+            wall_end = time.perf_counter()
+            cpu_end = time.thread_time()
+            self._wall[i].record(wall_end - wall)
+            self._cpu[i].record(cpu_end - cpu)
+            wall, cpu = wall_end, cpu_end
+
+        elapsed = wall - wall_start
+        self._frame_wall.record(elapsed)
+        self._frame_cpu.record(cpu - cpu_start)
+        if elapsed > self._frame_budget:
+            self._overruns += 1
+            context.event("overrun")
+
+    def reset(self) -> None:
+        """ Clears the recorded latencies """
+        for histogram in self._wall + self._cpu:
+            histogram.reset()
+        self._frame_wall.reset()
+        self._frame_cpu.reset()
+        self._overruns = 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Latency statistics for the pipeline and each of its stages
+
+        Returns: dictionary containing the number of frames processed, the
+                 number of frames over budget, and the wall and CPU latency
+                 summaries of the whole frame and of each stage, by name
+        """
+        return {
+            "frames": self._frame_wall.count,
+            "overruns": self._overruns,
+            "frame_budget": self._frame_budget,
+            "wall": self._frame_wall.stats,
+            "cpu": self._frame_cpu.stats,
+            "stages": {
+                name: {"wall": wall.stats, "cpu": cpu.stats}
+                for name, wall, cpu in zip(self._names, self._wall, self._cpu)
+            },
+        }
+
+
+def _stage_names(stages: List[Any]) -> List[str]:
+    # stages are named by class, with a suffix for repeated classes
+    names = [type(stage).__name__ for stage in stages]
+    return [
+        f"{name}_{names[:i].count(name)}" if names.count(name) > 1 else name
+        for i, name in enumerate(names)
+    ]
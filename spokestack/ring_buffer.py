@@ -1,7 +1,7 @@
 """
 This module implements the RingBuffer class
 """
-from typing import Any, Union
+from typing import Any, Iterator, Union
 
 import numpy as np
 
@@ -128,3 +128,146 @@ class RingBuffer:
         while not self.is_empty:
             current.append(self.read())
         return np.concatenate(current).astype(self._dtype)
+
+    def write_many(self, items: np.ndarray) -> None:
+        """Writes a sequence of items to the buffer and advances write head
+
+        The items are copied with at most two slice assignments, one on each
+        side of the end of the buffer.
+
+        Args:
+            items (np.ndarray): Array of items to be written, along the first axis
+
+        Returns: None
+
+        """
+        space = (self._read - self._write - 1) % self._max_length
+        if len(items) > space:
+            raise IndexError("Buffer is full")
+
+        self._put(items)
+        self._write = (self._write + len(items)) % self._max_length
+
+    def _put(self, items: np.ndarray) -> None:
+        split = min(len(items), self._max_length - self._write)
+        self._buffer[self._write : self._write + split] = items[:split]
+        self._buffer[: len(items) - split] = items[split:]
+
+    def read_many(self, count: int) -> np.ndarray:
+        """Reads a sequence of items from the buffer and advances read head
+
+        Args:
+            count (int): number of items to read
+
+        Returns: Array of the items read, along the first axis
+
+        """
+        if count > (self._write - self._read) % self._max_length:
+            raise IndexError("Buffer is empty")
+
+        split = min(count, self._max_length - self._read)
+        items = np.concatenate(
+            [
+                self._buffer[self._read : self._read + split],
+                self._buffer[: count - split],
+            ]
+        )
+        self._read = (self._read + count) % self._max_length
+        return items
+
+    def windows(self, items: np.ndarray, hop: int) -> Iterator[np.ndarray]:
+        """Writes a sequence of items, yielding each time the buffer fills
+
+        After each full window is yielded, the read head is rewound and
+        advanced by the hop length, so that consecutive windows overlap.
+        This is equivalent to writing the items one at a time and calling
+        :meth:`read_all` whenever the buffer is full, with far fewer writes.
+
+        Args:
+            items (np.ndarray): Array of items to be written, along the first axis
+            hop (int): number of items between the starts of consecutive windows
+
+        Returns: Iterator of the contents of each full window
+
+        """
+        offset = 0
+        while offset < len(items):
+            space = (self._read - self._write - 1) % self._max_length
+            count = min(len(items) - offset, space)
+            self.write_many(items[offset : offset + count])
+            offset += count
+            if self.is_full:
+                yield self.read_all()
+                self.rewind().seek(hop)
+
+
+class MirroredRingBuffer(RingBuffer):
+    """Ring buffer that exposes its contents as a contiguous window
+
+    Every item is written twice, into a backing array that is twice the
+    length of the buffer, so that the most recent ``capacity`` items always
+    occupy a contiguous region. This makes :meth:`read_all` return a view of
+    that region, without iterating, allocating, or copying.
+
+    The view returned by :meth:`read_all` is only valid until the next write
+    to the buffer, so callers must copy it if they need to keep it.
+    """
+
+    def __init__(self, shape: list, dtype: Any = np.float32) -> None:
+        super().__init__(shape, dtype)
+        self._buffer = np.empty(
+            shape=[2 * self._max_length] + list(self._shape[1:]), dtype=self._dtype
+        )
+
+    def write(self, item: np.ndarray) -> None:
+        """Writes to the buffer and advances write head
+
+        Args:
+            item (np.ndarray): Array to be written to the buffer. Can be n-dimensional
+
+        Returns: None
+
+        """
+        if self.is_full:
+            raise IndexError("Buffer is full")
+
+        self._buffer[self._write] = item
+        self._buffer[self._write + self._max_length] = item
+        self._write = (self._write + 1) % self._max_length
+
+    def _put(self, items: np.ndarray) -> None:
+        super()._put(items)
+        start = self._write + self._max_length
+        split = min(len(items), self._max_length - self._write)
+        self._buffer[start : start + split] = items[:split]
+        wrap = self._max_length + len(items) - split
+        self._buffer[self._max_length : wrap] = items[split:]
+
+    def read_many(self, count: int) -> np.ndarray:
+        """Returns a view of a sequence of items and advances read head
+
+        As with :meth:`read_all`, the view is only valid until the next write.
+
+        Args:
+            count (int): number of items to read
+
+        Returns: Array of the items read, along the first axis
+
+        """
+        if count > (self._write - self._read) % self._max_length:
+            raise IndexError("Buffer is empty")
+
+        items = self._buffer[self._read : self._read + count]
+        self._read = (self._read + count) % self._max_length
+        return items
+
+    def read_all(self) -> np.ndarray:
+        """Returns a view of the entire contents of the buffer
+
+        Returns: Array with full contents of the buffer, in write order
+
+        """
+        self.rewind()
+        start = self._read
+        self._read = self._write
+        return self._buffer[start : start + self._max_length - 1]
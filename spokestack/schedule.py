@@ -0,0 +1,78 @@
+"""
+This module contains the flags that pipeline stages use to declare when they
+need to run, along with the scheduler that applies them.
+
+A stage declares its schedule with a ``schedule`` attribute, which combines
+the flags below. The stage is called on every frame that matches any of its
+flags, and skipped otherwise. Stages without a ``schedule`` are called on
+every frame. ::
+
+    class Recognizer:
+        # run while active, plus the frame where activation ends
+        schedule = RUN_ACTIVE | RUN_ACTIVE_EDGE
+
+Edges compare the context seen by the stage with the context seen at the
+same position in the pipeline on the previous frame, whether or not the stage
+ran. A stage that tracks its own edges must include the matching edge flag,
+so that it never misses a change of state.
+"""
+from typing import Any, List
+
+from spokestack.context import SpeechContext
+
+RUN_ALWAYS = 0
+RUN_ACTIVE = 1
+RUN_INACTIVE = 2
+RUN_SPEECH = 4
+RUN_ACTIVE_EDGE = 8
+RUN_SPEECH_EDGE = 16
+
+
+class StageScheduler:
+    """Decides which stages of a pipeline run on each frame
+
+    Args:
+        stages (List[Any]): components of the pipeline
+
+    """
+
+    def __init__(self, stages: List[Any]) -> None:
+        self._schedules = [_schedule(stage) for stage in stages]
+        self._states = [RUN_INACTIVE for _ in stages]
+
+    @property
+    def is_enabled(self) -> bool:
+        """ Whether any stage declares a schedule """
+        return any(self._schedules)
+
+    def due(self, index: int, context: SpeechContext) -> bool:
+        """Checks whether a stage needs to run on the current frame
+
+        This must be called once per frame for every scheduled stage, in
+        pipeline order, so that edges are detected.
+
+        Args:
+            index (int): position of the stage in the pipeline
+            context (SpeechContext): the current state of the pipeline
+
+        Returns: True if the stage should be called
+
+        """
+        schedule = self._schedules[index]
+        if not schedule:
+            return True
+
+        state = RUN_ACTIVE if context.is_active else RUN_INACTIVE
+        if context.is_speech:
+            state |= RUN_SPEECH
+
+        # shift the changed activity and speech bits onto their edge flags
+        changed = state ^ self._states[index]
+        self._states[index] = state
+        edges = (changed & RUN_ACTIVE) << 3 | (changed & RUN_SPEECH) << 2
+        return bool(schedule & (state | edges))
+
+
+def _schedule(stage: Any) -> int:
+    schedule = getattr(stage, "schedule", RUN_ALWAYS)
+    return schedule if isinstance(schedule, int) else RUN_ALWAYS
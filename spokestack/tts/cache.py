@@ -0,0 +1,306 @@
+"""
+This module contains a cache of synthesized audio that sits between a text to
+speech client and the TextToSpeechManager.
+
+Example:
+    This example caches the prompts of a phone menu, which are synthesized
+    once when the application starts, and then played back from memory, or
+    from disk after a restart. ::
+
+        import logging
+
+        from spokestack.io.pyaudio import PyAudioOutput
+        from spokestack.tts.cache import CachedClient
+        from spokestack.tts.clients.spokestack import TextToSpeechClient
+        from spokestack.tts.manager import TextToSpeechManager
+
+        client = CachedClient(
+            TextToSpeechClient("spokestack_id", "spokestack_secret"),
+            max_bytes=32 * 1024 * 1024,
+            cache_dir="./tts_cache",
+        )
+        client.warm(["Please hold.", "Press one for billing."])
+
+        manager = TextToSpeechManager(client, PyAudioOutput())
+        manager.synthesize("Please hold.")
+        logging.info("tts cache: %s", client.stats)
+
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+_Key = Tuple[str, str, str, str, str]
+
+
+class CachedClient:
+    """Text to speech client wrapper that caches synthesized audio
+
+    Audio is cached under the utterance, mode, voice and profile of each
+    request, along with a hash that identifies the model, so that changing
+    the model invalidates its audio. Recently used audio is kept in memory,
+    up to ``max_bytes``. When a cache directory is given, all audio is also
+    written to disk, and is read back through memory-mapped files, so that
+    the cache survives restarts. Audio read from disk is copied into memory
+    on first access when it fits within ``max_bytes``, so that later requests
+    are served from memory. Audio that does not fit is played from the
+    memory-mapped file, so that ``max_bytes`` only counts audio that is
+    actually held in memory.
+
+    Cached audio is played without any model or network work. On a miss, the
+    wrapped client's audio is passed through as it arrives, and is cached
+    once the request has been read to the end. Both encoded audio, such as the
+    MP3 returned by the TextToSpeechClient, and the PCM-16 blocks returned by
+    the SpeechSynthesizer are supported. Cached audio is returned in chunks
+    of ``chunk_size`` bytes or samples, rather than the chunks returned by
+    the client.
+
+    Args:
+        client (Any): text to speech client to cache
+        max_bytes (int): memory budget for cached audio (bytes)
+        cache_dir (str): directory for cached audio files, or None to only
+                         cache in memory
+        model_hash (str): identifies the model used by the client, such as
+                          the result of :func:`hash_model`
+        chunk_size (int): size of each chunk of cached audio (bytes or samples)
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_bytes: int = 16 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        model_hash: str = "",
+        chunk_size: int = 16384,
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError("invalid_max_bytes")
+        if chunk_size < 1:
+            raise ValueError("invalid_chunk_size")
+
+        self._client = client
+        self._max_bytes = max_bytes
+        self._cache_dir = cache_dir
+        self._model_hash = model_hash
+        self._chunk_size = chunk_size
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_Key, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def synthesize(
+        self,
+        utterance: str,
+        mode: str = "text",
+        voice: str = "demo-male",
+        profile: str = "default",
+    ) -> Iterator[Any]:
+        """Synthesizes an utterance, from the cache when possible
+
+        Args:
+            utterance (str): string that needs to be rendered as speech.
+            mode (str): synthesis mode to use with utterance. text, ssml, markdown.
+            voice (str): name of the tts voice.
+            profile (str): name of the audio profile used to create the
+                           resulting stream.
+
+        Returns: sequence of audio chunks, as returned by the client
+
+        """
+        key: _Key = (utterance, mode, voice, profile, self._model_hash)
+        audio = self._get(key)
+        if audio is not None:
+            return self._chunks(audio)
+        return self._record(key, self._client.synthesize(*key[:4]))
+
+    def warm(
+        self,
+        utterances: Iterable[str],
+        mode: str = "text",
+        voice: str = "demo-male",
+        profile: str = "default",
+    ) -> int:
+        """Synthesizes and caches any utterances that are not cached
+
+        Args:
+            utterances (Iterable[str]): strings to render as speech
+            mode (str): synthesis mode to use with utterance. text, ssml, markdown.
+            voice (str): name of the tts voice.
+            profile (str): name of the audio profile used to create the
+                           resulting stream.
+
+        Returns: the number of utterances that were synthesized
+
+        """
+        count = 0
+        for utterance in utterances:
+            key: _Key = (utterance, mode, voice, profile, self._model_hash)
+            if self._contains(key):
+                continue
+            for _ in self._record(key, self._client.synthesize(*key[:4])):
+                pass
+            count += 1
+        return count
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics
+
+        Returns: dictionary containing the number of requests served from
+                 memory, from disk, and by the client, the fraction served
+                 from the cache, and the number and size of the entries in
+                 memory (bytes)
+        """
+        with self._lock:
+            requests = self._hits + self._disk_hits + self._misses
+            hits = self._hits + self._disk_hits
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": hits / requests if requests else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def clear(self) -> None:
+        """ Removes all audio from memory, leaving any files on disk """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _get(self, key: _Key) -> Optional[np.ndarray]:
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return audio
+
+        audio = self._load(key)
+        with self._lock:
+            if audio is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+
+            # promote the audio into memory, unless it would not fit
+            if audio.nbytes <= self._max_bytes:
+                audio = np.array(audio)
+                self._put(key, audio)
+        return audio
+
+    def _contains(self, key: _Key) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+        return self._file(key) is not None
+
+    def _record(self, key: _Key, stream: Iterable[Any]) -> Iterator[Any]:
+        # pass the client's audio through, then cache it once it is complete
+        chunks: List[Any] = []
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        if not chunks:
+            return
+
+        if isinstance(chunks[0], np.ndarray):
+            audio = np.concatenate(chunks)
+        else:
+            audio = np.frombuffer(b"".join(chunks), dtype=np.uint8)
+        self._save(key, audio, is_encoded=not isinstance(chunks[0], np.ndarray))
+        with self._lock:
+            self._put(key, audio)
+
+    def _put(self, key: _Key, audio: np.ndarray) -> None:
+        # add an entry, dropping the least recently used entries to fit
+        if audio.nbytes > self._max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        self._entries[key] = audio
+        self._bytes += audio.nbytes
+        while self._bytes > self._max_bytes:
+            _, dropped = self._entries.popitem(last=False)
+            self._bytes -= dropped.nbytes
+
+    def _chunks(self, audio: np.ndarray) -> Iterator[Any]:
+        # encoded audio is stored as unsigned bytes, and returned as bytes,
+        # while PCM-16 audio is returned as arrays
+        is_encoded = audio.dtype == np.uint8
+        for i in range(0, len(audio), self._chunk_size):
+            chunk = audio[i : i + self._chunk_size]
+            yield chunk.tobytes() if is_encoded else chunk
+
+    def _save(self, key: _Key, audio: np.ndarray, is_encoded: bool) -> None:
+        if self._cache_dir is None:
+            return
+
+        # write to a temporary file first, so that a partial file is never read
+        name = os.path.join(self._cache_dir, _digest(key))
+        path = name + (".mp3" if is_encoded else ".npy")
+        temp = f"{name}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as file:
+            if is_encoded:
+                file.write(audio.tobytes())
+            else:
+                np.save(file, audio)
+        os.replace(temp, path)
+
+    def _load(self, key: _Key) -> Optional[np.ndarray]:
+        path = self._file(key)
+        if path is None:
+            return None
+        if path.endswith(".npy"):
+            return np.load(path, mmap_mode="r")
+        return np.memmap(path, dtype=np.uint8, mode="r")
+
+    def _file(self, key: _Key) -> Optional[str]:
+        if self._cache_dir is None:
+            return None
+        name = os.path.join(self._cache_dir, _digest(key))
+        for extension in [".npy", ".mp3"]:
+            if os.path.exists(name + extension):
+                return name + extension
+        return None
+
+
+def hash_model(model_path: str) -> str:
+    """Hashes the files of a model, for use as a cache's model hash
+
+    Args:
+        model_path (str): path to a model file, or a directory of model files
+
+    Returns: hex digest of the model's files
+
+    """
+    paths = [model_path]
+    if os.path.isdir(model_path):
+        paths = [
+            os.path.join(model_path, name) for name in sorted(os.listdir(model_path))
+        ]
+
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isfile(path):
+            digest.update(os.path.basename(path).encode("utf-8"))
+            with open(path, "rb") as file:
+                for block in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def _digest(key: _Key) -> str:
+    return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
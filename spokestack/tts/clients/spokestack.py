@@ -4,10 +4,21 @@ This module contains the Spokestack client for text to speech
 import base64
 import hashlib
 import hmac
+import itertools
 import json
-from typing import Any, Iterator
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Iterable, Iterator, Optional, Set, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# server responses that are retried, along with connection errors
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# file extensions for profiles that do not return MP3 audio
+_EXTENSIONS = {"discord": ".opus"}
 
 _MODES = {
     "ssml": "synthesizeSsml",
@@ -19,19 +30,58 @@ _MODES = {
 class TextToSpeechClient:
     """Spokestack Text to Speech Client
 
+    Requests are made through a session that keeps a pool of connections
+    to each host alive between utterances, so that only the first request
+    to the API and to the audio host pays for connecting. Connection errors
+    and server errors are retried with exponential backoff.
+
     Args:
         key_id (str): identity from spokestack api credentials
         key_secret (str): secret key from spokestack api credentials
         url (str): spokestack api url
+        pool_size (int): maximum number of connections kept for each host,
+                         which should cover the number of threads
+                         synthesizing at once
+        keep_alive (bool): reuse connections between requests
+        timeout (float or Tuple[float, float]): connect and read timeouts (s),
+                                                 or None to wait indefinitely
+        max_retries (int): number of times a failed request is retried
+        backoff_factor (float): base delay between retries, which doubles
+                                with each retry (s)
     """
 
     def __init__(
-        self, key_id: str, key_secret: str, url: str = "https://api.spokestack.io/v1"
+        self,
+        key_id: str,
+        key_secret: str,
+        url: str = "https://api.spokestack.io/v1",
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        timeout: Optional[Union[float, Tuple[float, float]]] = (5.0, 30.0),
+        max_retries: int = 3,
+        backoff_factor: float = 0.2,
     ) -> None:
 
         self._key_id = key_id
         self._key = key_secret.encode("utf-8")
         self._url = url
+        self._timeout = timeout
+
+        # synthesis requests are idempotent, so the GraphQL post is
+        # retried along with the audio download
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=_RETRY_STATUS,
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=retry)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        if not keep_alive:
+            self._session.headers["Connection"] = "close"
 
     def synthesize(
         self,
@@ -66,12 +116,13 @@ class TextToSpeechClient:
 
         """
         audio_url = self.synthesize_url(utterance, mode, voice, profile)
-        response = requests.get(audio_url, stream=True)
+        response = self._session.get(audio_url, stream=True, timeout=self._timeout)
 
         if response.status_code != 200:
+            response.close()
             raise Exception(response.reason)
 
-        return response.iter_content(chunk_size=None)
+        return self._stream(response)
 
     def synthesize_url(
         self,
@@ -112,7 +163,9 @@ class TextToSpeechClient:
             "Authorization": f"Spokestack {self._key_id}:{signature}",
             "Content-Type": "application/json",
         }
-        response: Any = requests.post(self._url, headers=headers, data=body)
+        response: Any = self._session.post(
+            self._url, headers=headers, data=body, timeout=self._timeout
+        )
 
         if response.status_code != 200:
             raise Exception(response.reason)
@@ -123,6 +176,120 @@ class TextToSpeechClient:
 
         return response["data"][_MODES[mode]]["url"]
 
+    def synthesize_many(
+        self,
+        utterances: Iterable[str],
+        concurrency: int = 8,
+        mode: str = "text",
+        voice: str = "demo-male",
+        profile: str = "default",
+        output_dir: Optional[str] = None,
+    ) -> Iterator["SynthesisResult"]:
+        """Converts many utterances to speech concurrently.
+
+        Utterances are synthesized by a pool of ``concurrency`` threads, each
+        requesting the URL of an utterance and then downloading its audio, so
+        that requests for some utterances overlap the downloads of others.
+        Utterances are read from the iterable as threads become available,
+        and results are returned as they finish, which may not be in order.
+        A failed utterance is returned with its error, and does not stop the
+        others. The pool size of the client should be at least the
+        concurrency, so that each thread keeps its connections alive.
+
+        Args:
+            utterances (Iterable[str]): strings that need to be rendered as
+                                        speech.
+            concurrency (int): number of utterances synthesized at once
+            mode (str): synthesis mode to use with utterance. text, ssml, markdown.
+            voice (str): name of the tts voice.
+            profile (str): name of the audio profile used to create the
+                           resulting stream.
+            output_dir (str): directory to write each utterance's audio to,
+                              named by its index, or None to return the
+                              audio in memory
+
+        Returns: iterator of results, one per utterance
+
+        """
+        if concurrency < 1:
+            raise ValueError("invalid_concurrency")
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+
+        items = enumerate(utterances)
+        pending: Set["Future[SynthesisResult]"] = set()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                while True:
+                    # keep a bounded number of utterances queued for the pool
+                    for index, utterance in itertools.islice(
+                        items, 2 * concurrency - len(pending)
+                    ):
+                        pending.add(
+                            executor.submit(
+                                self._synthesize_item,
+                                index,
+                                utterance,
+                                mode,
+                                voice,
+                                profile,
+                                output_dir,
+                            )
+                        )
+                    if not pending:
+                        return
+
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            finally:
+                # drop queued utterances if the caller stops early
+                for future in pending:
+                    future.cancel()
+
+    def close(self) -> None:
+        """ Closes the pooled connections """
+        self._session.close()
+
+    def _synthesize_item(
+        self,
+        index: int,
+        utterance: str,
+        mode: str,
+        voice: str,
+        profile: str,
+        output_dir: Optional[str],
+    ) -> "SynthesisResult":
+        path = None
+        if output_dir is not None:
+            extension = _EXTENSIONS.get(profile, ".mp3")
+            path = os.path.join(output_dir, f"{index}{extension}")
+        try:
+            stream = self.synthesize(utterance, mode, voice, profile)
+            if path is None:
+                return SynthesisResult(index, utterance, audio=b"".join(stream))
+
+            # write to a temporary file, so that failed downloads leave no audio
+            try:
+                with open(path + ".tmp", "wb") as file:
+                    for chunk in stream:
+                        file.write(chunk)
+                os.replace(path + ".tmp", path)
+            finally:
+                if os.path.exists(path + ".tmp"):
+                    os.remove(path + ".tmp")
+            return SynthesisResult(index, utterance, path=path)
+        except Exception as e:
+            return SynthesisResult(index, utterance, error=e)
+
+    @staticmethod
+    def _stream(response: Any) -> Iterator[bytes]:
+        # release the connection even if the audio is not read to the end
+        try:
+            yield from response.iter_content(chunk_size=None)
+        finally:
+            response.close()
+
     @staticmethod
     def _build_body(message: str, mode: str, voice: str, profile: str) -> str:
         if mode not in _MODES:
@@ -146,6 +313,58 @@ class TextToSpeechClient:
         )
 
 
+class SynthesisResult:
+    """Result of one utterance synthesized by
+    :meth:`TextToSpeechClient.synthesize_many`
+
+    Args:
+        index (int): position of the utterance in the input
+        utterance (str): the synthesized utterance
+        audio (bytes): encoded audio, when it was not written to a file
+        path (str): path of the audio file, when it was written to one
+        error (Exception): error raised while synthesizing the utterance
+    """
+
+    def __init__(
+        self,
+        index: int,
+        utterance: str,
+        audio: Optional[bytes] = None,
+        path: Optional[str] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self._index = index
+        self._utterance = utterance
+        self._audio = audio
+        self._path = path
+        self._error = error
+
+    @property
+    def index(self) -> int:
+        """ Position of the utterance in the input """
+        return self._index
+
+    @property
+    def utterance(self) -> str:
+        """ The synthesized utterance """
+        return self._utterance
+
+    @property
+    def audio(self) -> Optional[bytes]:
+        """ Encoded audio, or None if it was written to a file or failed """
+        return self._audio
+
+    @property
+    def path(self) -> Optional[str]:
+        """ Path of the audio file, or None if it was not written to one """
+        return self._path
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """ Error raised while synthesizing, or None if it succeeded """
+        return self._error
+
+
 class TTSError(Exception):
     """ Text to speech error wrapper """
 
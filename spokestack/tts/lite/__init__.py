@@ -22,16 +22,24 @@ Example:
 
 """
 
+import contextlib
+import functools
 import importlib
 import json
 import os
 import re
+import threading
 import typing as T
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
+from spokestack.models.pool import ModelPool
+from spokestack.models.registry import ModelRegistry
+from spokestack.models.shape_cache import ShapeCachedModel
 from spokestack.models.tensorflow import TFLiteModel
+from spokestack.tts.text import split_sentences
 
 # signal configuration
 SAMPLE_RATE = 24000
@@ -55,10 +63,44 @@ class SpeechSynthesizer:
     Args:
         model_path (str): Path to the extracted TTS model downloaded from the
             Spokestack platform
+        registry (ModelRegistry): Optional registry that shares the models
+            with other components
+        num_threads (int): Number of threads used by each model, or None for
+            the runtime default
+        delegates (List[Any]): TFLite delegates, or paths to delegate
+            libraries, used by each model
+        pool_size (int): Number of interpreters kept for each model, so that
+            utterances can be synthesized on several threads at once, or None
+            for a single interpreter. Pooled models are not shared through the
+            registry.
+        pool_timeout (float): Longest time to wait for a pooled interpreter (s),
+            or None to wait indefinitely
+        prefetch (bool): Parse, align and encode the next sentence of an
+            utterance on a worker thread while the current sentence is
+            decoded, so that long utterances play without gaps between
+            sentences. The aligner and encoder are then not shared through
+            the registry, since they run off the caller's thread.
+        max_shapes (int): Keep an interpreter allocated for each of up to
+            this many input lengths of the aligner and encoder, so that
+            sentences of recently seen lengths run without reallocating any
+            tensors, or None to resize a single interpreter whenever the
+            length changes. Inputs are never padded, so the audio is the
+            same either way. These models are not shared through the
+            registry.
 
     """
 
-    def __init__(self, model_path: str):
+    def __init__(
+        self,
+        model_path: str,
+        registry: T.Optional[ModelRegistry] = None,
+        num_threads: T.Optional[int] = None,
+        delegates: T.Optional[T.List[T.Any]] = None,
+        pool_size: T.Optional[int] = None,
+        pool_timeout: T.Optional[float] = None,
+        prefetch: bool = False,
+        max_shapes: T.Optional[int] = None,
+    ):
         # load NLP configuration
         self._lexicon = _load_lexicon(os.path.join(model_path, "lexicon.txt"))
 
@@ -70,12 +112,33 @@ class SpeechSynthesizer:
         self._language: T.Any = importlib.import_module(f"spokestack.tts.lite.{lang}")
         self._nlp = self._language.nlp()
 
-        # load the TTS models
-        self._aligner = TFLiteModel(os.path.join(model_path, "align.tflite"))
-        self._encoder = TFLiteModel(os.path.join(model_path, "encode.tflite"))
-        self._decoder = TFLiteModel(os.path.join(model_path, "decode.tflite"))
+        # load the TTS models, from a pool or the registry when one is given
+        self._registry = registry
+        load: T.Callable[..., T.Any] = TFLiteModel
+        if pool_size is not None:
+            load = functools.partial(ModelPool, size=pool_size, timeout=pool_timeout)
+            self._registry = None
+        elif registry is not None:
+            load = registry.acquire
+        align = encode = load
+        if prefetch and pool_size is None:
+            align = encode = TFLiteModel
+        if max_shapes is not None:
+            align = encode = _shape_cached(max_shapes, pool_size, pool_timeout)
+        options = {"num_threads": num_threads, "delegates": delegates}
+        self._aligner = align(os.path.join(model_path, "align.tflite"), **options)
+        self._encoder = encode(os.path.join(model_path, "encode.tflite"), **options)
+        self._decoder = load(os.path.join(model_path, "decode.tflite"), **options)
         self._aligner_input_index = self._aligner.input_details[0]["index"]
         self._encoder_input_index = self._encoder.input_details[0]["index"]
+        self._prefetch = prefetch
+
+        # a prefetching worker may still be encoding for an abandoned call
+        # when the next call starts, so unpooled models are used by one
+        # sentence at a time
+        self._lock: T.ContextManager = (
+            contextlib.nullcontext() if pool_size is not None else threading.Lock()
+        )
 
     def synthesize(
         self, utterance: str, *_args: T.List, **_kwargs: T.Dict
@@ -91,44 +154,90 @@ class SpeechSynthesizer:
             PCM-16 numpy audio blocks for playback, storage, etc.
 
         """
+        yield from self._synthesize([utterance])
 
-        # segment sentences into a list of phoneme/grapheme lists
-        for tokens in self._parse(utterance):
-            # convert tokens to a vector of ids
-            inputs = self._vectorize(tokens)
+    def synthesize_stream(
+        self, fragments: T.Iterable[str], *_args: T.List, **_kwargs: T.Dict
+    ) -> T.Iterator[np.ndarray]:
+        """
+        Synthesize text to speech audio as the text arrives
 
-            # run the aligner model
-            self._aligner.resize(self._aligner_input_index, inputs.shape)
-            inputs = self._aligner(inputs)[0]
+        The fragments are buffered until they complete a sentence, and each
+        sentence is synthesized as soon as it is complete, so that audio for
+        the first sentence is returned before the rest of the text exists.
+        When prefetching, the fragments are read on the worker thread, so
+        that later sentences are encoded while earlier ones are decoded.
 
-            # run the encoder model
-            self._encoder.resize(self._encoder_input_index, inputs.shape)
-            encoded = self._encoder(inputs)[0]
-
-            # stream the decoder model and cross-fade the output audio
-            overlap = np.zeros([BLOCK_OVERLAP], dtype=np.float32)
-            for i in range(FRAME_OVERLAP, len(encoded), FRAME_LENGTH):
-                # decode the current frame, padding as need to fill the decoder's input
-                inputs = encoded[i - FRAME_OVERLAP : i + FRAME_LENGTH]
-                inputs = np.pad(
-                    inputs,
-                    [(0, (FRAME_LENGTH + FRAME_OVERLAP) - len(inputs)), (0, 0)],
-                    "constant",
-                    constant_values=ENCODER_PAD,
-                )
-                outputs = self._decoder(inputs)[0]
-
-                # fade in the new block, convert to int16 and return it
-                overlap += outputs[:BLOCK_OVERLAP] * FADE_IN
-                block = np.hstack([overlap, outputs[BLOCK_OVERLAP:-BLOCK_OVERLAP]])
-                yield (block * (2 ** 15 - 1)).astype(np.int16)
-
-                # fade out the previous block for mixing with the next block
-                overlap = outputs[-BLOCK_OVERLAP:] * FADE_OUT
+        Args:
+            fragments (Iterable[str]): The text to synthesize, in fragments
+                such as the tokens of a generated response
+
+        Returns:
+            Iterator[np.array]: A generator for returns a sequence of
+            PCM-16 numpy audio blocks for playback, storage, etc.
+
+        """
+        yield from self._synthesize(split_sentences(fragments))
+
+    def close(self) -> None:
+        """ Returns shared models to their registry """
+        if self._registry is not None:
+            for model in [self._aligner, self._encoder, self._decoder]:
+                self._registry.release(model)
+            self._registry = None
+
+    def _synthesize(self, texts: T.Iterable[str]) -> T.Iterator[np.ndarray]:
+        # segment sentences into a list of phoneme/grapheme lists and encode
+        # them, working ahead of the decoder when prefetching
+        sentences: T.Iterator[np.ndarray] = (
+            self._encode(tokens) for text in texts for tokens in self._parse(text)
+        )
+        if self._prefetch:
+            sentences = _prefetch(sentences)
+
+        for encoded in sentences:
+            yield from self._decode(encoded)
 
             # add a break after each segment
             yield np.zeros([int(BREAK_LENGTH * SAMPLE_RATE)], dtype=np.int16)
 
+    def _encode(self, tokens: str) -> np.ndarray:
+        # convert tokens to a vector of ids
+        inputs = self._vectorize(tokens)
+
+        with self._lock:
+            # run the aligner model
+            with _checkout(self._aligner) as aligner:
+                aligner.resize(self._aligner_input_index, inputs.shape)
+                inputs = aligner(inputs)[0]
+
+            # run the encoder model
+            with _checkout(self._encoder) as encoder:
+                encoder.resize(self._encoder_input_index, inputs.shape)
+                return encoder(inputs)[0]
+
+    def _decode(self, encoded: np.ndarray) -> T.Iterator[np.ndarray]:
+        # stream the decoder model and cross-fade the output audio
+        overlap = np.zeros([BLOCK_OVERLAP], dtype=np.float32)
+        for i in range(FRAME_OVERLAP, len(encoded), FRAME_LENGTH):
+            # decode the current frame, padding as need to fill the decoder's input
+            inputs = encoded[i - FRAME_OVERLAP : i + FRAME_LENGTH]
+            inputs = np.pad(
+                inputs,
+                [(0, (FRAME_LENGTH + FRAME_OVERLAP) - len(inputs)), (0, 0)],
+                "constant",
+                constant_values=ENCODER_PAD,
+            )
+            outputs = self._decoder(inputs)[0]
+
+            # fade in the new block, convert to int16 and return it
+            overlap += outputs[:BLOCK_OVERLAP] * FADE_IN
+            block = np.hstack([overlap, outputs[BLOCK_OVERLAP:-BLOCK_OVERLAP]])
+            yield (block * (2 ** 15 - 1)).astype(np.int16)
+
+            # fade out the previous block for mixing with the next block
+            overlap = outputs[-BLOCK_OVERLAP:] * FADE_OUT
+
     def _parse(self, text: str) -> T.Iterator[str]:
         # perform language-specific number conversions, abbreviation expansions, etc.
         text = self._language.clean(text)
@@ -197,3 +306,40 @@ def _load_lexicon(path: str) -> T.Dict[str, T.Dict[T.Optional[str], str]]:
                 lexicon[word][pos] = ipa
 
     return lexicon
+
+
+@contextlib.contextmanager
+def _checkout(model: T.Any) -> T.Iterator[T.Any]:
+    # pooled models lend an interpreter for both the resize and the
+    # invocation, while other models are used directly
+    if isinstance(model, ModelPool):
+        with model.checkout() as pooled:
+            yield pooled
+    else:
+        yield model
+
+
+def _prefetch(items: T.Iterator[T.Any]) -> T.Iterator[T.Any]:
+    # advance an iterator on a worker thread, one item ahead of the caller
+    done = object()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(next, items, done)
+        while True:
+            item = pending.result()
+            if item is done:
+                return
+            pending = executor.submit(next, items, done)
+            yield item
+
+
+def _shape_cached(
+    max_shapes: int, pool_size: T.Optional[int], pool_timeout: T.Optional[float]
+) -> T.Callable[..., T.Any]:
+    load: T.Callable[..., T.Any] = functools.partial(
+        ShapeCachedModel, max_shapes=max_shapes
+    )
+    if pool_size is not None:
+        load = functools.partial(
+            ModelPool, size=pool_size, timeout=pool_timeout, factory=load
+        )
+    return load
@@ -3,10 +3,15 @@ This module contains the Spokestack text to speech manager which handles a
 text to speech client, decodes the returned audio, and writes the audio to
 the specified output.
 """
-from typing import Any
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional
 
 from streamp3 import MP3Decoder
 
+from spokestack.tts.text import split_sentences
+
 
 FORMAT_MP3 = "mp3"
 FORMAT_PCM16 = "pcm-16"
@@ -15,19 +20,43 @@ FORMAT_PCM16 = "pcm-16"
 class TextToSpeechManager:
     """Manages tts client and io target.
 
+    By default, audio is downloaded, decoded and written to the output on
+    the calling thread. When a buffer size is given, download and decoding
+    run ahead on a worker thread into a bounded buffer of PCM audio, which
+    the calling thread drains into the output, so that network stalls and
+    decoding time are absorbed by the buffered audio rather than heard as
+    gaps.
+
     Args:
         client: Text to speech client that returns encoded mp3 audio
         output: Audio io target
         format_: Audio format, one of FORMAT_MP3 or FORMAT_PCM16
+        buffer_bytes: Size of the decoded audio buffer (bytes), or None to
+                      decode on the calling thread
+        preroll_bytes: Audio buffered before playback starts, and again after
+                       each underrun (bytes). For example, 24kHz PCM-16 audio
+                       fills 48000 bytes per second.
     """
 
-    def __init__(self, client: Any, output: Any, format_: str = FORMAT_MP3) -> None:
+    def __init__(
+        self,
+        client: Any,
+        output: Any,
+        format_: str = FORMAT_MP3,
+        buffer_bytes: Optional[int] = None,
+        preroll_bytes: int = 0,
+    ) -> None:
         if format_ != FORMAT_MP3 and format_ != FORMAT_PCM16:
             raise ValueError("invalid_format")
 
         self._client = client
         self._output = output
         self._format = format_
+        self._buffer: Optional[JitterBuffer] = None
+        if buffer_bytes is not None:
+            self._buffer = JitterBuffer(buffer_bytes, preroll_bytes)
+        self._sentence_time: Optional[float] = None
+        self._audio_time: Optional[float] = None
 
     def synthesize(
         self,
@@ -53,17 +82,108 @@ class TextToSpeechManager:
                            resulting stream.
 
         """
-        stream = self._client.synthesize(utterance, mode, voice, profile)
+        self._play(self._client.synthesize(utterance, mode, voice, profile))
+
+    def synthesize_stream(
+        self,
+        fragments: Iterable[str],
+        mode: str = "text",
+        voice: str = "demo-male",
+        profile: str = "default",
+    ) -> None:
+        """Synthesizes text as it arrives, such as a generated response.
+
+        Plain text fragments are buffered until they complete a sentence,
+        and each sentence is synthesized and played as soon as it is
+        complete. Clients that accept a stream of text, such as the
+        SpeechSynthesizer, receive the sentences as a single stream, while
+        other clients synthesize one request per sentence. Markup can not be
+        split safely, so SSML and Speech Markdown fragments are collected into
+        a single utterance.
+
+        Args:
+            fragments (Iterable[str]): text to render as speech, in fragments
+            mode (str): synthesis mode to use with utterance. text, ssml, markdown, etc.
+            voice (str): name of the tts voice.
+            profile (str): name of the audio profile used to create the
+                           resulting stream.
+
+        """
+        self._sentence_time = None
+        self._audio_time = None
+        if mode != "text":
+            self.synthesize("".join(fragments), mode, voice, profile)
+            return
+
+        sentences = self._sentences(fragments)
+        if hasattr(self._client, "synthesize_stream"):
+            self._play(self._client.synthesize_stream(sentences, mode, voice, profile))
+        else:
+            for sentence in sentences:
+                self._play(self._client.synthesize(sentence, mode, voice, profile))
+
+    @property
+    def time_to_first_audio(self) -> Optional[float]:
+        """Latency of the last streamed utterance
+
+        Returns: time from the first sentence of the last call to
+                 :meth:`synthesize_stream` being complete to its first audio
+                 being written (s), or None if no audio was written
+        """
+        if self._sentence_time is None or self._audio_time is None:
+            return None
+        return self._audio_time - self._sentence_time
+
+    def _sentences(self, fragments: Iterable[str]) -> Iterator[str]:
+        for sentence in split_sentences(fragments):
+            if self._sentence_time is None:
+                self._sentence_time = time.perf_counter()
+            yield sentence
+
+    @property
+    def playback_stats(self) -> Optional[Dict[str, Any]]:
+        """Statistics of the decoded audio buffer
+
+        Returns: dictionary of buffer statistics, as described by
+                 :attr:`JitterBuffer.stats`, or None if audio is not buffered
+        """
+        return self._buffer.stats if self._buffer is not None else None
 
+    def _play(self, stream: Any) -> None:
+        frames = self._decode(stream)
+        if self._buffer is None:
+            for frame in frames:
+                self._write(frame)
+            return
+
+        # decode ahead on a worker thread, while playing from the buffer
+        buffer = self._buffer
+        buffer.reset()
+        worker = threading.Thread(target=buffer.fill, args=(frames,), daemon=True)
+        worker.start()
+        try:
+            audio = buffer.get()
+            while audio is not None:
+                self._write(audio)
+                audio = buffer.get()
+        finally:
+            buffer.stop()
+            worker.join()
+
+    def _decode(self, stream: Any) -> Iterator[bytes]:
         if self._format == FORMAT_MP3:
             # decode the sequence of MP3 frames
             stream = SequenceIO(stream)
-            for frame in MP3Decoder(stream):
-                self._output.write(frame)
+            yield from MP3Decoder(stream)
         elif self._format == FORMAT_PCM16:
-            # write the raw audio to the output
+            # pass the raw audio through
             for frame in stream:
-                self._output.write(frame.tobytes())
+                yield frame.tobytes()
+
+    def _write(self, audio: bytes) -> None:
+        if self._audio_time is None:
+            self._audio_time = time.perf_counter()
+        self._output.write(audio)
 
     def close(self) -> None:
         """ Closes the client and output. """
@@ -71,6 +191,170 @@ class TextToSpeechManager:
         self._output = None
 
 
+class JitterBuffer:
+    """Bounded buffer of decoded audio between a decoder and playback
+
+    The decoder waits while the buffer holds ``max_bytes`` or more. Playback
+    waits until ``preroll_bytes`` have been buffered before it starts. If
+    playback empties the buffer before the decoder has finished, it counts an
+    underrun and waits for the preroll again. Statistics accumulate over
+    every stream played through the buffer.
+
+    Args:
+        max_bytes (int): audio held before the decoder waits (bytes)
+        preroll_bytes (int): audio buffered before playback starts (bytes)
+    """
+
+    def __init__(self, max_bytes: int, preroll_bytes: int = 0) -> None:
+        if max_bytes < 1:
+            raise ValueError("invalid_buffer_bytes")
+        if not 0 <= preroll_bytes <= max_bytes:
+            raise ValueError("invalid_preroll_bytes")
+
+        self._max_bytes = max_bytes
+        self._preroll_bytes = preroll_bytes
+        self._condition = threading.Condition()
+        self._frames: Deque[bytes] = deque()
+        self._bytes = 0
+        self._is_closed = False
+        self._is_stopped = False
+        self._is_playing = False
+        self._error: Optional[Exception] = None
+
+        self._reads = 0
+        self._fill_total = 0
+        self._peak_fill = 0
+        self._underruns = 0
+        self._underrun_time = 0.0
+
+    def reset(self) -> None:
+        """ Empties the buffer for a new stream, keeping its statistics """
+        with self._condition:
+            self._frames.clear()
+            self._bytes = 0
+            self._is_closed = False
+            self._is_stopped = False
+            self._is_playing = False
+            self._error = None
+
+    def fill(self, frames: Iterable[bytes]) -> None:
+        """Decoder side: adds frames until they end or playback stops
+
+        Errors raised by the frames are passed to playback, which raises them
+        once the audio buffered before the error has been played.
+
+        Args:
+            frames (Iterable[bytes]): decoded audio frames
+
+        """
+        try:
+            for frame in frames:
+                if not self.put(frame):
+                    return
+        except Exception as e:
+            self.close(e)
+        else:
+            self.close()
+
+    def put(self, frame: bytes) -> bool:
+        """Decoder side: adds a frame, waiting while the buffer is full
+
+        Args:
+            frame (bytes): decoded audio
+
+        Returns: False if playback has stopped, and True otherwise
+
+        """
+        with self._condition:
+            while self._bytes >= self._max_bytes and not self._is_stopped:
+                self._condition.wait()
+            if self._is_stopped:
+                return False
+            self._frames.append(frame)
+            self._bytes += len(frame)
+            self._peak_fill = max(self._peak_fill, self._bytes)
+            self._condition.notify_all()
+            return True
+
+    def close(self, error: Optional[Exception] = None) -> None:
+        """Decoder side: marks the end of the stream
+
+        Args:
+            error (Exception): error that ended the stream, if any
+
+        """
+        with self._condition:
+            self._is_closed = True
+            self._error = error
+            self._condition.notify_all()
+
+    def get(self) -> Optional[bytes]:
+        """Playback side: removes the next frame, waiting for the preroll
+
+        Raises:
+            Exception: the error that ended the stream, once the frames
+                       buffered before it have been returned
+
+        Returns: the next frame, or None at the end of the stream
+
+        """
+        with self._condition:
+            if self._is_playing and not self._frames and not self._is_closed:
+                # playback has caught up with the decoder
+                self._underruns += 1
+                self._is_playing = False
+                start = time.perf_counter()
+                self._wait()
+                self._underrun_time += time.perf_counter() - start
+            elif not self._is_playing:
+                self._wait()
+
+            if not self._frames:
+                if self._error is not None:
+                    raise self._error
+                return None
+
+            self._is_playing = True
+            self._reads += 1
+            self._fill_total += self._bytes
+            frame = self._frames.popleft()
+            self._bytes -= len(frame)
+            self._condition.notify_all()
+            return frame
+
+    def stop(self) -> None:
+        """ Playback side: stops the decoder, such as when playback fails """
+        with self._condition:
+            self._is_stopped = True
+            self._condition.notify_all()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Buffer statistics
+
+        Returns: dictionary containing the capacity and current fill of the
+                 buffer, its peak fill and mean fill when each frame was
+                 played (bytes), the number of underruns, and the time
+                 playback spent waiting after them (s)
+        """
+        with self._condition:
+            return {
+                "buffer_bytes": self._max_bytes,
+                "fill_bytes": self._bytes,
+                "peak_fill_bytes": self._peak_fill,
+                "mean_fill_bytes": self._fill_total / self._reads
+                if self._reads
+                else 0.0,
+                "underruns": self._underruns,
+                "underrun_time": self._underrun_time,
+            }
+
+    def _wait(self) -> None:
+        # wait for the preroll, or for the end of the stream
+        while self._bytes < max(self._preroll_bytes, 1) and not self._is_closed:
+            self._condition.wait()
+
+
 class SequenceIO:
     """ Wrapper that allows for incrementally received audio to be decoded. """
 
@@ -0,0 +1,103 @@
+"""
+This module contains helpers for preparing text for synthesis, such as
+splitting text that arrives in fragments into sentences.
+
+Example:
+    This example collects the sentences of a response as they are completed,
+    while the response is still being generated. ::
+
+        from spokestack.tts.text import split_sentences
+
+        fragments = ["Dr. Smith", " is in. How", " can I help?"]
+        sentences = list(split_sentences(fragments))
+
+"""
+import re
+from typing import Iterable, Iterator, Optional
+
+# terminal punctuation, along with any closing quotes or brackets, followed
+# by whitespace or the end of the text received so far, or a line break
+_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*(?:\s+|\Z)|\n+")
+_OPENING = "\"'([“‘"
+
+# words that are followed by a period without ending a sentence
+_ABBREVIATIONS = {
+    "a.m",
+    "approx",
+    "dept",
+    "dr",
+    "e.g",
+    "etc",
+    "fig",
+    "i.e",
+    "inc",
+    "jr",
+    "ltd",
+    "mr",
+    "mrs",
+    "ms",
+    "mt",
+    "no",
+    "p.m",
+    "prof",
+    "sr",
+    "st",
+    "vol",
+    "vs",
+}
+
+
+def split_sentences(fragments: Iterable[str]) -> Iterator[str]:
+    """Splits a stream of text fragments into sentences
+
+    Fragments are buffered until they contain a sentence boundary, and each
+    complete sentence is returned as soon as its terminal punctuation is
+    followed by whitespace or ends a fragment, without waiting for the next
+    sentence to start. Periods after common abbreviations, such as "Dr.",
+    and after initials never end a sentence. A period after a digit at the
+    end of a fragment is held until the next fragment arrives, which keeps a
+    number such as "3.5" that arrives as "3." and "5" together. Line breaks
+    always end a sentence. Any text remaining at the end of the stream is
+    returned as the last sentence.
+
+    Args:
+        fragments (Iterable[str]): text fragments, in order
+
+    Returns: iterator of sentences, including their trailing whitespace
+
+    """
+    buffer = ""
+    start = 0
+    for fragment in fragments:
+        buffer += fragment
+        match = _BOUNDARY.search(buffer, start)
+        while match:
+            is_boundary = _is_boundary(buffer, match)
+            if is_boundary is None:
+                # wait for the next fragment
+                break
+            if not is_boundary:
+                start = match.end()
+            else:
+                sentence, buffer = buffer[: match.end()], buffer[match.end() :]
+                start = 0
+                if sentence.strip():
+                    yield sentence
+            match = _BOUNDARY.search(buffer, start)
+
+    if buffer.strip():
+        yield buffer
+
+
+def _is_boundary(buffer: str, match: "re.Match[str]") -> Optional[bool]:
+    # returns None when the text received so far cannot decide the boundary
+    if "\n" in match.group() or not match.group().startswith("."):
+        return True
+
+    words = buffer[: match.start()].split()
+    word = words[-1].lstrip(_OPENING).lower() if words else ""
+    if word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+        return False
+    if match.end() == len(buffer) and word[-1:].isdigit():
+        return None
+    return True
@@ -8,6 +8,7 @@ import numpy as np
 
 from spokestack.context import SpeechContext
 from spokestack.extensions.webrtc.vad import WebRtcVad
+from spokestack.schedule import RUN_SPEECH_EDGE
 
 QUALITY = 0
 LOW_BITRATE = 1
@@ -99,6 +100,9 @@ class VoiceActivityDetector:
 class VoiceActivityTrigger:
     """ Voice Activity Detector trigger pipeline component """
 
+    # activates the pipeline when speech starts
+    schedule = RUN_SPEECH_EDGE
+
     def __init__(self) -> None:
         self._is_speech = False
 
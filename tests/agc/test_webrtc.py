@@ -71,6 +71,27 @@ def test_processing():
     agc.close()
 
 
+def test_process_block():
+    context = SpeechContext()
+    frame = sin_frame(8000, 2000, amplitude=0.08)
+
+    # the block path matches per-frame processing
+    expect = np.stack([frame, frame, frame])
+    agc = AutomaticGainControl(sample_rate=8000, frame_width=10)
+    for row in expect:
+        agc(context, row)
+
+    actual = np.stack([frame, frame, frame])
+    agc = AutomaticGainControl(sample_rate=8000, frame_width=10)
+    agc.process_block(context, actual)
+    np.testing.assert_array_equal(actual, expect)
+
+    with pytest.raises(ValueError):
+        agc.process_block(context, np.zeros((3, 100), np.int16))
+    with pytest.raises(TypeError):
+        agc.process_block(context, np.zeros((3, 80)))
+
+
 def sin_frame(sample_rate=16000, frequency=2000, amplitude=1.0):
     frame_width = sample_rate * 10 // 1000
     x = 2 * np.pi * np.arange(sample_rate) / sample_rate
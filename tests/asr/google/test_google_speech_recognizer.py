@@ -1,12 +1,16 @@
 """
 This module contains the tests for the GoogleSpeechRecognizer class
 """
+import asyncio
 from unittest import mock
 
 import numpy as np
 import pytest
 
-from spokestack.asr.google.speech_recognizer import GoogleSpeechRecognizer
+from spokestack.asr.google.speech_recognizer import (
+    AsyncGoogleSpeechRecognizer,
+    GoogleSpeechRecognizer,
+)
 from spokestack.context import SpeechContext
 
 
@@ -69,3 +73,73 @@ def test_drain(*args):
 def test_invalid_creds(*args):
     with pytest.raises(ValueError):
         _ = GoogleSpeechRecognizer(language="en-US", credentials=1234)
+
+
+@mock.patch("spokestack.asr.google.speech_recognizer.speech")
+@mock.patch("spokestack.asr.google.speech_recognizer.service_account")
+def test_async_recognize(*args):
+    async def recognize():
+        context = SpeechContext()
+        audio = np.zeros(160).astype(np.int16)
+        recognizer = AsyncGoogleSpeechRecognizer(language="en-US", credentials="")
+        requests = []
+
+        async def responses(stream):
+            async for request in stream:
+                requests.append(request)
+            yield mock.Mock(
+                results=[
+                    mock.Mock(
+                        alternatives=[mock.Mock(transcript="test", confidence=0.99)],
+                        is_final=True,
+                    )
+                ]
+            )
+
+        async def streaming_recognize(requests):
+            return responses(requests)
+
+        client = mock.MagicMock()
+        client.streaming_recognize = streaming_recognize
+        recognizer._client = client
+
+        context.is_active = True
+        for i in range(10):
+            if i > 3:
+                context.is_active = False
+            await recognizer(context, audio)
+
+        # the configuration followed by one request per active frame
+        assert len(requests) == 5
+        assert context.transcript == "test"
+        assert recognizer._task is None
+
+        recognizer.reset()
+        recognizer.close()
+        assert recognizer._client is None
+
+    asyncio.run(recognize())
+
+
+@mock.patch("spokestack.asr.google.speech_recognizer.speech")
+@mock.patch("spokestack.asr.google.speech_recognizer.service_account")
+def test_async_reset(*args):
+    async def reset():
+        context = SpeechContext()
+        audio = np.zeros(160).astype(np.int16)
+        recognizer = AsyncGoogleSpeechRecognizer(language="en-US")
+
+        context.is_active = True
+        await recognizer(context, audio)
+        assert recognizer._task is not None
+
+        recognizer.reset()
+        assert recognizer._task is None
+        assert recognizer._queue is None
+
+    asyncio.run(reset())
+
+
+def test_async_invalid_creds(*args):
+    with pytest.raises(ValueError):
+        _ = AsyncGoogleSpeechRecognizer(language="en-US", credentials=1234)
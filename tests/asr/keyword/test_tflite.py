@@ -8,15 +8,18 @@ import pytest
 
 from spokestack.asr.keyword.tflite import KeywordRecognizer
 from spokestack.context import SpeechContext
+from spokestack.models.filterbank import MelFilterbank
+from spokestack.pipeline import SpeechPipeline
 
 
 class ModelFactory(mock.MagicMock):
-    def __call__(self, model_path):
+    def __call__(self, model_path, **kwargs):
         model = mock.MagicMock()
         if model_path.endswith("filter.tflite"):
             model.input_details = [{"shape": [1, 257]}]
             model.output_details = [{"shape": [1, 40]}]
             model.return_value = [np.zeros((1, 40))]
+            model.batch.side_effect = lambda inputs: np.zeros((len(inputs), 40))
         elif model_path.endswith("encode.tflite"):
             model.input_details = [{"shape": [1, 1, 40]}, {"shape": [1, 128]}]
             model.output_details = [{"shape": [1, 128]}, {"shape": [1, 128]}]
@@ -28,6 +31,18 @@ class ModelFactory(mock.MagicMock):
         return model
 
 
+class TensorModel:
+    # model exposing the tensor buffer interface, which records its inputs
+    def __init__(self, model):
+        self.model = model
+        self.input_details = model.input_details
+        self.inputs = []
+
+    def run(self, *args):
+        self.inputs.append([np.array(arg) for arg in args])
+        return self.model(np.expand_dims(args[0], 0), *args[1:])
+
+
 @mock.patch("spokestack.asr.keyword.tflite.TFLiteModel", new_callable=ModelFactory)
 def test_invalid_args(*args):
     with pytest.raises(ValueError):
@@ -86,3 +101,82 @@ def test_timeout(*args):
     assert not context.transcript
 
     recognizer.close()
+
+
+@mock.patch("spokestack.asr.keyword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_inactive_history(*args):
+    recognizer = KeywordRecognizer(classes=["one", "two", "three"])
+    source = mock.MagicMock()
+    source.read.return_value = np.random.rand(160).astype(np.float32)
+    pipeline = SpeechPipeline(source, stages=[recognizer])
+
+    # the history advances while inactive, so the first active frame
+    # completes a window instead of starting to fill an empty one
+    for _ in range(5):
+        pipeline.step()
+    pipeline.activate()
+    pipeline.step()
+    assert len(recognizer.filter_model.batch.call_args[0][0]) == 1
+
+    pipeline.close()
+
+
+@mock.patch("spokestack.asr.keyword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_clone(*args):
+    recognizer = KeywordRecognizer(classes=["one", "two", "three"])
+    clone = recognizer.clone()
+
+    # models are shared, per-stream state is not
+    assert clone.filter_model is recognizer.filter_model
+    assert clone.encode_model is recognizer.encode_model
+    assert clone.detect_model is recognizer.detect_model
+    assert clone.state is not recognizer.state
+    assert clone.stft is not recognizer.stft
+    assert clone.frame_window is not recognizer.frame_window
+    assert clone.encode_window is not recognizer.encode_window
+    assert clone.classes == recognizer.classes
+
+
+@mock.patch("spokestack.asr.keyword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_filter_type(_mock, tmp_path):
+    with pytest.raises(ValueError):
+        _ = KeywordRecognizer(classes=["one", "two", "three"], filter_type="invalid")
+
+    # the numpy filterbank is loaded from its sidecar file
+    np.save(str(tmp_path / "filter.npy"), np.ones((257, 40), np.float32))
+    detector = KeywordRecognizer(
+        classes=["one", "two", "three"], model_dir=str(tmp_path), filter_type="numpy"
+    )
+    assert isinstance(detector.filter_model, MelFilterbank)
+    assert detector.filter_model.batch(np.ones((2, 257))).shape == (2, 40)
+
+
+@mock.patch("spokestack.asr.keyword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_tensor_models(_mock):
+    context = SpeechContext()
+    recognizer = KeywordRecognizer(classes=["one", "two", "three"])
+    recognizer.detect_model.return_value = [np.array([[0.1, 0.8, 0.1]])]
+    recognizer.encode_model = TensorModel(recognizer.encode_model)
+    recognizer.detect_model = TensorModel(recognizer.detect_model)
+
+    context.is_active = True
+    recognizer(context, np.random.rand(512).astype(np.float32))
+    context.is_active = False
+    recognizer(context, np.random.rand(160).astype(np.float32))
+    assert recognizer.detect_model.inputs[0][0].shape == (92, 128)
+    assert context.transcript == "two"
+
+
+def test_registry():
+    registry = mock.MagicMock()
+    registry.acquire.side_effect = ModelFactory()
+    recognizer = KeywordRecognizer(
+        classes=["one", "two", "three"], model_dir="keyword_model", registry=registry
+    )
+    assert registry.acquire.call_count == 3
+
+    # clones borrow the models, and the original releases them
+    recognizer.clone().close()
+    registry.release.assert_not_called()
+    recognizer.close()
+    assert registry.release.call_count == 3
@@ -1,13 +1,19 @@
 """
 This module contains the tests for the cloud-based asr client
 """
+import asyncio
 import json
 from unittest import mock
 
 import numpy as np
 import pytest
+import websockets
 
-from spokestack.asr.spokestack.cloud_client import APIError, CloudClient
+from spokestack.asr.spokestack.cloud_client import (
+    APIError,
+    AsyncCloudClient,
+    CloudClient,
+)
 
 
 @mock.patch("spokestack.asr.spokestack.cloud_client.WebSocket")
@@ -368,3 +374,64 @@ def test_idle_count(_mock):
         client.idle_count += 1
 
     assert client.idle_count == 5
+
+
+def _message(final, status="ok"):
+    return json.dumps(
+        {
+            "error": None if status == "ok" else "invalid_language",
+            "final": final,
+            "hypotheses": [{"confidence": 0.5, "transcript": "this is a test"}],
+            "status": status,
+        }
+    )
+
+
+async def _serve(socket, *args):
+    # stand-in for the api, which answers each frame of audio, and sends the
+    # final response once the empty frame that ends the audio arrives
+    handshake = json.loads(await socket.recv())
+    if handshake["keyId"] != "id":
+        await socket.send(_message(final=False, status="error"))
+        return
+    await socket.send(_message(final=False))
+    async for frame in socket:
+        await socket.send(_message(final=not frame))
+
+
+def test_async_client():
+    async def recognize():
+        async with websockets.serve(_serve, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            url = f"ws://127.0.0.1:{port}"
+            client = AsyncCloudClient(socket_url=url, key_id="id", key_secret="")
+
+            with pytest.raises(ConnectionError):
+                await client.send(np.zeros(160, np.int16))
+
+            audio = np.random.rand(16000 * 3).astype(np.int16)
+            hypotheses = await client(audio)
+            assert hypotheses == [{"confidence": 0.5, "transcript": "this is a test"}]
+            assert not client.is_connected
+
+            # responses are awaited as they arrive
+            await client.connect()
+            await client.initialize()
+            await client.send(np.zeros(160, np.int16))
+            assert await client.receive()
+            assert not client.is_final
+            await client.end()
+            assert await client.receive()
+            assert client.is_final
+            await client.disconnect()
+            assert not client.is_connected
+
+            # the connection closed by the server ends receiving
+            client = AsyncCloudClient(socket_url=url, key_id="bad", key_secret="")
+            await client.connect()
+            with pytest.raises(APIError):
+                await client.initialize()
+            assert not await client.receive()
+            assert not client.is_connected
+
+    asyncio.run(recognize())
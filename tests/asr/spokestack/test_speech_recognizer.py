@@ -1,12 +1,16 @@
 """
 This module tests the cloud speech recognizer
 """
+import asyncio
 import json
 from unittest import mock
 
 import numpy as np
 
-from spokestack.asr.spokestack.speech_recognizer import CloudSpeechRecognizer
+from spokestack.asr.spokestack.speech_recognizer import (
+    AsyncCloudSpeechRecognizer,
+    CloudSpeechRecognizer,
+)
 from spokestack.context import SpeechContext
 
 
@@ -166,3 +170,141 @@ def test_empty_transcript():
     assert context.confidence == 0.5
 
     recognizer.close()
+
+
+def _response(final, transcript="this is a test"):
+    return json.dumps(
+        {
+            "error": None,
+            "final": final,
+            "hypotheses": [{"confidence": 0.5, "transcript": transcript}],
+            "status": "ok",
+        }
+    )
+
+
+class _Socket:
+    # asyncio socket whose responses are awaited from a queue
+    def __init__(self):
+        self.responses = asyncio.Queue()
+        self.send = mock.AsyncMock()
+        self.close = mock.AsyncMock()
+
+    async def recv(self):
+        return await self.responses.get()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_async_recognize():
+    async def recognize():
+        context = SpeechContext()
+        events = []
+        context.add_handler("partial_recognize", lambda c: events.append("partial"))
+        context.add_handler("recognize", lambda c: events.append("recognize"))
+
+        recognizer = AsyncCloudSpeechRecognizer(idle_timeout=40)
+        socket = _Socket()
+        recognizer._client._socket = socket
+        socket.responses.put_nowait(_response(final=False, transcript=""))
+
+        frame = np.random.rand(160).astype(np.int16)
+        context.is_active = True
+        await recognizer(context, frame)
+        await recognizer(context, frame)
+        assert socket.send.await_count == 3
+
+        # responses are handled as they arrive, between frames
+        socket.responses.put_nowait(_response(final=False))
+        socket.responses.put_nowait(_response(final=False))
+        await _settle()
+        assert events == ["partial", "partial"]
+
+        context.is_active = False
+        await recognizer(context, frame)
+        assert not recognizer._is_active
+        socket.send.assert_awaited_with(b"")
+
+        socket.responses.put_nowait(_response(final=True))
+        await _settle()
+        assert events == ["partial", "partial", "partial", "recognize"]
+        assert context.transcript == "this is a test"
+
+        # idle frames until the connection times out
+        for _ in range(3):
+            await recognizer(context, frame)
+        assert not recognizer._client.is_connected
+        assert recognizer._receiver is None
+        socket.close.assert_awaited_once()
+
+        recognizer.close()
+
+    asyncio.run(recognize())
+
+
+def test_async_hung_connection():
+    async def recognize():
+        context = SpeechContext()
+        recognizer = AsyncCloudSpeechRecognizer(idle_timeout=40)
+        socket = _Socket()
+        recognizer._client._socket = socket
+        socket.responses.put_nowait(_response(final=False, transcript=""))
+
+        frame = np.random.rand(160).astype(np.int16)
+        context.is_active = True
+        await recognizer(context, frame)
+        context.is_active = False
+        await recognizer(context, frame)
+
+        # no final response arrives, so the connection times out
+        for _ in range(3):
+            await recognizer(context, frame)
+        assert not recognizer._client.is_connected
+        assert not context.transcript
+
+    asyncio.run(recognize())
+
+
+def test_async_slow_socket():
+    async def recognize():
+        frame = np.random.rand(160).astype(np.int16)
+        sent = asyncio.Event()
+
+        async def send(data):
+            await sent.wait()
+
+        # a recognizer waiting on a slow send does not hold up another
+        slow = AsyncCloudSpeechRecognizer()
+        slow._client._socket = _Socket()
+        slow._client._socket.responses.put_nowait(_response(final=False))
+        slow._client._socket.send.side_effect = send
+        slow_context = SpeechContext()
+        slow_context.is_active = True
+        pending = asyncio.ensure_future(slow(slow_context, frame))
+        await _settle()
+        assert not pending.done()
+
+        fast = AsyncCloudSpeechRecognizer()
+        fast._client._socket = _Socket()
+        fast._client._socket.responses.put_nowait(_response(final=False))
+        fast_context = SpeechContext()
+        fast_context.is_active = True
+        await fast(fast_context, frame)
+        assert fast._client._socket.send.await_count == 2
+        assert not pending.done()
+
+        sent.set()
+        await pending
+
+        # closing the recognizer closes the socket on the running loop
+        socket = fast._client._socket
+        fast.close()
+        await _settle()
+        assert not fast._client.is_connected
+        socket.close.assert_awaited_once()
+        slow.close()
+
+    asyncio.run(recognize())
@@ -0,0 +1,191 @@
+"""
+This module contains the tests for the capture thread input wrapper
+"""
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from spokestack.io.capture import (
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP_NEWEST,
+    OVERFLOW_DROP_OLDEST,
+    CaptureThread,
+)
+from spokestack.pipeline import SpeechPipeline
+
+
+class CountingInput:
+    def __init__(self):
+        self.count = 0
+
+    def read(self):
+        time.sleep(0.0001)
+        self.count += 1
+        return np.full(160, self.count, np.int16)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert condition()
+
+
+def test_invalid_args():
+    with pytest.raises(ValueError):
+        CaptureThread(mock.MagicMock(), max_frames=0)
+
+    with pytest.raises(ValueError):
+        CaptureThread(mock.MagicMock(), overflow_policy="invalid")
+
+
+def test_read():
+    source = CountingInput()
+    capture = CaptureThread(source, max_frames=1000)
+    capture.start()
+    assert capture.is_active
+
+    frames = [capture.read()[0] for _ in range(10)]
+    assert frames == list(range(1, 11))
+    assert capture.lag >= 0.0
+
+    capture.close()
+    assert not capture.is_active
+    assert capture.stats["captured"] >= 10
+
+
+def test_drop_oldest():
+    source = CountingInput()
+    capture = CaptureThread(source, max_frames=5, overflow_policy=OVERFLOW_DROP_OLDEST)
+    capture.start()
+    wait_for(lambda: capture.dropped > 0)
+    capture.stop()
+
+    # the queue holds the most recent frames
+    assert capture.depth == 5
+    assert capture.stats["captured"] == capture.depth + capture.dropped
+    assert capture.read()[0] == source.count - 4
+    assert capture.stats["max_depth"] == 5
+
+
+def test_drop_accounting():
+    class FastInput(CountingInput):
+        def read(self):
+            self.count += 1
+            return np.zeros(1, np.int16)
+
+    # every captured frame is either read, dropped or still queued, while
+    # the pipeline reads concurrently with the capture thread
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(5):
+            source = FastInput()
+            capture = CaptureThread(
+                source, max_frames=1, overflow_policy=OVERFLOW_DROP_OLDEST
+            )
+            capture.start()
+            read = 0
+            while source.count < 20000:
+                capture.read()
+                read += 1
+            capture.stop()
+            stats = capture.stats
+            assert stats["captured"] == read + stats["dropped"] + stats["depth"]
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def test_drop_newest():
+    source = CountingInput()
+    capture = CaptureThread(source, max_frames=5, overflow_policy=OVERFLOW_DROP_NEWEST)
+    capture.start()
+    wait_for(lambda: capture.dropped > 0)
+    capture.stop()
+
+    # the queue holds the first frames captured
+    assert capture.depth == 5
+    assert [capture.read()[0] for _ in range(5)] == [1, 2, 3, 4, 5]
+
+
+def test_block():
+    source = CountingInput()
+    capture = CaptureThread(source, max_frames=5, overflow_policy=OVERFLOW_BLOCK)
+    capture.start()
+    wait_for(lambda: source.count == 6)
+
+    # the capture thread waits for space rather than dropping frames
+    assert capture.read()[0] == 1
+    wait_for(lambda: source.count == 7)
+    capture.stop()
+
+    assert not capture.dropped
+    assert [capture.read()[0] for _ in range(5)] == [2, 3, 4, 5, 6]
+
+
+def test_read_stopped():
+    # reads before any frame is captured return a full frame of silence
+    capture = CaptureThread(CountingInput(), sample_rate=16000, frame_width=20)
+    silence = capture.read()
+    assert silence.shape == (320,)
+    assert not silence.any()
+
+    capture = CaptureThread(CountingInput(), frame_width=10)
+    capture.start()
+    frame = capture.read()
+    capture.stop()
+    while capture.depth:
+        capture.read()
+
+    # reads after a stop return silence instead of blocking
+    silence = capture.read()
+    assert silence.shape == frame.shape
+    assert not silence.any()
+
+
+def test_read_error():
+    class FailingInput(CountingInput):
+        def read(self):
+            if self.count == 3:
+                raise OSError("device_unavailable")
+            return super().read()
+
+    capture = CaptureThread(FailingInput())
+    capture.start()
+
+    # frames captured before the error are read first, then the error
+    assert [capture.read()[0] for _ in range(3)] == [1, 2, 3]
+    with pytest.raises(OSError):
+        capture.read()
+    assert not capture.is_active
+    capture.close()
+
+
+def test_pipeline():
+    stages = [mock.MagicMock()]
+    pipeline = SpeechPipeline(CountingInput(), stages=stages, capture_frames=10)
+    assert isinstance(pipeline.capture, CaptureThread)
+
+    @pipeline.event
+    def on_step(context):
+        if stages[0].call_count == 3:
+            pipeline.stop()
+
+    pipeline.run()
+    assert stages[0].call_count == 4
+    assert pipeline.capture.stats["lag"] >= 0.0
+    pipeline.close()
+
+    assert SpeechPipeline(mock.MagicMock(), stages=[]).capture is None
@@ -0,0 +1,88 @@
+"""
+This module contains the tests for the file input source
+"""
+import wave
+
+import numpy as np
+import pytest
+
+from spokestack.io.file import FileInput
+
+
+def write_wav(path, samples, sample_rate=16000, channels=1, width=2):
+    with wave.open(str(path), "wb") as file:
+        file.setnchannels(channels)
+        file.setsampwidth(width)
+        file.setframerate(sample_rate)
+        file.writeframes(samples.tobytes())
+
+
+def test_read_wav(tmp_path):
+    samples = np.arange(800, dtype=np.int16)
+    path = tmp_path / "audio.wav"
+    write_wav(path, samples)
+
+    input_source = FileInput(str(path), sample_rate=16000, frame_width=20)
+    input_source.start()
+    assert input_source.duration == 0.05
+
+    np.testing.assert_array_equal(input_source.read(), samples[:320])
+    np.testing.assert_array_equal(input_source.read(), samples[320:640])
+    assert not input_source.is_exhausted
+
+    # the final frame is padded with silence
+    frame = input_source.read()
+    np.testing.assert_array_equal(frame[:160], samples[640:])
+    assert not frame[160:].any()
+    assert input_source.is_exhausted
+    assert input_source.position == 0.05
+    assert not input_source.read().any()
+
+    input_source.stop()
+    input_source.close()
+
+
+def test_read_block(tmp_path):
+    samples = np.arange(1000, dtype=np.int16)
+    path = tmp_path / "audio.pcm"
+    samples.tofile(path)
+
+    input_source = FileInput(str(path), sample_rate=8000, frame_width=20)
+    block = input_source.read_block(4)
+    assert block.shape == (4, 160)
+    np.testing.assert_array_equal(block.ravel(), samples[:640])
+
+    # frames can be modified without changing the file
+    block[:] = 0
+    block = input_source.read_block(4)
+    np.testing.assert_array_equal(block.ravel()[:360], samples[640:])
+    assert input_source.is_exhausted
+    np.testing.assert_array_equal(np.fromfile(path, np.int16), samples)
+
+
+def test_empty(tmp_path):
+    path = tmp_path / "empty.wav"
+    write_wav(path, np.zeros(0, np.int16))
+
+    input_source = FileInput(str(path))
+    assert input_source.is_exhausted
+    assert input_source.read().shape == (320,)
+
+
+def test_invalid_wav(tmp_path):
+    path = tmp_path / "invalid.wav"
+    path.write_bytes(b"RIFF")
+    with pytest.raises(ValueError):
+        FileInput(str(path))
+
+    write_wav(path, np.zeros(10, np.int16), sample_rate=8000)
+    with pytest.raises(ValueError):
+        FileInput(str(path), sample_rate=16000)
+
+    write_wav(path, np.zeros(10, np.int16), channels=2)
+    with pytest.raises(ValueError):
+        FileInput(str(path))
+
+    write_wav(path, np.zeros(10, np.int16), width=1)
+    with pytest.raises(ValueError):
+        FileInput(str(path))
@@ -19,6 +19,9 @@ def test_input(*args):
     # read a single frame
     _ = mic.read()
     mic._stream.read.assert_called()
+    # read a block of frames
+    mic._stream.read.return_value = np.zeros(480, np.int16).tobytes()
+    assert mic.read_block(3).shape == (3, 160)
     # stop audio stream
     mic.stop()
     assert mic.is_stopped
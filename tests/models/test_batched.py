@@ -0,0 +1,174 @@
+"""
+Tests for the cross-stream batched model
+"""
+import threading
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from spokestack.models.batched import BatchedModel
+from spokestack.models.filterbank import MelFilterbank
+
+
+class EncodeModel:
+    # recurrent model with independent rows, shaped like the encoder
+    def __init__(self, is_resizable=True):
+        self.is_resizable = is_resizable
+        self.input_details = [
+            {"index": 0, "shape": np.array([1, 1, 40])},
+            {"index": 1, "shape": np.array([1, 128])},
+        ]
+        self.output_details = [
+            {"index": 2, "shape": np.array([1, 1, 128])},
+            {"index": 3, "shape": np.array([1, 128])},
+        ]
+        self.batch_sizes = []
+
+    def resize(self, index, shape, strict=True):
+        if not self.is_resizable:
+            raise ValueError("fixed")
+        self.input_details[index]["shape"] = np.array(shape)
+
+    def __call__(self, frame, state):
+        for detail, arg in zip(self.input_details, [frame, state]):
+            assert list(detail["shape"]) == list(arg.shape)
+        self.batch_sizes.append(len(frame))
+        state = np.tanh(state + frame.sum(axis=-1))
+        return [np.expand_dims(state * 2, 1), state]
+
+
+def run_streams(model, streams, steps, barrier=None):
+    results = [[] for _ in range(streams)]
+
+    def run(i):
+        state = np.zeros((1, 128), np.float32)
+        for step in range(steps):
+            frame = np.full((1, 1, 40), (i + 1) * (step + 1) / 1000, np.float32)
+            if barrier is not None:
+                barrier.wait()
+            output, state = model(frame, state)
+            results[i].append(output)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(streams)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_batch():
+    model = EncodeModel()
+    batched = BatchedModel(model, max_batch_size=4, deadline=0.5)
+    assert list(batched.input_details[0]["shape"]) == [1, 1, 40]
+
+    # concurrent requests give the same outputs as the direct path
+    results = run_streams(batched, streams=4, steps=5, barrier=threading.Barrier(4))
+    expected = run_streams(EncodeModel(), streams=4, steps=5)
+    for actual, direct in zip(results, expected):
+        for a, d in zip(actual, direct):
+            assert a.shape == (1, 1, 128)
+            assert np.allclose(a, d)
+
+    # a full batch does not wait for the deadline
+    assert model.batch_sizes == [4] * 5
+    assert batched.stats == {"requests": 20, "batches": 5, "mean_batch_size": 4.0}
+
+    # callers see the shape of a single request
+    assert list(batched.input_details[0]["shape"]) == [1, 1, 40]
+    batched.close()
+
+
+def test_max_batch_size():
+    model = EncodeModel()
+    batched = BatchedModel(model, max_batch_size=3, deadline=0.05)
+    barrier = threading.Barrier(5)
+    run_streams(batched, streams=5, steps=4, barrier=barrier)
+    assert max(model.batch_sizes) <= 3
+    assert sum(model.batch_sizes) == 20
+    batched.close()
+
+    with pytest.raises(ValueError):
+        _ = BatchedModel(EncodeModel(), max_batch_size=0)
+
+
+def test_fixed_shape():
+    # models that cannot be resized run each request separately
+    model = EncodeModel(is_resizable=False)
+    batched = BatchedModel(model, max_batch_size=4, deadline=0.5)
+    results = run_streams(batched, streams=4, steps=2, barrier=threading.Barrier(4))
+    expected = run_streams(EncodeModel(), streams=4, steps=2)
+    for actual, direct in zip(results, expected):
+        assert np.allclose(actual, direct)
+    assert model.batch_sizes == [1] * 8
+    assert batched.stats["batches"] == 8
+    batched.close()
+
+
+def test_batch_rows():
+    # requests may contain several rows, such as the hops of a frame
+    class FilterModel:
+        input_details = [{"index": 0, "shape": np.array([1, 257])}]
+        output_details = [{"index": 1, "shape": np.array([1, 40])}]
+
+        def resize(self, index, shape, strict=True):
+            self.input_details[index]["shape"] = np.array(shape)
+
+        def __call__(self, inputs):
+            return [inputs[:, :40] * 2]
+
+    batched = BatchedModel(FilterModel(), deadline=0.0)
+    inputs = np.random.rand(2, 257).astype(np.float32)
+    assert np.allclose(batched.batch(inputs), inputs[:, :40] * 2)
+    batched.close()
+
+
+def test_filterbank():
+    # models without a resize method are called with the whole batch
+    weights = np.random.rand(257, 40).astype(np.float32)
+    batched = BatchedModel(MelFilterbank(weights), deadline=0.5)
+    inputs = np.random.rand(3, 257).astype(np.float32)
+    assert np.allclose(batched.batch(inputs), inputs @ weights)
+    assert batched.stats["batches"] == 1
+    batched.close()
+
+
+def test_flush():
+    # without a deadline, requests are queued until they are flushed
+    model = EncodeModel()
+    batched = BatchedModel(model, max_batch_size=2, deadline=None)
+    listener = mock.MagicMock()
+    batched.add_listener(listener)
+
+    frame = np.zeros((1, 1, 40), np.float32)
+    state = np.zeros((1, 128), np.float32)
+    futures = [batched.submit(frame, state) for _ in range(3)]
+    assert listener.call_count == 3
+    assert batched.pending == 3
+    assert not any(future.done() for future in futures)
+
+    assert batched.flush() == 3
+    assert model.batch_sizes == [2, 1]
+    assert batched.pending == 0
+    for future in futures:
+        assert future.result()[0].shape == (1, 1, 128)
+
+    # requests queued before a close are still run
+    future = batched.submit(frame, state)
+    batched.close()
+    assert future.done()
+    with pytest.raises(RuntimeError):
+        batched.submit(frame, state)
+
+
+def test_errors():
+    batched = BatchedModel(EncodeModel(), deadline=0.0)
+
+    # model errors, such as a missing input, are raised to the caller
+    with pytest.raises(TypeError):
+        batched(np.zeros((1, 1, 40)))
+
+    batched.close()
+    with pytest.raises(RuntimeError):
+        batched(np.zeros((1, 1, 40)), np.zeros((1, 128)))
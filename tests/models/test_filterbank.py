@@ -0,0 +1,115 @@
+"""
+Tests for the NumPy mel filterbank
+"""
+import threading
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from spokestack.models.filterbank import MelFilterbank
+
+
+def filter_model(weights, bias=None, transpose=False, quantization=None):
+    model = mock.MagicMock()
+    bins, mels = weights.shape
+    model.input_details = [{"shape": np.array([1, bins])}]
+    model.output_details = [{"shape": np.array([1, mels])}]
+
+    tensors = [np.zeros((1, bins), np.float32), weights.T if transpose else weights]
+    if bias is not None:
+        tensors.append(bias)
+    if quantization is not None:
+        tensors[1] = np.round(tensors[1] / quantization).astype(np.int8)
+    model.tensor_details = [
+        {"index": i, "shape": np.array(t.shape), "quantization": (quantization, 0)}
+        for i, t in enumerate(tensors)
+    ]
+    model.tensor.side_effect = lambda index: tensors[index]
+
+    def invoke(inputs):
+        outputs = np.dot(inputs, weights)
+        return [outputs if bias is None else outputs + bias]
+
+    model.side_effect = invoke
+    return model
+
+
+def test_batch():
+    weights = np.random.rand(257, 40).astype(np.float32)
+    filterbank = MelFilterbank(weights)
+    assert filterbank.input_details[0]["shape"][-1] == 257
+    assert filterbank.output_details[0]["shape"][-1] == 40
+
+    spectra = np.random.rand(3, 257).astype(np.float32)
+    outputs = filterbank.batch(spectra)
+    assert outputs.shape == (3, 40)
+    assert np.allclose(outputs, spectra @ weights)
+
+    # the output buffer is reused for smaller batches
+    outputs = filterbank(spectra[:1])[0]
+    assert outputs.shape == (1, 40)
+    assert np.allclose(outputs, spectra[:1] @ weights)
+
+    # each thread writes to its own output buffer
+    other = []
+    thread = threading.Thread(target=lambda: other.append(filterbank.batch(spectra)))
+    thread.start()
+    thread.join()
+    assert not np.shares_memory(other[0], outputs)
+    assert np.allclose(outputs, spectra[:1] @ weights)
+
+    bias = np.random.rand(40).astype(np.float32)
+    filterbank = MelFilterbank(weights, bias)
+    assert np.allclose(filterbank.batch(spectra), spectra @ weights + bias)
+
+
+def test_invalid_args():
+    with pytest.raises(ValueError):
+        _ = MelFilterbank(np.zeros(40))
+
+    with pytest.raises(ValueError):
+        _ = MelFilterbank(np.zeros((257, 40)), np.zeros(257))
+
+
+def test_from_model():
+    weights = np.random.rand(257, 40).astype(np.float32)
+    spectra = np.random.rand(2, 257).astype(np.float32)
+
+    filterbank = MelFilterbank.from_model(filter_model(weights))
+    assert np.allclose(filterbank.batch(spectra), spectra @ weights)
+
+    # fully connected layers store their weights transposed, with a bias
+    bias = np.random.rand(40).astype(np.float32)
+    model = filter_model(weights, bias, transpose=True)
+    filterbank = MelFilterbank.from_model(model)
+    assert np.allclose(filterbank.batch(spectra), spectra @ weights + bias)
+
+    # quantized weights are dequantized
+    weights = np.round(weights / 0.01) * 0.01
+    filterbank = MelFilterbank.from_model(filter_model(weights, quantization=0.01))
+    assert np.allclose(filterbank.batch(spectra), spectra @ weights, atol=1e-4)
+
+
+def test_from_model_invalid():
+    # no weights with the shape of the filter
+    model = filter_model(np.random.rand(257, 40).astype(np.float32))
+    model.tensor_details = model.tensor_details[:1]
+    with pytest.raises(ValueError):
+        _ = MelFilterbank.from_model(model)
+
+    # the model does more than a linear projection
+    model = filter_model(np.random.rand(257, 40).astype(np.float32))
+    model.side_effect = lambda inputs: [np.log(np.dot(inputs, model.tensor(1)))]
+    with pytest.raises(ValueError):
+        _ = MelFilterbank.from_model(model)
+
+
+def test_save_load(tmp_path):
+    weights = np.random.rand(257, 40).astype(np.float32)
+    path = str(tmp_path / "filter.npy")
+    MelFilterbank(weights).save(path)
+    assert np.array_equal(MelFilterbank.load(path).weights, weights)
+
+    with pytest.raises(ValueError):
+        MelFilterbank(weights, np.ones(40)).save(path)
@@ -0,0 +1,107 @@
+"""
+Tests for the TFLite interpreter pool
+"""
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from spokestack.models.pool import ModelPool
+
+
+class ModelFactory(mock.MagicMock):
+    def __call__(self, model_content, **kwargs):
+        model = mock.MagicMock()
+        model.input_details = [{"index": 0, "shape": np.array([1, 4])}]
+        model.output_details = [{"index": 1, "shape": np.array([1, 2])}]
+        model.side_effect = lambda inputs: [inputs[:, :2] * 2]
+        return model
+
+
+@mock.patch("spokestack.models.pool.TFLiteModel", new_callable=ModelFactory)
+def test_pool(_mock, tmp_path):
+    path = tmp_path / "model.tflite"
+    path.write_bytes(b"model")
+
+    with pytest.raises(ValueError):
+        _ = ModelPool(str(path), size=0)
+
+    pool = ModelPool(str(path), size=2)
+    assert list(pool.input_details[0]["shape"]) == [1, 4]
+    assert list(pool.output_details[0]["shape"]) == [1, 2]
+
+    outputs = pool(np.ones((1, 4)))
+    assert np.all(outputs[0] == 2)
+
+    # interpreters are lent out one request at a time
+    with pool.checkout() as first, pool.checkout() as second:
+        assert first is not second
+        assert pool.stats["in_use"] == 2
+
+    stats = pool.stats
+    assert stats["size"] == 2
+    assert stats["in_use"] == 0
+    assert stats["checkouts"] == 3
+    assert stats["timeouts"] == 0
+    assert 0.0 < stats["utilization"] <= 1.0
+    assert stats["wait"]["max"] >= 0.0
+
+    # warming up runs every interpreter once
+    pool.warm_up(np.ones((1, 4)))
+    with pool.checkout() as first, pool.checkout() as second:
+        assert sorted([first.call_count, second.call_count]) == [1, 2]
+
+
+@mock.patch("spokestack.models.pool.TFLiteModel", new_callable=ModelFactory)
+def test_timeout(_mock):
+    pool = ModelPool(model_content=b"model", size=1, timeout=0.01)
+
+    # requests wait for a returned interpreter, up to the timeout
+    with pool.checkout():
+        with pytest.raises(TimeoutError):
+            pool(np.ones((1, 4)))
+    assert pool.stats["timeouts"] == 1
+    assert pool.stats["checkouts"] == 1
+
+    # interpreters are returned when a request fails
+    with pytest.raises(RuntimeError):
+        with pool.checkout():
+            raise RuntimeError("failed")
+    assert pool.stats["in_use"] == 0
+
+
+@mock.patch("spokestack.models.pool.TFLiteModel", new_callable=ModelFactory)
+def test_concurrent(_mock):
+    pool = ModelPool(model_content=b"model", size=2)
+    active = []
+    peak = []
+
+    def request():
+        with pool.checkout() as model:
+            active.append(model)
+            peak.append(len(active))
+            time.sleep(0.01)
+            active.remove(model)
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 2
+    assert pool.stats["checkouts"] == 6
+    assert pool.stats["wait"]["max"] > 0.0
+
+
+def test_factory():
+    factory = ModelFactory()
+    pool = ModelPool(model_content=b"model", size=2, factory=factory, max_shapes=4)
+    assert pool.stats["size"] == 2
+
+    # pooled models are created by the factory
+    with pool.checkout() as model:
+        assert list(model.input_details[0]["shape"]) == [1, 4]
+        assert np.all(model(np.ones((1, 4)))[0] == 2)
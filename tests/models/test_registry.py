@@ -0,0 +1,174 @@
+"""
+Tests for the TFLite model registry
+"""
+import gc
+import mmap
+import threading
+from unittest import mock
+
+import numpy as np
+
+from spokestack.models.registry import ModelRegistry
+
+
+def model_file(tmp_path, name="model.tflite", content=b"model"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+@mock.patch("spokestack.models.registry.TFLiteModel")
+def test_acquire_release(mock_model, tmp_path):
+    mock_model.side_effect = lambda **kwargs: mock.MagicMock()
+    registry = ModelRegistry()
+    path = model_file(tmp_path)
+
+    # models are shared by path, and created from the mapped file
+    first = registry.acquire(path)
+    second = registry.acquire(str(tmp_path / "." / "model.tflite"))
+    assert first is second
+    assert len(registry) == 1
+    first.invoke()
+    mock_model.assert_called_once()
+    content = mock_model.call_args[1]["model_content"]
+    assert isinstance(content, mmap.mmap)
+    assert content[:] == b"model"
+
+    # unset options are left to the interpreter
+    assert registry.acquire(path, num_threads=None, delegates=None) is first
+    registry.release(first)
+
+    # different options load a separate model
+    other = registry.acquire(path, num_threads=2)
+    assert other is not first
+    assert len(registry) == 2
+    other.invoke()
+    assert mock_model.call_args[1]["num_threads"] == 2
+
+    # the model is dropped once every user has released it
+    registry.release(first)
+    assert len(registry) == 2
+    registry.release(second)
+    assert len(registry) == 1
+    registry.release(other)
+    assert len(registry) == 0
+
+    # unknown and released models are ignored
+    registry.release(first)
+    registry.release(mock.MagicMock())
+
+    # released models are loaded again
+    assert registry.acquire(path) is not first
+
+
+@mock.patch("spokestack.models.registry.TFLiteModel")
+def test_per_thread(mock_model, tmp_path):
+    mock_model.side_effect = lambda **kwargs: mock.MagicMock()
+    registry = ModelRegistry()
+    path = model_file(tmp_path)
+
+    models = {}
+
+    def acquire(name, per_thread):
+        models[name] = registry.acquire(path, per_thread=per_thread)
+
+    acquire("main", True)
+    acquire("main_shared", False)
+    thread = threading.Thread(target=acquire, args=("thread", True))
+    thread.start()
+    thread.join()
+    thread = threading.Thread(target=acquire, args=("thread_shared", False))
+    thread.start()
+    thread.join()
+    assert models["thread"] is models["main"]
+    assert models["thread_shared"] is models["main_shared"]
+    assert len(registry) == 2
+
+    # a model acquired on one thread runs on an interpreter of the thread
+    # that calls it, built from the same buffer
+    interpreters = {}
+
+    def run(name):
+        models["main"](np.zeros(1))
+        interpreters[name] = models["main"].input_details
+
+    run("main")
+    thread = threading.Thread(target=run, args=("thread",))
+    thread.start()
+    thread.join()
+    assert interpreters["main"] is not interpreters["thread"]
+    run("again")
+    assert interpreters["again"] is interpreters["main"]
+    assert mock_model.call_count == 3
+
+    # the interpreters are released together
+    for model in models.values():
+        registry.release(model)
+    assert len(registry) == 0
+
+
+@mock.patch("spokestack.models.registry.TFLiteModel")
+def test_exited_thread(mock_model, tmp_path):
+    mock_model.side_effect = lambda **kwargs: mock.MagicMock()
+    registry = ModelRegistry()
+    path = model_file(tmp_path)
+    model = registry.acquire(path)
+    model.invoke()
+
+    # the interpreter of an exited thread is dropped when the thread exits
+    thread = threading.Thread(target=lambda: model.invoke())
+    thread.start()
+    thread.join()
+    gc.collect()
+    assert mock_model.call_count == 2
+    assert registry.stats[0]["interpreters"] == 1
+
+    registry.acquire(path)
+    assert registry.stats[0]["users"] == 2
+
+    registry.release(model)
+    registry.release(model)
+    assert len(registry) == 0
+
+
+@mock.patch("spokestack.models.registry.TFLiteModel")
+def test_stats(mock_model, tmp_path):
+    model = mock.MagicMock()
+    model.tensor_details = [
+        {"shape": np.array([1, 40]), "dtype": np.float32},
+        {"shape": np.array([1, 128]), "dtype": np.int8},
+    ]
+    mock_model.return_value = model
+    registry = ModelRegistry()
+    path = model_file(tmp_path, content=b"x" * 1000)
+
+    for _ in range(50):
+        registry.acquire(path).invoke()
+    assert registry.stats == [
+        {
+            "path": path,
+            "per_thread": True,
+            "users": 50,
+            "interpreters": 1,
+            "model_bytes": 1000,
+            "tensor_bytes": 288,
+            "resident_bytes": 1288,
+        }
+    ]
+
+
+@mock.patch("spokestack.models.registry.TFLiteModel")
+def test_unmapped(mock_model, tmp_path):
+    registry = ModelRegistry()
+
+    # files that cannot be mapped are read into memory
+    model = registry.acquire(model_file(tmp_path, content=b""))
+    model.invoke()
+    assert mock_model.call_args[1]["model_content"] == b""
+
+    # as are files whose interpreters only accept bytes
+    mock_model.side_effect = [TypeError("buffer"), mock.MagicMock()]
+    model = registry.acquire(model_file(tmp_path, name="other.tflite"))
+    model.invoke()
+    assert mock_model.call_args[1]["model_content"] == b"model"
+    assert registry.stats[-1]["model_bytes"] == 5
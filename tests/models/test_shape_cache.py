@@ -0,0 +1,63 @@
+"""
+Tests for the shape cached model wrapper
+"""
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from spokestack.models.shape_cache import ShapeCachedModel
+
+
+class ModelFactory(mock.MagicMock):
+    def __call__(self, model_content, **kwargs):
+        model = mock.MagicMock()
+        model.input_details = [{"index": 0, "shape": np.array([1, 4])}]
+        model.output_details = [{"index": 1, "shape": np.array([1, 2])}]
+        model.side_effect = lambda inputs: [inputs[:, :2] * 2]
+        return model
+
+
+@mock.patch("spokestack.models.shape_cache.TFLiteModel", new_callable=ModelFactory)
+def test_shape_cache(_mock, tmp_path):
+    path = tmp_path / "model.tflite"
+    path.write_bytes(b"model")
+
+    with pytest.raises(ValueError):
+        _ = ShapeCachedModel(str(path), max_shapes=0)
+
+    model = ShapeCachedModel(str(path), max_shapes=2)
+    assert list(model.input_details[0]["shape"]) == [1, 4]
+    assert list(model.output_details[0]["shape"]) == [1, 2]
+    loaded = model._model
+
+    # the model as loaded serves its own shape without resizing
+    model.resize(0, [1, 4])
+    outputs = model(np.ones((1, 4)))
+    assert np.all(outputs[0] == 2)
+    loaded.resize.assert_not_called()
+    assert model.stats == {"shapes": 1, "calls": 1, "allocations": 0}
+
+    # a new shape is allocated once, on an interpreter of its own,
+    # and the inputs are passed through unpadded
+    inputs = np.arange(12, dtype=np.float32).reshape(3, 4)
+    model.resize(0, inputs.shape)
+    outputs = model(inputs)
+    assert np.all(outputs[0] == inputs[:, :2] * 2)
+    interpreter = model._model
+    assert interpreter is not loaded
+    interpreter.resize.assert_called_once_with(0, [3, 4], strict=True)
+    assert interpreter.call_args[0][0] is inputs
+
+    # shapes that were seen before reuse their interpreters
+    model.resize(0, [1, 4])
+    assert model._model is loaded
+    model.resize(0, (3, 4))
+    assert model._model is interpreter
+    assert model.stats == {"shapes": 2, "calls": 2, "allocations": 1}
+
+    # the least recently used interpreter is dropped
+    model.resize(0, [5, 4])
+    model.resize(0, [1, 4])
+    assert model._model is not loaded
+    assert model.stats == {"shapes": 2, "calls": 2, "allocations": 3}
@@ -37,3 +37,146 @@ def test_outputs():
     one = np.zeros((1, 1))
     outputs = model(one)
     assert len(outputs) > 1
+
+
+@mock.patch("spokestack.models.tensorflow.tflite")
+def test_resize(_mock):
+    model = TFLiteModel(model_path="model_path")
+    interpreter = model._interpreter
+    details = [{"name": "inputs", "index": 0, "shape": np.array([1, 4])}]
+    interpreter.get_input_details.return_value = details
+    model._input_details = details
+
+    # tensors are only reallocated when the shape changes
+    model.resize(0, [1, 4])
+    interpreter.resize_tensor_input.assert_not_called()
+
+    details[0] = dict(details[0], shape=np.array([3, 4]))
+    model.resize(0, (3, 4))
+    model.resize(0, [1, 4])
+    interpreter.resize_tensor_input.assert_called_once_with(0, [1, 4], strict=True)
+    assert interpreter.allocate_tensors.call_count == 2
+
+
+@mock.patch("spokestack.models.tensorflow.tflite")
+def test_batch(_mock):
+    model = TFLiteModel(model_path="model_path")
+    interpreter = model._interpreter
+    details = [{"name": "inputs", "index": 0, "shape": np.array([1, 4])}]
+    interpreter.get_input_details.return_value = details
+    interpreter.get_tensor.side_effect = lambda _: np.zeros((batch_size[0], 2))
+    model._input_details = details
+    model._output_details = [{"name": "outputs", "index": 3}]
+    interpreter.get_output_details.return_value = model._output_details
+    batch_size = [1]
+
+    def resize(index, shape, strict):
+        batch_size[0] = shape[0]
+        details[0] = dict(details[0], shape=np.array(shape))
+
+    interpreter.resize_tensor_input.side_effect = resize
+
+    # the batch dimension is resized to fit the inputs
+    outputs = model.batch(np.zeros((3, 4)))
+    assert outputs.shape == (3, 2)
+    interpreter.resize_tensor_input.assert_called_once_with(0, [3, 4], strict=False)
+    assert interpreter.invoke.call_count == 1
+
+    # the tensor is not resized again for the same batch size
+    model.batch(np.zeros((3, 4)))
+    assert interpreter.resize_tensor_input.call_count == 1
+    assert interpreter.invoke.call_count == 2
+
+    # smaller batches are padded to the largest batch, and the padding ignored
+    outputs = model.batch(np.ones((2, 4)))
+    assert outputs.shape == (2, 2)
+    assert interpreter.resize_tensor_input.call_count == 1
+    padded = interpreter.set_tensor.call_args[0][1]
+    assert padded.shape == (3, 4)
+    assert np.all(padded[:2] == 1)
+
+    model.batch(np.ones((1, 4)))
+    assert interpreter.resize_tensor_input.call_count == 1
+    assert interpreter.invoke.call_count == 4
+
+
+@mock.patch("spokestack.models.tensorflow.tflite")
+def test_batch_fallback(_mock):
+    model = TFLiteModel(model_path="model_path")
+    interpreter = model._interpreter
+    model._input_details = [{"name": "inputs", "index": 0, "shape": np.array([1, 4])}]
+    model._output_details = [{"name": "outputs", "index": 3}]
+    interpreter.get_input_details.return_value = model._input_details
+    interpreter.get_output_details.return_value = model._output_details
+    interpreter.get_tensor.return_value = np.zeros((1, 2))
+    interpreter.resize_tensor_input.side_effect = [ValueError("fixed"), None]
+
+    # models that cannot be resized are invoked once per input
+    outputs = model.batch(np.zeros((3, 4)))
+    assert outputs.shape == (3, 2)
+    assert interpreter.invoke.call_count == 3
+
+    # the original shape is kept, so nothing is reallocated to restore it
+    model.batch(np.zeros((2, 4)))
+    assert interpreter.resize_tensor_input.call_count == 1
+    assert interpreter.invoke.call_count == 5
+
+
+@mock.patch("spokestack.models.tensorflow.tflite")
+def test_run(_mock):
+    model = TFLiteModel(model_path="model_path")
+    interpreter = model._interpreter
+    model._input_details = [
+        {"index": 0, "shape": np.array([1, 2, 3])},
+        {"index": 1, "shape": np.array([1, 3])},
+    ]
+    model._output_details = [{"index": 2}]
+    buffers = [np.zeros((1, 2, 3)), np.zeros((1, 3)), np.zeros((1, 3))]
+    interpreter.tensor.side_effect = lambda index: lambda: buffers[index]
+
+    def invoke():
+        buffers[2][:] = buffers[0].sum(axis=1) + buffers[1]
+
+    interpreter.invoke.side_effect = invoke
+
+    # inputs are copied into the buffers, omitting the batch dimension
+    outputs = model.run(np.ones((2, 3)), np.ones((1, 3)))
+    assert np.all(buffers[0] == 1)
+    assert np.all(buffers[1] == 1)
+    assert outputs[0] is buffers[2]
+    assert np.all(outputs[0] == 3)
+    assert model.input_tensor(1) is buffers[1]
+    assert model.output_tensor() is buffers[2]
+    interpreter.set_tensor.assert_not_called()
+    interpreter.get_tensor.assert_not_called()
+
+    # accessors are fetched once, and again after a resize
+    assert interpreter.tensor.call_count == 3
+    model.invoke()
+    model.run(np.ones((2, 3)), np.ones((1, 3)))
+    assert interpreter.tensor.call_count == 3
+    model._interpreter.get_input_details.return_value = model._input_details
+    model._interpreter.get_output_details.return_value = model._output_details
+    model.resize(0, [2, 2, 3])
+    model.run(np.ones((2, 3)), np.ones((1, 3)))
+    assert interpreter.tensor.call_count == 6
+
+
+@mock.patch("spokestack.models.tensorflow.tflite")
+def test_interpreter_options(mock_tflite):
+    # options are left to the runtime unless they are set
+    _ = TFLiteModel(model_path="model_path")
+    mock_tflite.Interpreter.assert_called_with(model_path="model_path")
+
+    delegate = mock.MagicMock()
+    _ = TFLiteModel(
+        model_content=b"model",
+        num_threads=4,
+        delegates=["libdelegate.so", delegate],
+    )
+    mock_tflite.load_delegate.assert_called_once_with("libdelegate.so")
+    mock_tflite.Interpreter.assert_called_with(
+        model_content=b"model",
+        num_threads=4,
+        experimental_delegates=[mock_tflite.load_delegate.return_value, delegate],
+    )
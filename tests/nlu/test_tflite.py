@@ -153,3 +153,46 @@ def test_classify_with_multiple_slots(_mock_tokenizer, _mock_model, fs):
             "raw_value": "ninety nine",
         },
     }
+
+
+@mock.patch("spokestack.nlu.tflite.BertWordPieceTokenizer")
+def test_registry(_mock_tokenizer, fs):
+    metadata = json.dumps({"domain": "dummy", "intents": [], "tags": ["o"]})
+    fs.create_file("/tmp/model/vocab.txt")
+    fs.create_file("/tmp/model/metadata.json", contents=metadata)
+    registry = mock.MagicMock()
+    model = TFLiteNLU("/tmp/model/", registry=registry, num_threads=2)
+    registry.acquire.assert_called_once_with(
+        model_path="/tmp/model/nlu.tflite", num_threads=2, delegates=None
+    )
+
+    model.close()
+    registry.release.assert_called_once_with(registry.acquire.return_value)
+    model.close()
+    registry.release.assert_called_once()
+
+
+@mock.patch("spokestack.nlu.tflite.BertWordPieceTokenizer")
+@mock.patch("spokestack.nlu.tflite.ModelPool")
+def test_pool(mock_pool, _mock_tokenizer, fs):
+    metadata = json.dumps({"domain": "dummy", "intents": [], "tags": ["o"]})
+    fs.create_file("/tmp/model/vocab.txt")
+    fs.create_file("/tmp/model/metadata.json", contents=metadata)
+    registry = mock.MagicMock()
+    model = TFLiteNLU("/tmp/model/", registry=registry, pool_size=4, pool_timeout=1.0)
+    mock_pool.assert_called_once_with(
+        model_path="/tmp/model/nlu.tflite",
+        size=4,
+        timeout=1.0,
+        num_threads=None,
+        delegates=None,
+    )
+
+    # every pooled interpreter is warmed up
+    mock_pool.return_value.warm_up.assert_called_once()
+    mock_pool.return_value.assert_not_called()
+
+    # pooled models are not shared through the registry
+    registry.acquire.assert_not_called()
+    model.close()
+    registry.release.assert_not_called()
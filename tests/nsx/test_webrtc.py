@@ -63,6 +63,27 @@ def test_processing():
     np.allclose(rms(expect), rms(actual), atol=3)
 
 
+def test_process_block():
+    context = SpeechContext()
+    frame = utils.float_to_int16(add_noise(sin_frame()))
+
+    # the block path matches per-frame processing
+    expect = np.stack([frame, frame])
+    nsx = AutomaticNoiseSuppression(16000, 1)
+    for row in expect:
+        nsx(context, row)
+
+    actual = np.stack([frame, frame])
+    nsx = AutomaticNoiseSuppression(16000, 1)
+    nsx.process_block(context, actual)
+    np.testing.assert_array_equal(actual, expect)
+
+    with pytest.raises(ValueError):
+        nsx.process_block(context, np.zeros((2, 550), np.int16))
+    with pytest.raises(TypeError):
+        nsx.process_block(context, np.zeros((2, 320)))
+
+
 def sin_frame(sample_rate=16000, frequency=100, frame_width=20):
     frame_width = sample_rate * frame_width // 1000
     x = 2 * np.pi * np.arange(sample_rate) / sample_rate
@@ -13,3 +13,13 @@ def test_activate(*args):
     pipeline = SpokestackWakeword.create("mock_model_dir")
     pipeline.start()
     pipeline.run()
+
+
+@mock.patch("spokestack.profile.wakeword.PyAudioInput")
+@mock.patch("spokestack.profile.wakeword.WakewordTrigger")
+@mock.patch("spokestack.profile.wakeword.SpeechPipeline")
+def test_interpreter_options(_pipeline, mock_trigger, _input):
+    _ = SpokestackWakeword.create("mock_model_dir", num_threads=2, delegates=["xnn"])
+    kwargs = mock_trigger.call_args[1]
+    assert kwargs["num_threads"] == 2
+    assert kwargs["delegates"] == ["xnn"]
@@ -0,0 +1,102 @@
+"""
+Tests for offline file processing
+"""
+import json
+import wave
+
+import numpy as np
+
+from spokestack.batch import process_directory, process_file
+
+
+class EnergyTrigger:
+    """ activates on loud frames and recognizes when activation ends """
+
+    def __init__(self):
+        self.was_active = False
+        self.resets = 0
+
+    def __call__(self, context, frame):
+        if np.abs(frame).max() > 1000:
+            context.is_active = True
+        elif context.is_active:
+            context.is_active = False
+        if self.was_active and not context.is_active:
+            context.transcript = "loud"
+            context.confidence = 1.0
+            context.event("recognize")
+        self.was_active = context.is_active
+
+    def reset(self):
+        self.was_active = False
+        self.resets += 1
+
+    def close(self):
+        pass
+
+
+def create_stages():
+    return [EnergyTrigger()]
+
+
+def write_wav(path, loud_frames, total_frames=10):
+    samples = np.zeros(total_frames * 320, np.int16)
+    for i in loud_frames:
+        samples[i * 320 : (i + 1) * 320] = 5000
+    with wave.open(str(path), "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(16000)
+        file.writeframes(samples.tobytes())
+
+
+def test_process_file(tmp_path):
+    path = tmp_path / "call.wav"
+    write_wav(path, loud_frames=[2, 3])
+    stages = create_stages()
+
+    events, duration = process_file(str(path), stages)
+    assert duration == 0.2
+    assert [(e["event"], e["time"]) for e in events] == [
+        ("activate", 0.04),
+        ("deactivate", 0.08),
+        ("recognize", 0.08),
+    ]
+    assert events[-1]["transcript"] == "loud"
+    assert events[-1]["confidence"] == 1.0
+    assert all(e["file"] == str(path) for e in events)
+    assert stages[0].resets == 1
+
+
+def test_process_file_end(tmp_path):
+    # utterances running to the end of the file are completed
+    path = tmp_path / "call.wav"
+    write_wav(path, loud_frames=[9])
+
+    events, _ = process_file(str(path), create_stages(), block_size=5)
+    assert [(e["event"], e["time"]) for e in events] == [
+        ("activate", 0.18),
+        ("deactivate", 0.2),
+        ("recognize", 0.2),
+    ]
+
+
+def test_process_directory(tmp_path):
+    write_wav(tmp_path / "a.wav", loud_frames=[1])
+    write_wav(tmp_path / "b.wav", loud_frames=[])
+    (tmp_path / "c.wav").write_bytes(b"invalid")
+    output = tmp_path / "events.jsonl"
+
+    stats = process_directory(str(tmp_path), create_stages, str(output), max_workers=2)
+    assert stats["files"] == 3
+    assert stats["errors"] == 1
+    assert stats["duration"] == 0.4
+    assert stats["realtime_factor"] > 0
+
+    events = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(e["file"][-5:], e["event"]) for e in events] == [
+        ("a.wav", "activate"),
+        ("a.wav", "deactivate"),
+        ("a.wav", "recognize"),
+        ("c.wav", "error"),
+    ]
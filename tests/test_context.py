@@ -28,6 +28,12 @@ def test_context():
     context.confidence = 1.0
     assert context.confidence == 1.0
 
+    # test frames
+    context.features["key"] = 1
+    context.next_frame()
+    assert context.frame_index == 1
+    assert not context.features
+
     # test reset
     context.reset()
     assert not context.is_speech
@@ -0,0 +1,124 @@
+"""
+Tests for the streaming STFT front end
+"""
+from unittest import mock
+
+import numpy as np
+
+from spokestack.context import SpeechContext
+from spokestack.features import StreamingSTFT
+
+
+def reference(frames, window_size, hop_length, pre_emphasis):
+    # per-sample front end the streaming STFT replaces
+    spectra = []
+    window = []
+    prev_sample = 0.0
+    for frame in frames:
+        frame = frame.astype(np.float32) / (2 ** 15 - 1)
+        frame = np.clip(frame, -1.0, 1.0)
+        prev = frame[-1]
+        frame -= pre_emphasis * np.append(prev_sample, frame[:-1])
+        prev_sample = prev
+        for sample in frame:
+            window.append(sample)
+            if len(window) == window_size:
+                spectrum = np.fft.rfft(np.array(window) * np.hanning(window_size))
+                spectra.append(np.abs(spectrum).astype(np.float32))
+                window = window[hop_length:]
+    return np.stack(spectra)
+
+
+def test_magnitude():
+    frames = np.random.randint(-32768, 32767, size=(20, 320), dtype=np.int16)
+    stft = StreamingSTFT(window_size=512, hop_length=160, pre_emphasis=0.97)
+
+    counts = []
+    spectra = []
+    for frame in frames:
+        stft.update(frame)
+        magnitude = stft.magnitude()
+        counts.append(len(magnitude))
+        spectra.append(magnitude.copy())
+
+    # the first window completes once enough samples have been received
+    assert counts[:3] == [0, 1, 2]
+    np.testing.assert_allclose(
+        np.concatenate(spectra), reference(frames, 512, 160, 0.97), rtol=1e-4, atol=1e-4
+    )
+
+    stft.reset()
+    stft.update(frames[0])
+    assert not stft.magnitude().size
+
+
+def test_frame_sizes():
+    # frame sizes can vary and need not be a multiple of the hop
+    frames = np.random.randint(-32768, 32767, size=(12, 250), dtype=np.int16)
+    stft = StreamingSTFT(window_size=256, hop_length=100)
+
+    spectra = []
+    for i, frame in enumerate(frames):
+        stft.update(frame[: 250 - i * 10])
+        spectra.append(stft.magnitude().copy())
+    expect = reference([f[: 250 - i * 10] for i, f in enumerate(frames)], 256, 100, 0)
+    np.testing.assert_allclose(np.concatenate(spectra), expect, rtol=1e-4, atol=1e-4)
+
+
+def test_shared():
+    context = SpeechContext()
+    frames = np.random.randint(-32768, 32767, size=(12, 320), dtype=np.int16)
+    first = StreamingSTFT(512, 160, pre_emphasis=0.97)
+    second = StreamingSTFT(512, 160, pre_emphasis=0.97)
+    other = StreamingSTFT(512, 160)
+
+    # each window is transformed once for matching configurations, except
+    # the first, whose pre-emphasis depends on audio before the stream
+    spectra = []
+    with mock.patch("numpy.fft.rfft", wraps=np.fft.rfft) as rfft:
+        for i, frame in enumerate(frames[:6]):
+            context.next_frame()
+            for stft in [first, second, other]:
+                stft.update_shared(context, frame)
+            first.magnitude(context)
+            other.magnitude(context)
+            rfft.reset_mock()
+            spectra.append(second.magnitude(context).copy())
+            assert rfft.call_count == int(i == 1)
+    np.testing.assert_allclose(
+        np.concatenate(spectra),
+        reference(frames[:6], 512, 160, 0.97),
+        rtol=1e-4,
+        atol=1e-4,
+    )
+    assert len(other.magnitude(context))
+
+    # a reset only discards the history of the stage's own STFT
+    first.reset()
+    for frame in frames[6:]:
+        context.next_frame()
+        for stft in [first, second]:
+            stft.update_shared(context, frame)
+            stft.magnitude(context)
+        spectra.append(second.magnitude(context).copy())
+    np.testing.assert_allclose(
+        np.concatenate(spectra), reference(frames, 512, 160, 0.97), rtol=1e-4, atol=1e-4
+    )
+
+
+def test_shared_skipped_frames():
+    context = SpeechContext()
+    frames = np.random.randint(-32768, 32767, size=(8, 320), dtype=np.int16)
+    first = StreamingSTFT(512, 160, pre_emphasis=0.97)
+    second = StreamingSTFT(512, 160, pre_emphasis=0.97)
+    alone = StreamingSTFT(512, 160, pre_emphasis=0.97)
+
+    # windows holding audio from before a skipped frame are not shared
+    for i, frame in enumerate(frames):
+        context.next_frame()
+        first.update_shared(context, frame)
+        first.magnitude(context)
+        if i != 3:
+            second.update_shared(context, frame)
+            alone.update(frame)
+            np.testing.assert_array_equal(second.magnitude(context), alone.magnitude())
@@ -0,0 +1,125 @@
+"""
+Tests for SpeechPipelineHost
+"""
+import threading
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from spokestack.host import SpeechPipelineHost
+from spokestack.models.batched import BatchedModel
+
+
+def create_stages():
+    return [mock.MagicMock(), mock.MagicMock()]
+
+
+def test_add_remove():
+    host = SpeechPipelineHost(create_stages)
+
+    first = host.add("first", mock.MagicMock())
+    second = host.add("second", mock.MagicMock())
+    assert len(host) == 2
+    assert "first" in host
+    assert host["first"] is first
+    assert list(host) == ["first", "second"]
+    assert first.is_running
+    assert first._stages is not second._stages
+
+    # duplicate streams are rejected
+    with pytest.raises(ValueError):
+        host.add("first", mock.MagicMock())
+
+    stages = list(first._stages)
+    host.remove("first")
+    assert "first" not in host
+    for stage in stages:
+        stage.close.assert_called()
+
+    host.close()
+    assert not len(host)
+
+
+def test_step():
+    host = SpeechPipelineHost(create_stages)
+    first = host.add("first", mock.MagicMock())
+    second = host.add("second", mock.MagicMock())
+
+    host.step()
+    for stage in first._stages + second._stages:
+        stage.assert_called_once()
+
+    # stopped pipelines are skipped
+    second.stop()
+    host.step()
+    for stage in first._stages:
+        assert stage.call_count == 2
+    for stage in second._stages:
+        assert stage.call_count == 1
+
+    host.close()
+
+
+def test_run():
+    host = SpeechPipelineHost(create_stages)
+    pipeline = host.add("stream", mock.MagicMock())
+
+    @pipeline.event
+    def on_step(context):
+        host.stop()
+
+    host.run()
+    assert not host.is_running
+    host.close()
+
+
+def test_batched_models():
+    class FilterModel:
+        input_details = [{"index": 0, "shape": np.array([1, 4])}]
+        output_details = [{"index": 1, "shape": np.array([1, 4])}]
+
+        def __init__(self):
+            self.batch_sizes = []
+            self.threads = set()
+
+        def __call__(self, inputs):
+            self.batch_sizes.append(len(inputs))
+            self.threads.add(threading.get_ident())
+            return [inputs * 2]
+
+    class Stage:
+        # runs two dependent requests per frame
+        def __init__(self, model):
+            self.model = model
+            self.outputs = []
+
+        def __call__(self, context, frame):
+            outputs = self.model.batch(np.ones((1, 4), np.float32))
+            self.outputs.append(self.model.batch(outputs))
+
+        def close(self):
+            pass
+
+    model = FilterModel()
+    batched = BatchedModel(model, deadline=None)
+    host = SpeechPipelineHost(lambda: [Stage(batched)], models=[batched])
+    pipelines = [host.add(i, mock.MagicMock()) for i in range(3)]
+
+    # every stream's request runs in a single batch on the host's thread
+    host.step()
+    host.step()
+    assert model.batch_sizes == [3] * 4
+    assert model.threads == {threading.get_ident()}
+    for pipeline in pipelines:
+        stage = pipeline._stages[0]
+        assert len(stage.outputs) == 2
+        assert np.allclose(stage.outputs[0], 4.0)
+
+    # errors are raised to the host
+    pipelines[0]._stages[0].model = None
+    with pytest.raises(AttributeError):
+        host.step()
+
+    host.close()
+    batched.close()
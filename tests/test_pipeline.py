@@ -1,6 +1,11 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
-from spokestack.pipeline import SpeechPipeline
+import numpy as np
+import pytest
+
+from spokestack.pipeline import AsyncSpeechPipeline, SpeechPipeline
 
 
 def test_start_stop():
@@ -109,3 +114,139 @@ def test_pause_resume():
     pipeline.resume()
     pipeline._input_source.start.assert_called()
     pipeline.close()
+
+
+class BlockStage:
+    def __init__(self):
+        self.blocks = []
+        self.frames = []
+
+    def __call__(self, context, frame):
+        self.frames.append(frame)
+
+    def process_block(self, context, frames):
+        self.blocks.append(frames.copy())
+        frames += 1
+
+    def close(self):
+        pass
+
+
+def test_block_dispatch():
+    input_source = mock.MagicMock()
+    input_source.read.side_effect = [np.full(4, i, np.int16) for i in range(3)]
+    del input_source.read_block
+
+    block = BlockStage()
+    frames = []
+    stages = [block, mock.MagicMock()]
+    stages[1].side_effect = lambda context, frame: frames.append(frame.copy())
+    pipeline = SpeechPipeline(input_source, stages=stages, block_size=3)
+
+    on_step = mock.MagicMock()
+    pipeline.event(on_step, name="step")
+    pipeline.step()
+
+    # leading block stages see the whole block, the rest see each frame
+    on_step.assert_called_once()
+    assert len(block.blocks) == 1
+    assert not block.frames
+    np.testing.assert_array_equal(block.blocks[0][:, 0], [0, 1, 2])
+    assert [frame[0] for frame in frames] == [1, 2, 3]
+    pipeline.close()
+
+
+def test_block_read():
+    input_source = mock.MagicMock()
+    input_source.read_block.return_value = np.zeros((2, 4), np.int16)
+
+    # block stages after a per-frame stage are called per frame
+    stages = [mock.MagicMock(), BlockStage()]
+    pipeline = SpeechPipeline(input_source, stages=stages, block_size=2)
+    pipeline.step()
+
+    input_source.read_block.assert_called_once_with(2)
+    input_source.read.assert_not_called()
+    assert stages[0].call_count == 2
+    assert not stages[1].blocks
+    assert len(stages[1].frames) == 2
+
+    with pytest.raises(ValueError):
+        SpeechPipeline(input_source, stages=[], block_size=0)
+
+
+def async_stage():
+    stage = mock.AsyncMock()
+    stage.close = mock.MagicMock()
+    return stage
+
+
+def test_async_dispatch():
+    input_source = mock.MagicMock()
+    input_source.read = mock.AsyncMock(return_value="frame")
+    stages = [
+        mock.MagicMock(),
+        mock.MagicMock(),
+        async_stage(),
+        mock.MagicMock(),
+    ]
+    pipeline = AsyncSpeechPipeline(input_source, stages=stages)
+
+    # synchronous stages are grouped between awaitable stages
+    assert [len(group) for _, group in pipeline._groups] == [2, 1, 1]
+
+    pipeline.start()
+    asyncio.run(pipeline.step())
+    for stage in stages:
+        stage.assert_called_once_with(pipeline.context, "frame")
+    stages[2].assert_awaited()
+
+    pipeline.close()
+
+
+def test_async_executor():
+    input_source = mock.MagicMock()
+    input_source.read = mock.AsyncMock(return_value="frame")
+    stages = [mock.MagicMock(), async_stage()]
+
+    with ThreadPoolExecutor(1) as executor:
+        pipeline = AsyncSpeechPipeline(input_source, stages=stages, executor=executor)
+        pipeline.start()
+        asyncio.run(pipeline.step())
+
+    for stage in stages:
+        stage.assert_called_once_with(pipeline.context, "frame")
+
+
+def test_async_run_pause():
+    input_source = mock.MagicMock()
+    input_source.read = mock.AsyncMock(return_value="frame")
+    stages = [mock.MagicMock()]
+    pipeline = AsyncSpeechPipeline(input_source, stages=stages)
+
+    @pipeline.event
+    def on_step(context):
+        pipeline.stop()
+
+    asyncio.run(pipeline.run())
+    stages[0].assert_called_once()
+
+    pipeline.start()
+    pipeline.pause()
+    asyncio.run(pipeline.step())
+    stages[0].assert_called_once()
+
+    pipeline.close()
+
+
+def test_features_cleared():
+    seen = []
+
+    def publish(context, frame):
+        seen.append(dict(context.features))
+        context.features["key"] = frame
+
+    pipeline = SpeechPipeline(mock.MagicMock(), stages=[publish])
+    pipeline.step()
+    pipeline.step()
+    assert seen == [{}, {}]
@@ -0,0 +1,98 @@
+"""
+Tests for the pipeline latency instrumentation
+"""
+import time
+from unittest import mock
+
+import pytest
+
+from spokestack.pipeline import SpeechPipeline
+from spokestack.profiling import LatencyHistogram, StageProfiler
+
+
+class SlowStage:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __call__(self, context, frame):
+        time.sleep(self.delay)
+
+    def close(self):
+        pass
+
+
+def test_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0.0
+
+    for latency in range(1, 101):
+        histogram.record(latency / 1000)
+    assert histogram.count == 100
+
+    stats = histogram.stats
+    assert stats["mean"] == pytest.approx(0.0505)
+    assert stats["max"] == 0.1
+    # percentiles are accurate to the bucket resolution
+    assert stats["p50"] == pytest.approx(0.05, rel=0.1)
+    assert stats["p95"] == pytest.approx(0.095, rel=0.1)
+    assert stats["p99"] == pytest.approx(0.099, rel=0.1)
+    assert stats["p50"] <= stats["p95"] <= stats["p99"] <= stats["max"]
+
+    # latencies outside the bucket range are clamped
+    histogram.record(0.0)
+    histogram.record(100.0)
+    assert histogram.percentile(100) == 100.0
+
+    histogram.reset()
+    assert histogram.count == 0
+    assert histogram.stats["max"] == 0.0
+
+
+def test_profiler():
+    stages = [mock.MagicMock(), mock.MagicMock(), SlowStage(0.002)]
+    profiler = StageProfiler(stages, frame_budget=0.001)
+    context = mock.MagicMock()
+
+    profiler.dispatch(context, stages, None)
+    stats = profiler.stats
+    assert stats["frames"] == 1
+    assert stats["overruns"] == 1
+    context.event.assert_called_once_with("overrun")
+
+    # repeated stage classes are distinguished by position
+    assert list(stats["stages"]) == ["MagicMock_0", "MagicMock_1", "SlowStage"]
+    assert stats["stages"]["SlowStage"]["wall"]["max"] >= 0.002
+    assert stats["wall"]["max"] >= stats["stages"]["SlowStage"]["wall"]["max"]
+
+    profiler.reset()
+    assert profiler.stats["frames"] == 0
+    assert profiler.stats["overruns"] == 0
+
+
+def test_pipeline():
+    stages = [mock.MagicMock(), SlowStage(0.002)]
+    pipeline = SpeechPipeline(
+        mock.MagicMock(), stages=stages, profile=True, frame_budget=0.001
+    )
+    overruns = []
+
+    @pipeline.event
+    def on_overrun(context):
+        overruns.append(context)
+
+    pipeline.start()
+    pipeline.step()
+    pipeline.step()
+    stages[0].assert_called()
+
+    stats = pipeline.stats()
+    assert stats["frames"] == 2
+    assert stats["overruns"] == 2
+    assert len(overruns) == 2
+
+    pipeline.close()
+
+    # profiling is disabled by default
+    pipeline = SpeechPipeline(mock.MagicMock(), stages=[mock.MagicMock()])
+    pipeline.step()
+    assert pipeline.stats() == {}
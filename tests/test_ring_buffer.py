@@ -4,7 +4,7 @@ Tests for RingBuffer class
 import numpy as np
 import pytest
 
-from spokestack.ring_buffer import RingBuffer
+from spokestack.ring_buffer import MirroredRingBuffer, RingBuffer
 
 
 def test_ring_buffer():
@@ -129,3 +129,75 @@ def test_read_all():
     assert buffer.is_empty
     assert not buffer.is_full
     assert all.all() == np.array(values).all()
+
+
+def test_mirrored():
+    expect = RingBuffer([5, 2])
+    actual = MirroredRingBuffer([5, 2])
+    expect.fill(0.0)
+    actual.fill(0.0)
+
+    # windowed writes match the copying ring buffer
+    for i in range(12):
+        for buffer in [expect, actual]:
+            buffer.rewind().seek(1)
+            buffer.write(np.ones(2) * (i + 1))
+        window = actual.read_all()
+        np.testing.assert_array_equal(window, expect.read_all())
+        assert window.shape == (5, 2)
+        assert actual.is_empty
+
+    # the window is a view of the backing array
+    assert np.shares_memory(actual.read_all(), actual._buffer)
+
+    # reads continue to work after wrapping
+    actual.rewind()
+    for i in range(actual.capacity):
+        assert actual.read()[0][0] == i + 8
+
+    with pytest.raises(IndexError):
+        actual.rewind().write(np.ones(2))
+
+
+@pytest.mark.parametrize("buffer_type", [RingBuffer, MirroredRingBuffer])
+def test_write_read_many(buffer_type):
+    buffer = buffer_type([5, 2])
+    items = np.arange(20, dtype=np.float32).reshape(10, 2)
+
+    # writes and reads wrap around the end of the buffer
+    for start in range(0, 9, 3):
+        buffer.write_many(items[start : start + 3])
+        np.testing.assert_array_equal(buffer.read_many(3), items[start : start + 3])
+        assert buffer.is_empty
+
+    buffer.write_many(items[:5])
+    assert buffer.is_full
+    with pytest.raises(IndexError):
+        buffer.write_many(items[:1])
+    np.testing.assert_array_equal(buffer.read_all(), items[:5])
+
+    with pytest.raises(IndexError):
+        buffer.read_many(1)
+
+
+@pytest.mark.parametrize("buffer_type", [RingBuffer, MirroredRingBuffer])
+def test_windows(buffer_type):
+    samples = np.random.rand(1000).astype(np.float32)
+
+    # windows match writing one sample at a time
+    expect = []
+    buffer = RingBuffer([64])
+    for sample in samples:
+        buffer.write(sample)
+        if buffer.is_full:
+            expect.append(buffer.read_all())
+            buffer.rewind().seek(16)
+
+    actual = []
+    buffer = buffer_type([64])
+    for i in range(0, len(samples), 160):
+        for window in buffer.windows(samples[i : i + 160], 16):
+            actual.append(window.copy())
+
+    assert len(actual) == len(expect)
+    np.testing.assert_array_equal(np.stack(actual), np.stack(expect))
@@ -0,0 +1,153 @@
+"""
+Tests for activity-aware stage scheduling
+"""
+import asyncio
+from unittest import mock
+
+import numpy as np
+
+from spokestack.activation_timeout import ActivationTimeout
+from spokestack.context import SpeechContext
+from spokestack.pipeline import AsyncSpeechPipeline, SpeechPipeline
+from spokestack.schedule import (
+    RUN_ACTIVE,
+    RUN_ACTIVE_EDGE,
+    RUN_INACTIVE,
+    RUN_SPEECH,
+    RUN_SPEECH_EDGE,
+    StageScheduler,
+)
+
+
+def scheduled_stage(schedule):
+    stage = mock.MagicMock()
+    stage.schedule = schedule
+    return stage
+
+
+def test_scheduler():
+    context = SpeechContext()
+    scheduler = StageScheduler(
+        [
+            mock.MagicMock(),
+            scheduled_stage(RUN_ACTIVE),
+            scheduled_stage(RUN_INACTIVE),
+            scheduled_stage(RUN_SPEECH),
+            scheduled_stage(RUN_ACTIVE_EDGE),
+            scheduled_stage(RUN_SPEECH_EDGE),
+        ]
+    )
+    assert scheduler.is_enabled
+
+    def due():
+        return [scheduler.due(i, context) for i in range(6)]
+
+    assert due() == [True, False, True, False, False, False]
+
+    context.is_speech = True
+    assert due() == [True, False, True, True, False, True]
+    assert due() == [True, False, True, True, False, False]
+
+    context.is_active = True
+    assert due() == [True, True, False, True, True, False]
+    assert due() == [True, True, False, True, False, False]
+
+    context.is_speech = False
+    context.is_active = False
+    assert due() == [True, False, True, False, True, True]
+    assert due() == [True, False, True, False, False, False]
+
+    assert not StageScheduler([mock.MagicMock()]).is_enabled
+
+
+def test_edge_position():
+    # edges are detected at the stage's position within the frame
+    setter = mock.MagicMock()
+    setter.side_effect = lambda context, frame: setattr(context, "is_speech", True)
+    before = scheduled_stage(RUN_SPEECH_EDGE)
+    after = scheduled_stage(RUN_SPEECH_EDGE)
+    pipeline = SpeechPipeline(mock.MagicMock(), stages=[before, setter, after])
+
+    pipeline.step()
+    before.assert_not_called()
+    after.assert_called_once()
+
+    pipeline.step()
+    before.assert_called_once()
+    after.assert_called_once()
+
+
+def test_pipeline():
+    always = mock.MagicMock()
+    active = scheduled_stage(RUN_ACTIVE | RUN_ACTIVE_EDGE)
+    pipeline = SpeechPipeline(mock.MagicMock(), stages=[always, active])
+
+    pipeline.step()
+    pipeline.step()
+    assert always.call_count == 2
+    active.assert_not_called()
+
+    pipeline.activate()
+    pipeline.step()
+    pipeline.step()
+    assert active.call_count == 2
+
+    # the deactivation edge is delivered once
+    pipeline.deactivate()
+    pipeline.step()
+    pipeline.step()
+    assert always.call_count == 6
+    assert active.call_count == 3
+
+
+def test_activation_timeout():
+    # skipping idle frames does not change when the timeout deactivates
+    class SpeechInput:
+        def __init__(self, pattern):
+            self.pattern = iter(pattern)
+
+        def read(self):
+            return next(self.pattern)
+
+        def start(self):
+            pass
+
+        def stop(self):
+            pass
+
+    def speech(context, frame):
+        context.is_speech = frame
+        if frame:
+            context.is_active = True
+
+    pattern = [False] * 5 + [True] * 10 + [False] * 5 + [True] * 3 + [False] * 3
+    results = []
+    for scheduled in [False, True]:
+        timeout = ActivationTimeout(min_active=100, max_active=500)
+        if not scheduled:
+            timeout.schedule = None
+        pipeline = SpeechPipeline(SpeechInput(pattern), stages=[speech, timeout])
+        active = []
+        for _ in pattern:
+            pipeline.step()
+            active.append(pipeline.context.is_active)
+        results.append(active)
+
+    assert results[0] == results[1]
+    assert not all(results[0])
+
+
+def test_async_pipeline():
+    class AsyncInput:
+        async def read(self):
+            return np.zeros(160, np.int16)
+
+    always = mock.MagicMock()
+    active = scheduled_stage(RUN_ACTIVE)
+    pipeline = AsyncSpeechPipeline(AsyncInput(), stages=[always, active])
+
+    asyncio.run(pipeline.step())
+    pipeline.activate()
+    asyncio.run(pipeline.step())
+    assert always.call_count == 2
+    active.assert_called_once()
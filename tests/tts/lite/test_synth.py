@@ -1,4 +1,6 @@
 import json
+import threading
+import time
 from unittest import mock
 
 import numpy as np
@@ -14,7 +16,7 @@ desert\tˈdɛzɝt
 
 
 class ModelFactory(mock.MagicMock):
-    def __call__(self, model_path):
+    def __call__(self, model_path, **kwargs):
         model = mock.MagicMock()
         if model_path.endswith("align.tflite"):
             model.input_details = [{"index": 0}]
@@ -51,3 +53,184 @@ def test_synthesizer(_mock, tmpdir):
     assert len(blocks) == 6
     for block in blocks:
         assert len(block) <= BLOCK_LENGTH
+
+
+def test_registry(tmpdir):
+    with open(tmpdir / "lexicon.txt", "w") as file:
+        file.write(LEXICON)
+
+    with open(tmpdir / "metadata.json", "w") as file:
+        json.dump({"language": "en", "alphabet": list(ALPHABET)}, file)
+
+    registry = mock.MagicMock()
+    registry.acquire.side_effect = ModelFactory()
+    synth = SpeechSynthesizer(tmpdir, registry=registry)
+    assert registry.acquire.call_count == 3
+
+    synth.close()
+    assert registry.release.call_count == 3
+    synth.close()
+    assert registry.release.call_count == 3
+
+
+@mock.patch("spokestack.models.pool.TFLiteModel")
+def test_pool(mock_model, tmpdir):
+    with open(tmpdir / "lexicon.txt", "w") as file:
+        file.write(LEXICON)
+
+    with open(tmpdir / "metadata.json", "w") as file:
+        json.dump({"language": "en", "alphabet": list(ALPHABET)}, file)
+
+    # each pooled interpreter is built from the contents of its model file
+    factory = ModelFactory()
+    for name in ["align", "encode", "decode"]:
+        with open(tmpdir / f"{name}.tflite", "w") as file:
+            file.write(f"{name}.tflite")
+    mock_model.side_effect = lambda model_content, **kwargs: factory(
+        model_content.decode()
+    )
+
+    synth = SpeechSynthesizer(tmpdir, pool_size=2)
+    assert mock_model.call_count == 6
+
+    blocks = list(synth.synthesize("I desert in the desert."))
+    assert len(blocks) == 3
+    assert synth._aligner.stats["checkouts"] == 1
+    assert synth._encoder.stats["checkouts"] == 1
+    assert synth._decoder.stats["checkouts"] == 2
+
+
+@mock.patch("spokestack.tts.lite.TFLiteModel", new_callable=ModelFactory)
+def test_prefetch(_mock, tmpdir):
+    with open(tmpdir / "lexicon.txt", "w") as file:
+        file.write(LEXICON)
+
+    with open(tmpdir / "metadata.json", "w") as file:
+        json.dump({"language": "en", "alphabet": list(ALPHABET)}, file)
+
+    utterance = "This is a test. This is another one."
+    expected = list(SpeechSynthesizer(tmpdir).synthesize(utterance))
+
+    # the next sentence is encoded on a worker thread while the
+    # current sentence is decoded
+    synth = SpeechSynthesizer(tmpdir, prefetch=True)
+    aligned = threading.Event()
+    threads = []
+
+    def align(inputs):
+        threads.append(threading.get_ident())
+        if len(threads) == 2:
+            aligned.set()
+        return [np.zeros([100, 256], dtype=np.float32)]
+
+    synth._aligner.side_effect = align
+    blocks = synth.synthesize(utterance)
+    first = next(blocks)
+    assert aligned.wait(timeout=1)
+    blocks = [first] + list(blocks)
+    assert len(blocks) == len(expected)
+    for block, other in zip(blocks, expected):
+        assert np.array_equal(block, other)
+    assert threading.get_ident() not in threads
+
+    # prefetched models are not shared through the registry
+    registry = mock.MagicMock()
+    registry.acquire.side_effect = ModelFactory()
+    synth = SpeechSynthesizer(tmpdir, registry=registry, prefetch=True)
+    assert registry.acquire.call_count == 1
+    assert registry.acquire.call_args[0][0].endswith("decode.tflite")
+
+
+@mock.patch("spokestack.tts.lite.TFLiteModel", new_callable=ModelFactory)
+def test_prefetch_abandoned(_mock, tmpdir):
+    with open(tmpdir / "lexicon.txt", "w") as file:
+        file.write(LEXICON)
+
+    with open(tmpdir / "metadata.json", "w") as file:
+        json.dump({"language": "en", "alphabet": list(ALPHABET)}, file)
+
+    synth = SpeechSynthesizer(tmpdir, prefetch=True)
+    lock = threading.Lock()
+    active = []
+    overlaps = []
+
+    def align(inputs):
+        with lock:
+            active.append(threading.get_ident())
+            overlaps.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.pop()
+        return [np.zeros([100, 256], dtype=np.float32)]
+
+    # the worker of an abandoned call keeps encoding its next sentence,
+    # which must not overlap with the sentences of a new call
+    synth._aligner.side_effect = align
+    utterance = "This is a test. This is another one. This is the last."
+    abandoned = synth.synthesize(utterance)
+    next(abandoned)
+    assert len(list(synth.synthesize(utterance))) == 9
+    assert max(overlaps) == 1
+
+
+@mock.patch("spokestack.tts.lite.TFLiteModel", new_callable=ModelFactory)
+def test_synthesize_stream(_mock, tmpdir):
+    with open(tmpdir / "lexicon.txt", "w") as file:
+        file.write(LEXICON)
+
+    with open(tmpdir / "metadata.json", "w") as file:
+        json.dump({"language": "en", "alphabet": list(ALPHABET)}, file)
+
+    synth = SpeechSynthesizer(tmpdir)
+
+    # audio for the first sentence is returned before the text is complete
+    received = []
+
+    def fragments():
+        for fragment in ["This is", " a test.", " This is", " another one."]:
+            received.append(fragment)
+            yield fragment
+
+    blocks = synth.synthesize_stream(fragments())
+    next(blocks)
+    assert received == ["This is", " a test."]
+    assert len(list(blocks)) == 5
+
+
+@mock.patch("spokestack.models.shape_cache.TFLiteModel")
+@mock.patch("spokestack.tts.lite.TFLiteModel", new_callable=ModelFactory)
+def test_shape_cache(_mock, mock_model, tmpdir):
+    with open(tmpdir / "lexicon.txt", "w") as file:
+        file.write(LEXICON)
+
+    with open(tmpdir / "metadata.json", "w") as file:
+        json.dump({"language": "en", "alphabet": list(ALPHABET)}, file)
+
+    # cached interpreters are built from the contents of their model file
+    factory = ModelFactory()
+    for name in ["align", "encode"]:
+        with open(tmpdir / f"{name}.tflite", "w") as file:
+            file.write(f"{name}.tflite")
+
+    def load(model_content, **kwargs):
+        model = factory(model_content.decode())
+        model.input_details = [{"index": 0, "shape": [1, 1]}]
+        return model
+
+    mock_model.side_effect = load
+
+    synth = SpeechSynthesizer(tmpdir, max_shapes=4)
+    blocks = list(synth.synthesize("I desert in the desert."))
+    assert len(blocks) == 3
+
+    # each model is resized once for the exact length of its input,
+    # without padding, and reused when the sentence is synthesized again
+    assert synth._aligner.stats["allocations"] == 1
+    assert synth._encoder.stats["allocations"] == 1
+    encoder = synth._encoder._model
+    encoder.resize.assert_called_once_with(0, [100, 256], strict=True)
+    blocks = list(synth.synthesize("I desert in the desert."))
+    assert len(blocks) == 3
+    assert synth._aligner.stats["allocations"] == 1
+    assert synth._encoder.stats["allocations"] == 1
+    assert synth._encoder.stats["calls"] == 2
@@ -0,0 +1,121 @@
+"""
+This module contains a local stand-in for the Spokestack text to speech API,
+which serves both the GraphQL endpoint and the synthesized audio, so that the
+client can be tested and benchmarked offline.
+"""
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any
+
+_METHODS = {
+    "text": "synthesizeText",
+    "ssml": "synthesizeSsml",
+    "markdown": "synthesizeMarkdown",
+}
+
+
+class MockServer:
+    """Local text to speech server
+
+    Args:
+        audio (bytes): audio returned for every utterance
+        connect_delay (float): delay added to each new connection (s), such
+                               as the cost of a TLS handshake
+        latency (float): delay added to each request (s)
+        failures (int): number of requests answered with a server error
+                        before the server starts responding normally
+    """
+
+    def __init__(
+        self,
+        audio: bytes = b"\xff\xf3" * 512,
+        connect_delay: float = 0.0,
+        latency: float = 0.0,
+        failures: int = 0,
+    ) -> None:
+        self.audio = audio
+        self.connect_delay = connect_delay
+        self.latency = latency
+        self.failures = failures
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), _handler(self))
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.01}
+        )
+        self._thread.daemon = True
+
+    @property
+    def url(self) -> str:
+        """ URL of the GraphQL endpoint """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "MockServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_args: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def _handler(server: MockServer) -> Any:
+    class Handler(BaseHTTPRequestHandler):
+        # keep connections open between requests, without delaying the
+        # body of a response behind the acknowledgement of its headers
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self) -> None:
+            super().setup()
+            with server._lock:
+                server.connections += 1
+            time.sleep(server.connect_delay)
+
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if self._fail():
+                return
+            mode = next(m for m in _METHODS if m in body["variables"])
+            url = server.url.rsplit("/", 1)[0] + "/audio"
+            response = {"data": {_METHODS[mode]: {"url": url}}}
+            self._send(json.dumps(response).encode("utf-8"), "application/json")
+
+        def do_GET(self) -> None:
+            if self._fail():
+                return
+            self._send(server.audio, "audio/mpeg")
+
+        def log_message(self, *_args: Any) -> None:
+            pass
+
+        def _fail(self) -> bool:
+            with server._lock:
+                server.requests += 1
+                failed = server.failures > 0
+                server.failures -= int(failed)
+            time.sleep(server.latency)
+            if failed:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            return failed
+
+        def _send(self, content: bytes, content_type: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    return Handler
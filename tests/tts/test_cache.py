@@ -0,0 +1,126 @@
+"""
+This module contains the tests for the text to speech audio cache
+"""
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from spokestack.tts.cache import CachedClient, hash_model
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        _ = CachedClient(mock.MagicMock(), max_bytes=-1)
+
+    with pytest.raises(ValueError):
+        _ = CachedClient(mock.MagicMock(), chunk_size=0)
+
+
+def test_memory():
+    client = mock.MagicMock()
+    client.synthesize.side_effect = lambda *args: iter(
+        [np.ones(100, np.int16), np.ones(50, np.int16)]
+    )
+    cache = CachedClient(client, max_bytes=600, chunk_size=100)
+
+    # misses pass the client's audio through
+    blocks = list(cache.synthesize("one"))
+    assert [len(block) for block in blocks] == [100, 50]
+    client.synthesize.assert_called_once_with("one", "text", "demo-male", "default")
+
+    # hits are served without the client
+    blocks = list(cache.synthesize("one"))
+    assert [len(block) for block in blocks] == [100, 50]
+    assert client.synthesize.call_count == 1
+
+    # the keys include the voice and profile
+    list(cache.synthesize("one", voice="other"))
+    assert client.synthesize.call_count == 2
+
+    # the least recently used audio is dropped to fit the budget
+    list(cache.synthesize("one"))
+    list(cache.synthesize("two"))
+    assert cache.stats == {
+        "hits": 2,
+        "disk_hits": 0,
+        "misses": 3,
+        "hit_rate": 0.4,
+        "entries": 2,
+        "bytes": 600,
+    }
+    list(cache.synthesize("one"))
+    assert client.synthesize.call_count == 3
+
+    # requests that are not read to the end are not cached
+    next(cache.synthesize("three"))
+    list(cache.synthesize("three"))
+    assert client.synthesize.call_count == 5
+
+    cache.clear()
+    assert cache.stats["entries"] == 0
+    assert cache.stats["bytes"] == 0
+
+
+def test_disk(tmp_path):
+    client = mock.MagicMock()
+    client.synthesize.side_effect = lambda utterance, *args: iter(
+        [utterance.encode(), b"-mp3"]
+    )
+    cache = CachedClient(client, cache_dir=str(tmp_path), chunk_size=4)
+    assert list(cache.synthesize("hello")) == [b"hello", b"-mp3"]
+    assert len(list(tmp_path.glob("*.mp3"))) == 1
+
+    # audio is read back from disk by a new cache, such as after a restart
+    cache = CachedClient(client, cache_dir=str(tmp_path), chunk_size=4)
+    assert list(cache.synthesize("hello")) == [b"hell", b"o-mp", b"3"]
+    assert cache.stats["disk_hits"] == 1
+    assert cache.stats["hits"] == 0
+
+    # and copied into memory on first access, counting against the budget
+    assert cache.stats["entries"] == 1
+    assert cache.stats["bytes"] == 9
+    assert list(cache.synthesize("hello")) == [b"hell", b"o-mp", b"3"]
+    assert client.synthesize.call_count == 1
+    assert cache.stats["disk_hits"] == 1
+    assert cache.stats["hits"] == 1
+
+    # PCM audio is stored as arrays
+    client.synthesize.side_effect = lambda *args: iter([np.arange(5, dtype=np.int16)])
+    list(cache.synthesize("pcm", profile="pcm"))
+    cache = CachedClient(client, cache_dir=str(tmp_path), max_bytes=0)
+    blocks = list(cache.synthesize("pcm", profile="pcm"))
+    assert np.all(np.concatenate(blocks) == np.arange(5))
+    assert isinstance(blocks[0], np.memmap)
+
+    # audio that does not fit is played from disk, and not counted
+    assert cache.stats["entries"] == 0
+    assert cache.stats["bytes"] == 0
+
+
+def test_warm(tmp_path):
+    client = mock.MagicMock()
+    client.synthesize.side_effect = lambda *args: iter([b"mp3"])
+    cache = CachedClient(client, cache_dir=str(tmp_path))
+    assert cache.warm(["one", "two"]) == 2
+    assert cache.warm(["one", "two", "three"]) == 1
+    assert client.synthesize.call_count == 3
+
+    list(cache.synthesize("two"))
+    assert cache.stats["hit_rate"] == 1.0
+    assert client.synthesize.call_count == 3
+
+    # the model hash separates the audio of different models
+    cache = CachedClient(client, cache_dir=str(tmp_path), model_hash="other")
+    assert cache.warm(["one"]) == 1
+
+
+def test_hash_model(tmp_path):
+    (tmp_path / "encode.tflite").write_bytes(b"encode")
+    (tmp_path / "decode.tflite").write_bytes(b"decode")
+    digest = hash_model(str(tmp_path))
+    assert digest == hash_model(str(tmp_path))
+    assert hash_model(str(tmp_path / "encode.tflite")) != digest
+
+    (tmp_path / "decode.tflite").write_bytes(b"changed")
+    assert hash_model(str(tmp_path)) != digest
@@ -1,12 +1,20 @@
 """
 This module contains the tests for the spokestack text to speech manager
 """
+import threading
+import time
+
 import pytest
 from unittest import mock
 
 import numpy as np
 
-from spokestack.tts.manager import SequenceIO, TextToSpeechManager, FORMAT_PCM16
+from spokestack.tts.manager import (
+    FORMAT_PCM16,
+    JitterBuffer,
+    SequenceIO,
+    TextToSpeechManager,
+)
 
 
 def test_invalid():
@@ -57,3 +65,163 @@ def test_sequence_io():
         stream.read()
     # read after StopIteration
     stream.read()
+
+
+def test_synthesize_stream():
+    audio = np.zeros(16000, np.int16)
+    output = mock.MagicMock()
+
+    # clients without a streaming interface synthesize each sentence
+    client = mock.MagicMock(spec=["synthesize"])
+    client.synthesize.return_value = [audio]
+    manager = TextToSpeechManager(client, output, format_=FORMAT_PCM16)
+    assert manager.time_to_first_audio is None
+    manager.synthesize_stream(["Hello", " there. How", " are you?"])
+    assert [c[0][0] for c in client.synthesize.call_args_list] == [
+        "Hello there. ",
+        "How are you?",
+    ]
+    assert output.write.call_count == 2
+    assert manager.time_to_first_audio >= 0.0
+
+    # streaming clients receive the sentences as they are completed
+    client = mock.MagicMock()
+    sentences = []
+
+    def synthesize_stream(stream, *args):
+        for sentence in stream:
+            sentences.append(sentence)
+            yield audio
+
+    client.synthesize_stream.side_effect = synthesize_stream
+    manager = TextToSpeechManager(client, output, format_=FORMAT_PCM16)
+    manager.synthesize_stream(iter(["One. Two", ". "]))
+    assert sentences == ["One. ", "Two. "]
+    assert manager.time_to_first_audio >= 0.0
+
+    # markup is synthesized as a single utterance
+    manager.synthesize_stream(["<speak>One. ", "Two.</speak>"], mode="ssml")
+    client.synthesize.assert_called_once_with(
+        "<speak>One. Two.</speak>", "ssml", "demo-male", "default"
+    )
+
+
+def test_jitter_buffer():
+    with pytest.raises(ValueError):
+        JitterBuffer(0)
+
+    with pytest.raises(ValueError):
+        JitterBuffer(10, preroll_bytes=11)
+
+    # the decoder waits while the buffer is full
+    buffer = JitterBuffer(4)
+    assert buffer.put(b"1234")
+    putter = threading.Thread(target=buffer.put, args=(b"5678",))
+    putter.start()
+    putter.join(timeout=0.05)
+    assert putter.is_alive()
+    assert buffer.get() == b"1234"
+    putter.join()
+    assert buffer.get() == b"5678"
+
+    # the end of the stream releases playback
+    buffer.close()
+    assert buffer.get() is None
+
+    # the decoder is released when playback stops
+    buffer.reset()
+    assert buffer.put(b"1234")
+    buffer.stop()
+    assert not buffer.put(b"5678")
+
+    stats = buffer.stats
+    assert stats["buffer_bytes"] == 4
+    assert stats["fill_bytes"] == 4
+    assert stats["peak_fill_bytes"] == 4
+    assert stats["mean_fill_bytes"] == 4.0
+    assert stats["underruns"] == 0
+
+
+def test_synthesize_buffered():
+    frames = [np.full(100, i, np.int16) for i in range(4)]
+    events = []
+
+    def stream(*args):
+        for i, frame in enumerate(frames):
+            events.append(f"decoded {i}")
+            yield frame
+
+    client = mock.MagicMock()
+    client.synthesize.side_effect = stream
+    output = mock.MagicMock()
+    output.write.side_effect = lambda audio: events.append("write")
+
+    # playback starts once the preroll has been decoded
+    manager = TextToSpeechManager(
+        client, output, format_=FORMAT_PCM16, buffer_bytes=800, preroll_bytes=400
+    )
+    manager.synthesize("test utterance")
+    assert events.index("write") > events.index("decoded 1")
+    written = [c[0][0] for c in output.write.call_args_list]
+    assert written == [frame.tobytes() for frame in frames]
+
+    stats = manager.playback_stats
+    assert stats["underruns"] == 0
+    assert stats["fill_bytes"] == 0
+    assert 400 <= stats["peak_fill_bytes"] <= 800
+    assert stats["mean_fill_bytes"] > 0
+
+    # unbuffered managers have no playback statistics
+    assert TextToSpeechManager(client, output).playback_stats is None
+
+
+def test_synthesize_underrun():
+    def stream(*args):
+        yield np.zeros(100, np.int16)
+        time.sleep(0.05)
+        yield np.zeros(100, np.int16)
+
+    client = mock.MagicMock()
+    client.synthesize.side_effect = stream
+    output = mock.MagicMock()
+    manager = TextToSpeechManager(
+        client, output, format_=FORMAT_PCM16, buffer_bytes=1000
+    )
+
+    # playback that catches up with a stalled stream counts an underrun
+    manager.synthesize("test utterance")
+    assert output.write.call_count == 2
+    assert manager.playback_stats["underruns"] == 1
+    assert manager.playback_stats["underrun_time"] > 0.0
+
+    # statistics accumulate over utterances
+    manager.synthesize("test utterance")
+    assert manager.playback_stats["underruns"] == 2
+
+
+def test_synthesize_buffered_errors():
+    def stream(*args):
+        yield np.zeros(100, np.int16)
+        raise RuntimeError("network")
+
+    client = mock.MagicMock()
+    client.synthesize.side_effect = stream
+    output = mock.MagicMock()
+    manager = TextToSpeechManager(
+        client, output, format_=FORMAT_PCM16, buffer_bytes=1000
+    )
+
+    # decoding errors are raised once the buffered audio has played
+    with pytest.raises(RuntimeError):
+        manager.synthesize("test utterance")
+    assert output.write.call_count == 1
+
+    # the decoder is stopped when playback fails
+    client.synthesize.side_effect = lambda *args: iter([np.zeros(100, np.int16)] * 100)
+    output.write.side_effect = IOError("closed")
+    manager = TextToSpeechManager(
+        client, output, format_=FORMAT_PCM16, buffer_bytes=400
+    )
+    with pytest.raises(IOError):
+        manager.synthesize("test utterance")
+    assert manager.playback_stats["peak_fill_bytes"] <= 400
@@ -0,0 +1,72 @@
+"""
+This module contains the tests for the text to speech text helpers
+"""
+from spokestack.tts.text import split_sentences
+
+
+def test_split_sentences():
+    # sentences are returned once their terminal punctuation arrives,
+    # before the next fragment is read
+    received = []
+
+    def fragments():
+        for fragment in ["Hello", " there", ".", " How are", " you?", " Fine!\n"]:
+            received.append(fragment)
+            yield fragment
+        received.append("Bye")
+        yield "Bye"
+
+    sentences = split_sentences(fragments())
+    assert next(sentences) == "Hello there."
+    assert received[-1] == "."
+    assert next(sentences) == " How are you?"
+    assert received[-1] == " you?"
+    assert next(sentences) == " Fine!\n"
+    assert received[-1] == " Fine!\n"
+    assert next(sentences) == "Bye"
+    assert list(sentences) == []
+
+    # decimals split across fragments are kept together
+    assert list(split_sentences(["It costs 3.", "5 dollars."])) == [
+        "It costs 3.5 dollars."
+    ]
+    assert list(split_sentences(["It costs 3.", " Then"])) == [
+        "It costs 3. ",
+        "Then",
+    ]
+
+    # closing quotes and line breaks end sentences
+    assert list(split_sentences(['She said "hi." Then', " left\n\nOk"])) == [
+        'She said "hi." ',
+        "Then left\n\n",
+        "Ok",
+    ]
+
+    # whitespace alone is not a sentence
+    assert list(split_sentences(["Done.\n", "  "])) == ["Done.\n"]
+    assert list(split_sentences([])) == []
+
+
+def test_split_sentences_abbreviations():
+    # abbreviations and initials do not end sentences
+    fragments = ["Dr.", " Smith and Mr. J.", " Doe", " are in. Ask", " them."]
+    assert list(split_sentences(fragments)) == [
+        "Dr. Smith and Mr. J. Doe are in. ",
+        "Ask them.",
+    ]
+
+    # including abbreviations followed by a lowercase word
+    assert list(split_sentences(["Bring a snack, e.g. this one. Thanks."])) == [
+        "Bring a snack, e.g. this one. ",
+        "Thanks.",
+    ]
+
+    # or at the end of a fragment
+    assert list(split_sentences(["Ask Dr.", " Smith"])) == ["Ask Dr. Smith"]
+
+    # a sentence may start with an opening quote or a digit
+    assert list(split_sentences(['It is late. "Go', ' home." 3 left.'])) == [
+        "It is late. ",
+        '"Go home." ',
+        "3 left.",
+    ]
@@ -8,6 +8,7 @@ import pytest
 from requests import Response
 
 from spokestack.tts.clients.spokestack import TextToSpeechClient, TTSError
+from tests.tts.server import MockServer
 
 
 def test_graphql():
@@ -26,56 +27,56 @@ def test_synthesize_text():
     client = TextToSpeechClient("", "", "")
 
     test = np.ones(160).tobytes()
-    with mock.patch("spokestack.tts.clients.spokestack.requests") as patched:
+    with mock.patch.object(client, "_session") as patched:
         mock_iterable = mock.MagicMock(
-            spec=Response().iter_content(), return_value=test
+            spec=Response().iter_content(), return_value=[test]
         )
         patched.post.return_value = MockResponse(status_code=200)
         patched.get.return_value = mock.Mock(
             iter_content=mock_iterable, status_code=200
         )
         response = client.synthesize("test utterance")
-        assert response == test
+        assert list(response) == [test]
         response = client.synthesize("test utterance", profile="alexa")
-        assert response == test
+        assert list(response) == [test]
 
 
 def test_synthesize_ssml():
     client = TextToSpeechClient("", "", "")
 
     test = np.ones(160).tobytes()
-    with mock.patch("spokestack.tts.clients.spokestack.requests") as patched:
+    with mock.patch.object(client, "_session") as patched:
         mock_iterable = mock.MagicMock(
-            spec=Response().iter_content(), return_value=test
+            spec=Response().iter_content(), return_value=[test]
         )
         patched.post.return_value = MockResponse(status_code=200)
         patched.get.return_value = mock.Mock(
             iter_content=mock_iterable, status_code=200
         )
         response = client.synthesize("<speak> test utterance </speak>", mode="ssml")
-        assert response == test
+        assert list(response) == [test]
 
 
 def test_synthesize_markdown():
     client = TextToSpeechClient("", "", "")
 
     test = np.ones(160).tobytes()
-    with mock.patch("spokestack.tts.clients.spokestack.requests") as patched:
+    with mock.patch.object(client, "_session") as patched:
         mock_iterable = mock.MagicMock(
-            spec=Response().iter_content(), return_value=test
+            spec=Response().iter_content(), return_value=[test]
         )
         patched.post.return_value = MockResponse(status_code=200)
         patched.get.return_value = mock.Mock(
             iter_content=mock_iterable, status_code=200
         )
         response = client.synthesize("# test utterance", mode="markdown")
-        assert response == test
+        assert list(response) == [test]
 
 
 def test_synthesize_url():
     client = TextToSpeechClient("", "", "")
 
-    with mock.patch("spokestack.tts.clients.spokestack.requests") as patched:
+    with mock.patch.object(client, "_session") as patched:
         mock_url = "https://test"
         patched.post.return_value = MockResponse(
             status_code=200,
@@ -89,7 +90,7 @@ def test_synthesize_invalid_mode():
     client = TextToSpeechClient("", "", "")
 
     test = np.ones(160).tobytes()
-    with mock.patch("spokestack.tts.clients.spokestack.requests") as patched:
+    with mock.patch.object(client, "_session") as patched:
         patched.get.return_value = mock.Mock(content=test)
         with pytest.raises(ValueError):
             _ = client.synthesize("test utterance", mode="python")
@@ -98,7 +99,7 @@ def test_synthesize_invalid_mode():
 def test_error_response():
     client = TextToSpeechClient("", "", "")
 
-    with mock.patch("spokestack.tts.clients.spokestack.requests") as patched:
+    with mock.patch.object(client, "_session") as patched:
         patched.post.return_value = MockResponse(
             status_code=200,
             return_value={
@@ -117,10 +118,27 @@ def test_error_response():
             _ = client.synthesize("utterance")
 
 
+def test_synthesize_closed():
+    client = TextToSpeechClient("", "", "")
+
+    with mock.patch.object(client, "_session") as patched:
+        patched.post.return_value = MockResponse(status_code=200)
+        response = mock.Mock(status_code=200)
+        response.iter_content.return_value = iter([b"one", b"two"])
+        patched.get.return_value = response
+
+        # the response is closed when the audio is not read to the end
+        stream = client.synthesize("test utterance")
+        assert next(stream) == b"one"
+        response.close.assert_not_called()
+        stream.close()
+        response.close.assert_called_once()
+
+
 def test_post_http_error():
     client = TextToSpeechClient("", "", "")
 
-    with mock.patch("spokestack.tts.clients.spokestack.requests") as patched:
+    with mock.patch.object(client, "_session") as patched:
         patched.post.return_value = MockResponse(status_code=201)
         with pytest.raises(Exception):
             _ = client.synthesize("utterance")
@@ -129,11 +147,108 @@ def test_post_http_error():
 def test_get_http_error():
     client = TextToSpeechClient("", "", "")
 
-    with mock.patch("spokestack.tts.clients.spokestack.requests") as patched:
+    with mock.patch.object(client, "_session") as patched:
         patched.post.return_value = MockResponse(status_code=200)
         patched.get.return_value = MockResponse(status_code=201)
         with pytest.raises(Exception):
             _ = client.synthesize("utterance")
+        patched.get.return_value.close.assert_called_once()
+
+
+def test_pooled_connections():
+    with MockServer() as server:
+        client = TextToSpeechClient("id", "secret", server.url)
+        for _ in range(3):
+            audio = b"".join(client.synthesize("test utterance"))
+            assert audio == server.audio
+
+        # the api and audio requests share a single kept-alive connection
+        assert server.requests == 6
+        assert server.connections == 1
+        client.close()
+
+    with MockServer() as server:
+        client = TextToSpeechClient("id", "secret", server.url, keep_alive=False)
+        for _ in range(3):
+            b"".join(client.synthesize("test utterance"))
+        assert server.connections == 6
+
+
+def test_retry():
+    # server errors are retried with backoff
+    with MockServer(failures=2) as server:
+        client = TextToSpeechClient("id", "secret", server.url, backoff_factor=0)
+        audio = b"".join(client.synthesize("test utterance", mode="ssml"))
+        assert audio == server.audio
+        assert server.requests == 4
+
+    # the error is raised once the retries are exhausted
+    with MockServer(failures=3) as server:
+        client = TextToSpeechClient(
+            "id", "secret", server.url, max_retries=1, backoff_factor=0
+        )
+        with pytest.raises(Exception):
+            _ = client.synthesize("test utterance")
+        assert server.requests == 2
+
+
+def test_timeout():
+    with MockServer(latency=0.5) as server:
+        client = TextToSpeechClient(
+            "id", "secret", server.url, timeout=0.05, max_retries=0
+        )
+        with pytest.raises(Exception):
+            _ = client.synthesize("test utterance")
+
+
+def test_synthesize_many(tmp_path):
+    with MockServer() as server:
+        client = TextToSpeechClient("id", "secret", server.url)
+        with pytest.raises(ValueError):
+            _ = list(client.synthesize_many(["test"], concurrency=0))
+
+        # results are returned for every utterance, as they finish
+        utterances = [f"utterance {i}" for i in range(10)]
+        results = list(client.synthesize_many(iter(utterances), concurrency=4))
+        assert sorted(r.index for r in results) == list(range(10))
+        for result in results:
+            assert result.utterance == utterances[result.index]
+            assert result.audio == server.audio
+            assert result.path is None
+            assert result.error is None
+        assert server.requests == 20
+
+        # audio can be written straight to files
+        results = list(
+            client.synthesize_many(
+                utterances[:3], concurrency=2, output_dir=str(tmp_path / "audio")
+            )
+        )
+        for result in results:
+            assert result.audio is None
+            assert result.path == str(tmp_path / "audio" / f"{result.index}.mp3")
+            with open(result.path, "rb") as file:
+                assert file.read() == server.audio
+        assert sorted(p.name for p in (tmp_path / "audio").iterdir()) == [
+            "0.mp3",
+            "1.mp3",
+            "2.mp3",
+        ]
+
+    # a failed utterance does not stop the others
+    with MockServer(failures=1) as server:
+        client = TextToSpeechClient("id", "secret", server.url, max_retries=0)
+        results = list(
+            client.synthesize_many(
+                ["first", "second"], concurrency=1, output_dir=str(tmp_path)
+            )
+        )
+        assert [r.index for r in results] == [0, 1]
+        assert results[0].error is not None
+        assert results[0].path is None
+        assert results[1].error is None
+        assert not (tmp_path / "0.mp3").exists()
+        assert (tmp_path / "1.mp3").exists()
 
 
 class MockResponse(mock.MagicMock):
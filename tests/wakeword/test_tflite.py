@@ -7,16 +7,18 @@ import numpy as np
 import pytest
 
 from spokestack.context import SpeechContext
+from spokestack.models.filterbank import MelFilterbank
 from spokestack.wakeword.tflite import WakewordTrigger
 
 
 class ModelFactory(mock.MagicMock):
-    def __call__(self, model_path):
+    def __call__(self, model_path, **kwargs):
         model = mock.MagicMock()
         if model_path.endswith("filter.tflite"):
             model.input_details = [{"shape": [1, 257]}]
             model.output_details = [{"shape": [1, 40]}]
             model.return_value = [np.zeros((1, 40))]
+            model.batch.side_effect = lambda inputs: np.zeros((len(inputs), 40))
         elif model_path.endswith("encode.tflite"):
             model.input_details = [{"shape": [1, 1, 40]}, {"shape": [1, 128]}]
             model.output_details = [{"shape": [1, 128]}, {"shape": [1, 128]}]
@@ -28,6 +30,18 @@ class ModelFactory(mock.MagicMock):
         return model
 
 
+class TensorModel:
+    # model exposing the tensor buffer interface, which records its inputs
+    def __init__(self, model):
+        self.model = model
+        self.input_details = model.input_details
+        self.inputs = []
+
+    def run(self, *args):
+        self.inputs.append([np.array(arg) for arg in args])
+        return self.model(np.expand_dims(args[0], 0), *args[1:])
+
+
 @mock.patch("spokestack.wakeword.tflite.TFLiteModel", new_callable=ModelFactory)
 def test_invalid_args(_mock):
     with pytest.raises(ValueError):
@@ -131,3 +145,150 @@ def test_detect_manual_min_delay(_mock):
     detector(context, test_frame)
 
     assert context.is_active
+
+
+@mock.patch("spokestack.wakeword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_clone(_mock):
+    detector = WakewordTrigger(model_dir="wakeword_model")
+    clone = detector.clone()
+
+    # models are shared, per-stream state is not
+    assert clone.filter_model is detector.filter_model
+    assert clone.encode_model is detector.encode_model
+    assert clone.detect_model is detector.detect_model
+    assert clone.state is not detector.state
+    assert clone.stft is not detector.stft
+    assert clone.frame_window is not detector.frame_window
+    assert clone.encode_window is not detector.encode_window
+
+    context = SpeechContext()
+    context.is_speech = True
+    clone(context, np.random.rand(512).astype(np.float32))
+    assert not detector.stft.magnitude().size
+    assert clone.stft.magnitude().shape == (1, 257)
+
+
+@mock.patch("spokestack.wakeword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_batch_filter(_mock):
+    context = SpeechContext()
+    context.is_speech = True
+    detector = WakewordTrigger(model_dir="wakeword_model")
+
+    # every hop completed by a frame is filtered in a single batch
+    for _ in range(3):
+        detector(context, np.random.rand(320).astype(np.float32))
+    batches = [len(c.args[0]) for c in detector.filter_model.batch.call_args_list]
+    assert batches == [1, 2]
+    assert detector.encode_model.call_count == 3
+
+
+@mock.patch("spokestack.wakeword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_filter_type(_mock, tmp_path):
+    with pytest.raises(ValueError):
+        _ = WakewordTrigger(filter_type="invalid")
+
+    # the numpy filterbank is loaded from its sidecar file
+    np.save(str(tmp_path / "filter.npy"), np.ones((257, 40), np.float32))
+    detector = WakewordTrigger(model_dir=str(tmp_path), filter_type="numpy")
+    assert isinstance(detector.filter_model, MelFilterbank)
+    assert detector.filter_model.batch(np.ones((2, 257))).shape == (2, 40)
+
+
+@mock.patch("spokestack.wakeword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_detect_stride(_mock):
+    with pytest.raises(ValueError):
+        _ = WakewordTrigger(detect_stride=0)
+
+    context = SpeechContext()
+    context.is_speech = True
+    detector = WakewordTrigger(model_dir="wakeword_model", detect_stride=3)
+
+    # the first window completes 1 hop, and each later frame completes 2
+    detector(context, np.random.rand(512).astype(np.float32))
+    for _ in range(3):
+        detector(context, np.random.rand(320).astype(np.float32))
+    assert detector.encode_model.call_count == 7
+    assert detector.detect_model.call_count == 2
+
+    # the stride restarts after a reset
+    detector.reset()
+    detector(context, np.random.rand(512).astype(np.float32))
+    detector(context, np.random.rand(320).astype(np.float32))
+    assert detector.detect_model.call_count == 3
+
+
+@mock.patch("spokestack.wakeword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_posterior_smoothing(_mock):
+    with pytest.raises(ValueError):
+        _ = WakewordTrigger(posterior_window=0)
+    with pytest.raises(ValueError):
+        _ = WakewordTrigger(posterior_smoothing="median")
+
+    # a single spike is averaged below the threshold
+    context = SpeechContext()
+    context.is_speech = True
+    detector = WakewordTrigger(model_dir="wakeword_model", posterior_window=3)
+    posteriors = iter([0.9, 0.2, 0.2, 0.8, 0.8])
+    detector.detect_model.side_effect = lambda _: [np.full((1, 1), next(posteriors))]
+    detector(context, np.random.rand(992).astype(np.float32))
+    assert not context.is_active
+
+    # a sustained posterior crosses the threshold
+    detector(context, np.random.rand(160).astype(np.float32))
+    assert context.is_active
+    assert np.isclose(detector._posterior_max, 0.6)
+
+    # the maximum responds to a single spike
+    context = SpeechContext()
+    context.is_speech = True
+    detector = WakewordTrigger(
+        model_dir="wakeword_model", posterior_window=3, posterior_smoothing="max"
+    )
+    posteriors = iter([0.9, 0.2])
+    detector.detect_model.side_effect = lambda _: [np.full((1, 1), next(posteriors))]
+    for _ in range(4):
+        detector(context, np.random.rand(128).astype(np.float32))
+    assert context.is_active
+
+
+@mock.patch("spokestack.wakeword.tflite.TFLiteModel", new_callable=ModelFactory)
+def test_tensor_models(_mock):
+    context = SpeechContext()
+    context.is_speech = True
+    detector = WakewordTrigger(model_dir="wakeword_model")
+    encode_model = detector.encode_model
+    encode_model.return_value = [np.ones((1, 128)), np.full((1, 128), 2.0)]
+    detector.detect_model.return_value[0][:] = 0.6
+    detector.encode_model = TensorModel(detector.encode_model)
+    detector.detect_model = TensorModel(detector.detect_model)
+
+    # the windows and state are passed without the batch dimension,
+    # and the state is updated in place
+    state = detector.state
+    detector(context, np.random.rand(512).astype(np.float32))
+    assert detector.state is state
+    assert np.all(state == 2.0)
+    assert detector.encode_model.inputs[0][0].shape == (1, 40)
+    assert detector.detect_model.inputs[0][0].shape == (100, 128)
+    assert np.all(detector.detect_model.inputs[0][0][-1] == 1.0)
+    assert context.is_active
+
+
+def test_registry():
+    registry = mock.MagicMock()
+    registry.acquire.side_effect = ModelFactory()
+    detector = WakewordTrigger(
+        model_dir="wakeword_model", registry=registry, num_threads=2
+    )
+    assert registry.acquire.call_count == 3
+    registry.acquire.assert_called_with(
+        model_path="wakeword_model/detect.tflite", num_threads=2, delegates=None
+    )
+
+    # clones borrow the models, and the original releases them
+    detector.clone().close()
+    registry.release.assert_not_called()
+    detector.close()
+    assert registry.release.call_count == 3
+    detector.close()
+    assert registry.release.call_count == 3
@@ -0,0 +1,61 @@
+"""
+Benchmark for the mel filter implementations.
+
+This script loads ``filter.tflite`` from a wakeword or keyword model, extracts
+its filterbank weights, and times the projection of the spectra produced by
+a single audio frame through the interpreter, one hop per invocation and as a
+single batch, and through the NumPy filterbank. It also reports the largest
+difference between the interpreter and filterbank outputs, and optionally
+saves the weights as the ``filter.npy`` sidecar read by ``filter_type="numpy"``.
+
+Usage::
+
+    python -m tools.benchmark_filter --model-dir path_to_wakeword_model
+
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+from spokestack.models.filterbank import MelFilterbank
+from spokestack.models.tensorflow import TFLiteModel
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--model-dir", required=True)
+    parser.add_argument("--hops", type=int, default=2, help="STFT hops per frame")
+    parser.add_argument("--frames", type=int, default=10000)
+    parser.add_argument("--save", action="store_true", help="write filter.npy")
+    args = parser.parse_args()
+
+    path = os.path.join(args.model_dir, "filter.tflite")
+    per_hop = TFLiteModel(model_path=path)
+    batched = TFLiteModel(model_path=path)
+    filterbank = MelFilterbank.from_model(per_hop)
+
+    bins = filterbank.input_details[0]["shape"][-1]
+    spectra = np.random.rand(args.hops, bins).astype(np.float32)
+
+    expected = np.concatenate([per_hop(s[None])[0] for s in spectra])
+    error = np.abs(filterbank.batch(spectra) - expected).max()
+    sys.stdout.write(f"max abs difference: {error:.2e}\n\n")
+
+    sys.stdout.write(f"{'filter':<12} {'per frame':>12}\n")
+    for name, run in [
+        ("per hop", lambda: [per_hop(s[None]) for s in spectra]),
+        ("batched", lambda: batched.batch(spectra)),
+        ("numpy", lambda: filterbank.batch(spectra)),
+    ]:
+        elapsed = timeit.timeit(run, number=args.frames)
+        sys.stdout.write(f"{name:<12} {elapsed / args.frames * 1e6:>10.1f}us\n")
+
+    if args.save:
+        filterbank.save(os.path.join(args.model_dir, "filter.npy"))
+
+
+if __name__ == "__main__":
+    main()
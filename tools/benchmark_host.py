@@ -0,0 +1,117 @@
+"""
+Benchmark for the multi-stream pipeline host.
+
+This script adds a number of synthetic streams to a single
+:class:`~spokestack.host.SpeechPipelineHost` running VAD, a shared wakeword
+model, and an activation timeout, then reports the CPU cost of processing
+them along with the memory allocated for each additional stream.
+
+Usage::
+
+    python -m tools.benchmark_host --model-dir path_to_wakeword_model
+
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, List
+
+import numpy as np
+
+from spokestack.activation_timeout import ActivationTimeout
+from spokestack.host import SpeechPipelineHost
+from spokestack.vad.webrtc import VoiceActivityDetector
+from spokestack.wakeword.tflite import WakewordTrigger
+
+
+class NoiseInput:
+    """Input source that cycles through pre-generated PCM-16 noise
+
+    Args:
+        sample_rate (int): sample rate of the audio (Hz)
+        frame_width (int): width of the audio frame (ms)
+        seconds (float): length of the generated audio (s)
+    """
+
+    def __init__(self, sample_rate: int, frame_width: int, seconds: float) -> None:
+        frame_size = sample_rate * frame_width // 1000
+        count = max(1, int(seconds * 1000 / frame_width))
+        audio = np.random.normal(scale=3000, size=count * frame_size)
+        self._frames = audio.astype(np.int16).reshape(count, frame_size)
+        self._index = 0
+
+    def read(self) -> np.ndarray:
+        frame = self._frames[self._index].copy()
+        self._index = (self._index + 1) % len(self._frames)
+        return frame
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def stage_factory(
+    model_dir: str, sample_rate: int, frame_width: int
+) -> Callable[[], List[Any]]:
+    wakeword = WakewordTrigger(model_dir=model_dir, sample_rate=sample_rate)
+
+    def create() -> List[Any]:
+        return [
+            VoiceActivityDetector(sample_rate=sample_rate, frame_width=frame_width),
+            wakeword.clone(),
+            ActivationTimeout(frame_width=frame_width),
+        ]
+
+    return create
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--model-dir", required=True)
+    parser.add_argument("--streams", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--frame-width", type=int, default=20)
+    args = parser.parse_args()
+
+    host = SpeechPipelineHost(
+        stage_factory(args.model_dir, args.sample_rate, args.frame_width)
+    )
+
+    # measure the memory allocated by each stream added to the host
+    inputs = [
+        NoiseInput(args.sample_rate, args.frame_width, 1.0) for _ in range(args.streams)
+    ]
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i, input_source in enumerate(inputs):
+        host.add(i, input_source)
+    per_stream = (tracemalloc.get_traced_memory()[0] - baseline) / args.streams
+    tracemalloc.stop()
+
+    steps = int(args.seconds * 1000 / args.frame_width)
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for _ in range(steps):
+        host.step()
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    host.close()
+
+    audio = args.streams * args.seconds
+    sys.stdout.write(f"streams:          {args.streams}\n")
+    sys.stdout.write(f"audio processed:  {audio:.1f}s\n")
+    sys.stdout.write(f"cpu time:         {cpu:.2f}s\n")
+    sys.stdout.write(f"wall time:        {wall:.2f}s\n")
+    sys.stdout.write(f"memory/stream:    {per_stream / 1024:.1f}KiB\n")
+    sys.stdout.write(f"streams per core: {audio / cpu:.1f}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark for ring buffer window reads.
+
+This script times the windowed write and ``read_all`` pattern used by the
+wakeword and keyword detectors for each STFT hop, for the sample, frame and
+encode windows, using both the copying and the mirrored ring buffers. It
+then times filling the sample window with a frame of audio, one sample at a
+time and through :meth:`~spokestack.ring_buffer.RingBuffer.windows`.
+
+Usage::
+
+    python -m tools.benchmark_ring_buffer
+
+"""
+import argparse
+import sys
+import timeit
+from typing import Any, List
+
+import numpy as np
+
+from spokestack.ring_buffer import MirroredRingBuffer, RingBuffer
+
+# window shapes typical of the wakeword models
+WINDOWS = {
+    "sample": [512],
+    "frame": [12, 40],
+    "encode": [100, 128],
+}
+
+
+def hop(buffer: RingBuffer, item: np.ndarray) -> Any:
+    buffer.rewind().seek(1)
+    buffer.write(item)
+    return buffer.read_all()
+
+
+def sample_loop(buffer: RingBuffer, frame: np.ndarray, hop_length: int) -> None:
+    for sample in frame:
+        buffer.write(sample)
+        if buffer.is_full:
+            buffer.read_all()
+            buffer.rewind().seek(hop_length)
+
+
+def sample_windows(buffer: RingBuffer, frame: np.ndarray, hop_length: int) -> None:
+    for _ in buffer.windows(frame, hop_length):
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--hops", type=int, default=10000)
+    args = parser.parse_args()
+
+    sys.stdout.write(f"{'window':<8} {'copying':>12} {'mirrored':>12} {'speedup':>8}\n")
+    for name, shape in WINDOWS.items():
+        times: List[float] = []
+        for buffer_type in [RingBuffer, MirroredRingBuffer]:
+            buffer = buffer_type(shape=list(shape))
+            buffer.fill(0.0)
+            item = np.ones(shape[1:], np.float32)
+            elapsed = timeit.timeit(lambda: hop(buffer, item), number=args.hops)
+            times.append(elapsed / args.hops * 1e6)
+        sys.stdout.write(
+            f"{name:<8} {times[0]:>10.1f}us {times[1]:>10.1f}us "
+            f"{times[0] / times[1]:>7.1f}x\n"
+        )
+
+    # one 20ms frame at 16kHz with a 10ms hop
+    frame = np.random.rand(320).astype(np.float32)
+    frames = args.hops // 10
+    sys.stdout.write(f"\n{'frame':<8} {'loop':>12} {'windows':>12} {'speedup':>8}\n")
+    times = []
+    for fill in [sample_loop, sample_windows]:
+        buffer = MirroredRingBuffer(shape=list(WINDOWS["sample"]))
+        elapsed = timeit.timeit(lambda: fill(buffer, frame, 160), number=frames)
+        times.append(elapsed / frames * 1e6)
+    sys.stdout.write(
+        f"{'sample':<8} {times[0]:>10.1f}us {times[1]:>10.1f}us "
+        f"{times[0] / times[1]:>7.1f}x\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark for shape-cached TTS interpreters.
+
+This script synthesizes a set of sentences of varying length with a
+:class:`~spokestack.tts.lite.SpeechSynthesizer`, first resizing the aligner
+and encoder for each sentence and then with an interpreter cached per input
+length, and reports the time to first audio for each. Each sentence is
+synthesized several times so that the cached runs reach a steady state, in
+which every length has an allocated interpreter. Inputs are never padded, so
+the audio produced by the two modes is also checked to be identical.
+
+Usage::
+
+    python -m tools.benchmark_shape_cache --model-dir path_to_tts_model \\
+        --max-shapes 8
+
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from spokestack.tts.lite import SpeechSynthesizer
+
+SENTENCES = [
+    "Hi.",
+    "What time is it?",
+    "The weather today is mostly sunny.",
+    "Turn left in two hundred feet, then continue straight for a mile.",
+    "Your order has shipped and should arrive within three to five business "
+    "days, depending on your location.",
+]
+
+
+def run(
+    model_dir: str, max_shapes: Optional[int], repeats: int
+) -> Tuple[List[float], List[np.ndarray]]:
+    synth = SpeechSynthesizer(model_dir, max_shapes=max_shapes)
+    latencies = []
+    audio = []
+    for _ in range(repeats):
+        for sentence in SENTENCES:
+            start = time.perf_counter()
+            blocks = synth.synthesize(sentence)
+            first = next(blocks)
+            latencies.append(time.perf_counter() - start)
+            audio.append(np.concatenate([first] + list(blocks)))
+    return latencies, audio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--model-dir", required=True)
+    parser.add_argument("--max-shapes", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline, expected = run(args.model_dir, None, args.repeats)
+    cached, actual = run(args.model_dir, args.max_shapes, args.repeats)
+
+    sys.stdout.write(f"{'mode':<12} {'mean':>9} {'p50':>9} {'p95':>9}\n")
+    for name, latencies in [("resize", baseline), ("cached", cached)]:
+        ms = np.array(latencies) * 1000
+        sys.stdout.write(
+            f"{name:<12} {ms.mean():>7.2f}ms {np.percentile(ms, 50):>7.2f}ms "
+            f"{np.percentile(ms, 95):>7.2f}ms\n"
+        )
+
+    identical = all(np.array_equal(a, b) for a, b in zip(actual, expected))
+    sys.stdout.write(f"identical audio: {identical}\n")
+
+
+if __name__ == "__main__":
+    main()
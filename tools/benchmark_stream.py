@@ -0,0 +1,95 @@
+"""
+Benchmark for incremental text to speech.
+
+This script simulates a dialogue system that produces its response one word
+at a time, and plays the response through a
+:class:`~spokestack.tts.manager.TextToSpeechManager` backed by a
+:class:`~spokestack.tts.lite.SpeechSynthesizer`. It compares streaming each
+word to the manager as it is produced against waiting for the full response
+before synthesizing it. Time to first audio is measured from the moment the
+first sentence of the response is complete, which is once its last word
+has been produced, to the first audio written to the output.
+
+Usage::
+
+    python -m tools.benchmark_stream --model-dir path_to_tts_model \\
+        --words-per-second 20
+
+"""
+import argparse
+import re
+import sys
+import time
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from spokestack.tts.lite import SpeechSynthesizer
+from spokestack.tts.manager import FORMAT_PCM16, TextToSpeechManager
+
+RESPONSE = (
+    "Sure, I can help with that. "
+    "Your flight to Denver leaves at eight fifteen tomorrow morning. "
+    "The gate has not been assigned yet, so check the departures board when "
+    "you arrive. Would you like me to set a reminder?"
+)
+
+
+class NullOutput:
+    """ Output that records when audio is first written """
+
+    def __init__(self) -> None:
+        self.first: Optional[float] = None
+
+    def write(self, audio: bytes) -> None:
+        if self.first is None:
+            self.first = time.perf_counter()
+
+
+def generate(words: List[str], rate: float) -> Iterator[str]:
+    for word in words:
+        time.sleep(1 / rate)
+        yield word
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--model-dir", required=True)
+    parser.add_argument("--words-per-second", type=float, default=20.0)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--prefetch", action="store_true")
+    args = parser.parse_args()
+
+    words = re.findall(r"\S+\s*", RESPONSE)
+    first_sentence = RESPONSE.index(". ") + 2
+    synth = SpeechSynthesizer(args.model_dir, prefetch=args.prefetch)
+    synth.synthesize(RESPONSE)
+
+    streamed = []
+    buffered = []
+    for _ in range(args.repeats):
+        output = NullOutput()
+        manager = TextToSpeechManager(synth, output, format_=FORMAT_PCM16)
+        manager.synthesize_stream(generate(words, args.words_per_second))
+        streamed.append(manager.time_to_first_audio)
+
+        # the first sentence is complete along with its trailing whitespace
+        output = NullOutput()
+        manager = TextToSpeechManager(synth, output, format_=FORMAT_PCM16)
+        complete = None
+        text = ""
+        for word in generate(words, args.words_per_second):
+            text += word
+            if complete is None and len(text) >= first_sentence:
+                complete = time.perf_counter()
+        manager.synthesize(text)
+        buffered.append(output.first - complete)
+
+    sys.stdout.write(f"{'mode':<10} {'mean':>9} {'max':>9}\n")
+    for name, latencies in [("streamed", streamed), ("buffered", buffered)]:
+        ms = np.array(latencies) * 1000
+        sys.stdout.write(f"{name:<10} {ms.mean():>7.1f}ms {ms.max():>7.1f}ms\n")
+
+
+if __name__ == "__main__":
+    main()
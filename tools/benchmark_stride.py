@@ -0,0 +1,78 @@
+"""
+Benchmark for the wakeword detection stride.
+
+This script runs a :class:`~spokestack.wakeword.tflite.WakewordTrigger` over
+synthetic speech frames at a range of detection strides and reports the CPU
+time spent per stream for each second of audio, along with the detection
+latency added by the stride and by posterior smoothing. The added latency is
+the delay between a hop being encoded and the next detection that includes
+it, plus the group delay of the posterior window, on average and at worst.
+
+Usage::
+
+    python -m tools.benchmark_stride --model-dir path_to_wakeword_model
+
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from spokestack.context import SpeechContext
+from spokestack.wakeword.tflite import WakewordTrigger
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--model-dir", required=True)
+    parser.add_argument("--strides", type=int, nargs="+", default=[1, 2, 3, 4, 6, 8])
+    parser.add_argument("--posterior-window", type=int, default=1)
+    parser.add_argument("--posterior-smoothing", default="mean")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--frame-width", type=int, default=20)
+    parser.add_argument("--hop-length", type=int, default=10)
+    args = parser.parse_args()
+
+    frame_size = 16000 * args.frame_width // 1000
+    count = int(args.seconds * 1000 / args.frame_width)
+    audio = np.random.normal(scale=3000, size=(count, frame_size))
+    frames = audio.astype(np.int16)
+
+    sys.stdout.write(
+        f"{'stride':>6} {'cpu/stream':>12} {'detects/s':>10} "
+        f"{'mean delay':>11} {'max delay':>10}\n"
+    )
+    for stride in args.strides:
+        # a threshold above one keeps the trigger sampling throughout
+        trigger = WakewordTrigger(
+            model_dir=args.model_dir,
+            fft_hop_length=args.hop_length,
+            posterior_threshold=1.1,
+            detect_stride=stride,
+            posterior_window=args.posterior_window,
+            posterior_smoothing=args.posterior_smoothing,
+        )
+        context = SpeechContext()
+        context.is_speech = True
+
+        start = time.thread_time()
+        for frame in frames:
+            trigger(context, frame)
+        cpu = (time.thread_time() - start) / args.seconds
+
+        # the window delays a mean posterior by half its length
+        smoothing = 0.0
+        if args.posterior_smoothing == "mean":
+            smoothing = (args.posterior_window - 1) / 2 * stride
+        mean_delay = ((stride - 1) / 2 + smoothing) * args.hop_length
+        max_delay = ((stride - 1) + smoothing) * args.hop_length
+        detects = 1000 / args.hop_length / stride
+        sys.stdout.write(
+            f"{stride:>6} {cpu * 1000:>9.2f}ms/s {detects:>10.1f} "
+            f"{mean_delay:>9.1f}ms {max_delay:>8.1f}ms\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
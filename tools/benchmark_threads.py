@@ -0,0 +1,94 @@
+"""
+Benchmark for TFLite interpreter thread counts.
+
+This script measures each model at a range of interpreter thread counts.
+For each count, it first times single invocations on an idle process to give
+the per-request latency. It then runs one interpreter per worker thread,
+invoking continuously, to give the throughput when the cores are shared.
+Inputs are random and shaped by the model's input details. Models with
+dynamic dimensions are run at their declared shapes.
+
+Usage::
+
+    python -m tools.benchmark_threads path/to/encode.tflite path/to/nlu.tflite \\
+        --threads 1 2 4 --workers 4
+
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import List
+
+import numpy as np
+
+from spokestack.models.tensorflow import TFLiteModel
+
+
+def random_inputs(model: TFLiteModel) -> List[np.ndarray]:
+    inputs = []
+    for detail in model.input_details:
+        dtype = np.dtype(detail["dtype"])
+        if np.issubdtype(dtype, np.integer):
+            inputs.append(np.ones(detail["shape"], dtype))
+        else:
+            inputs.append(np.random.rand(*detail["shape"]).astype(dtype))
+    return inputs
+
+
+def latency(model: TFLiteModel, repeats: int) -> float:
+    inputs = random_inputs(model)
+    model(*inputs)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model(*inputs)
+    return (time.perf_counter() - start) / repeats
+
+
+def throughput(path: str, threads: int, workers: int, seconds: float) -> float:
+    models = [TFLiteModel(model_path=path, num_threads=threads) for _ in range(workers)]
+    counts = [0] * workers
+    deadline = time.perf_counter() + seconds
+
+    def run(index: int) -> None:
+        model = models[index]
+        inputs = random_inputs(model)
+        while time.perf_counter() < deadline:
+            model(*inputs)
+            counts[index] += 1
+
+    runners = [threading.Thread(target=run, args=(i,)) for i in range(workers)]
+    for runner in runners:
+        runner.start()
+    for runner in runners:
+        runner.join()
+    return sum(counts) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("models", nargs="+", help="paths to .tflite models")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    sys.stdout.write(
+        f"{'model':<24} {'threads':>7} {'latency':>10} {'throughput':>13}\n"
+    )
+    for path in args.models:
+        name = os.path.basename(os.path.dirname(path)) + "/" + os.path.basename(path)
+        for threads in args.threads:
+            model = TFLiteModel(model_path=path, num_threads=threads)
+            elapsed = latency(model, args.repeats)
+            rate = throughput(path, threads, args.workers, args.seconds)
+            sys.stdout.write(
+                f"{name[-24:]:<24} {threads:>7} {elapsed * 1000:>8.2f}ms "
+                f"{rate:>11.1f}/s\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark for TextToSpeechClient connection pooling.
+
+This script runs the text to speech client against a local stand-in for the
+Spokestack API, with and without kept-alive connections, and reports the
+p50 and p99 latency of each synthesis, from the request to the last byte of
+audio. Each new connection is delayed to simulate the TCP and TLS handshakes
+of a remote host, so that the benchmark runs offline.
+
+Usage::
+
+    python -m tools.benchmark_tts_client --connect-delay 0.05 --latency 0.02
+
+"""
+import argparse
+import sys
+import threading
+import time
+from typing import List
+
+import numpy as np
+
+from spokestack.tts.clients.spokestack import TextToSpeechClient
+from tests.tts.server import MockServer
+
+
+def run(
+    server: MockServer, keep_alive: bool, threads: int, requests: int
+) -> List[float]:
+    client = TextToSpeechClient(
+        "id", "secret", server.url, pool_size=threads, keep_alive=keep_alive
+    )
+    latencies: List[float] = []
+
+    def synthesize() -> None:
+        for _ in range(requests):
+            start = time.perf_counter()
+            b"".join(client.synthesize("Please hold while we connect you."))
+            latencies.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=synthesize) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    client.close()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--connect-delay", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    sys.stdout.write(f"{'mode':<10} {'p50':>9} {'p99':>9} {'connections':>12}\n")
+    for name, keep_alive in [("pooled", True), ("unpooled", False)]:
+        with MockServer(
+            connect_delay=args.connect_delay, latency=args.latency
+        ) as server:
+            latencies = run(server, keep_alive, args.threads, args.requests)
+            ms = np.array(latencies) * 1000
+            sys.stdout.write(
+                f"{name:<10} {np.percentile(ms, 50):>7.1f}ms "
+                f"{np.percentile(ms, 99):>7.1f}ms {server.connections:>12}\n"
+            )
+
+
+if __name__ == "__main__":
+    main()